@@ -0,0 +1,105 @@
+"""Synthetic large-document generators for the benchmark suite.
+
+Each ``make_*`` writes a deterministic file whose size is controlled by its
+parameters, so timings are comparable between runs and machines.
+"""
+from docx import Document
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+
+_WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit "
+          "日本語 テキスト 中文 字体").split()
+
+
+def _text(i, words=8):
+    return " ".join(_WORDS[(i + k) % len(_WORDS)] for k in range(words))
+
+
+def _fill_table(table, depth, seed):
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = _text(seed + r + c, 3)
+            if depth > 1 and r == 0 and c == 0:
+                nested = cell.add_table(rows=2, cols=2)
+                _fill_table(nested, depth - 1, seed + 1)
+
+
+def make_docx(path, paragraphs=1000, tables=10, table_depth=2,
+              runs_per_paragraph=3, sections=2):
+    """Body paragraphs (several runs each), nested tables, headers/footers."""
+    doc = Document()
+    for s in range(sections):
+        if s:
+            doc.add_section()
+        section = doc.sections[s]
+        section.header.is_linked_to_previous = False
+        section.header.paragraphs[0].add_run(f"Header {s}")
+        section.footer.is_linked_to_previous = False
+        section.footer.paragraphs[0].add_run(f"Footer {s}")
+        for i in range(paragraphs // sections):
+            para = doc.add_paragraph()
+            for k in range(runs_per_paragraph):
+                para.add_run(_text(i + k) + " ").bold = (k == 1)
+        for t in range(tables // sections):
+            _fill_table(doc.add_table(rows=3, cols=3), table_depth, t)
+    doc.save(path)
+    return path
+
+
+def make_xlsx(path, sheets=4, rows=5000, cols=10, distinct_fonts=50):
+    """``sheets`` × ``rows`` × ``cols`` cells cycling ``distinct_fonts``."""
+    wb = Workbook(write_only=True)
+    fonts = [Font(name=f"Font {i}", size=9 + i % 6, bold=bool(i % 2))
+             for i in range(distinct_fonts)]
+    for s in range(sheets):
+        ws = wb.create_sheet(f"Sheet{s + 1}")
+        for r in range(rows):
+            row = []
+            for c in range(cols):
+                cell = WriteOnlyCell(ws, value=_text(r + c, 2) if c % 2
+                                     else r * cols + c)
+                cell.font = fonts[(r + c) % distinct_fonts]
+                row.append(cell)
+            ws.append(row)
+    wb.save(path)
+    return path
+
+
+def make_pptx(path, slides=100, groups=2, tables=1, charts=1):
+    """Slides with text boxes, grouped shapes, tables and charts."""
+    prs = Presentation()
+    layout = prs.slide_layouts[6]
+    for i in range(slides):
+        slide = prs.slides.add_slide(layout)
+        tf = slide.shapes.add_textbox(
+            Inches(0.5), Inches(0.5), Inches(6), Inches(1)).text_frame
+        tf.text = _text(i)
+        tf.add_paragraph().add_run().text = _text(i + 1)
+        for g in range(groups):
+            group = slide.shapes.add_group_shape()
+            for k in range(3):
+                group.shapes.add_textbox(
+                    Inches(0.5 + k), Inches(1.5 + g), Inches(1), Inches(0.5)
+                ).text_frame.text = _text(i + k, 2)
+        for t in range(tables):
+            table = slide.shapes.add_table(
+                3, 3, Inches(0.5), Inches(3 + t), Inches(4), Inches(1)).table
+            for r in range(3):
+                for c in range(3):
+                    table.cell(r, c).text = _text(i + r + c, 2)
+        for c in range(charts):
+            data = CategoryChartData()
+            data.categories = ["A", "B", "C"]
+            data.add_series("S1", (1, 2, 3))
+            chart = slide.shapes.add_chart(
+                XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(5), Inches(3),
+                Inches(4), Inches(3), data).chart
+            chart.has_title = True
+            chart.chart_title.text_frame.text = f"Chart {i}-{c}"
+    prs.save(path)
+    return path
@@ -0,0 +1,218 @@
+"""Benchmark suite: wall time and peak RSS per conversion entry point.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--scale small|medium|large]
+        [--repeat N] [--output FILE] [--baseline FILE] [--save-baseline]
+        [--tolerance 0.2]
+
+Inputs come from the synthetic generators in generators.py. Every case runs
+in a fresh (spawned) process so peak RSS is not polluted by earlier cases.
+A case is flagged when it exceeds the PRD limits (30 s / 500 MB per file)
+or regresses past ``--tolerance`` against the stored baseline; the exit
+status is 1 if anything was flagged.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import psutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import font_core  # noqa: E402
+import generators  # noqa: E402
+
+TARGET_FONT = "Meiryo UI"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# PRD 3.1: per-file limits
+LIMIT_SECONDS = 30.0
+LIMIT_RSS_MB = 500.0
+
+# Absolute noise floors below which a relative change is not a regression
+_NOISE_SECONDS = 0.05
+_NOISE_RSS_MB = 5.0
+
+# scale -> extension -> generator kwargs
+SCALES = {
+    "small": {
+        ".docx": dict(paragraphs=200, tables=4),
+        ".xlsx": dict(sheets=2, rows=500, cols=8, distinct_fonts=20),
+        ".pptx": dict(slides=10),
+    },
+    "medium": {
+        ".docx": dict(paragraphs=5000, tables=50),
+        ".xlsx": dict(sheets=4, rows=20000, cols=10, distinct_fonts=100),
+        ".pptx": dict(slides=100),
+    },
+    "large": {
+        ".docx": dict(paragraphs=50000, tables=200, table_depth=3),
+        ".xlsx": dict(sheets=8, rows=100000, cols=10, distinct_fonts=500),
+        ".pptx": dict(slides=500, groups=3, tables=2),
+    },
+}
+
+_GENERATORS = {
+    ".docx": generators.make_docx,
+    ".xlsx": generators.make_xlsx,
+    ".pptx": generators.make_pptx,
+}
+
+_CHANGERS = {
+    ".docx": "change_word_font",
+    ".xlsx": "change_excel_font",
+    ".pptx": "change_ppt_font",
+}
+
+
+class _PeakRss:
+    """Samples this process's RSS on a background thread."""
+
+    def __init__(self, interval=0.005):
+        self._process = psutil.Process()
+        self._interval = interval
+        self._stop = threading.Event()
+        self.peak = self._process.memory_info().rss
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.peak = max(self.peak, self._process.memory_info().rss)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        info = self._process.memory_info()
+        # Windows tracks the true peak; elsewhere sampling is the best we have
+        self.peak = max(self.peak, info.rss, getattr(info, "peak_wset", 0))
+
+
+def _measure(func_name, path, engine):
+    """Child-process body: run one entry point, return (seconds, peak MB)."""
+    with tempfile.TemporaryDirectory() as workdir:
+        # process_office_file writes next to its input: keep outputs private
+        work_path = os.path.join(workdir, os.path.basename(path))
+        shutil.copyfile(path, work_path)
+        with _PeakRss() as rss:
+            start = time.perf_counter()
+            if func_name == "process_office_file":
+                font_core.process_office_file(work_path, TARGET_FONT,
+                                              engine=engine)
+            else:
+                getattr(font_core, func_name)(work_path, TARGET_FONT)
+            seconds = time.perf_counter() - start
+    return seconds, rss.peak / 1024 ** 2
+
+
+def _cases():
+    """(case name, extension, entry point, engine) for every combination."""
+    for ext, changer in _CHANGERS.items():
+        yield changer, ext, changer, None
+        for engine in font_core.ENGINE_NAMES:
+            if ext in font_core._ENGINES[engine]:
+                yield (f"process_office_file[{engine}]{ext}", ext,
+                       "process_office_file", engine)
+
+
+def run(scale="small", repeat=1, workdir=None):
+    """Generate inputs for ``scale`` and measure every case.
+
+    Returns {case: {"seconds", "peak_rss_mb", "input_mb"}}; with
+    ``repeat`` > 1 the minimum of each metric is kept.
+    """
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        inputs = {}
+        for ext, kwargs in SCALES[scale].items():
+            inputs[ext] = _GENERATORS[ext](
+                os.path.join(tmp, f"bench_{scale}{ext}"), **kwargs)
+        for name, ext, func_name, engine in _cases():
+            samples = []
+            for _ in range(repeat):
+                with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                    samples.append(pool.submit(
+                        _measure, func_name, inputs[ext], engine).result())
+            results[name] = {
+                "seconds": min(s for s, _ in samples),
+                "peak_rss_mb": min(m for _, m in samples),
+                "input_mb": os.path.getsize(inputs[ext]) / 1024 ** 2,
+            }
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Flag PRD-limit breaches and regressions; returns [(case, reason)]."""
+    flags = []
+    for name, current in results.items():
+        if current["seconds"] > LIMIT_SECONDS:
+            flags.append((name, f"{current['seconds']:.1f}s > PRD limit"))
+        if current["peak_rss_mb"] > LIMIT_RSS_MB:
+            flags.append((name, f"{current['peak_rss_mb']:.0f}MB > PRD limit"))
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key, floor, unit in (("seconds", _NOISE_SECONDS, "s"),
+                                 ("peak_rss_mb", _NOISE_RSS_MB, "MB")):
+            allowed = base[key] * (1 + tolerance)
+            if current[key] > allowed and current[key] - base[key] > floor:
+                flags.append((name, f"{key} {base[key]:.2f}{unit} -> "
+                                    f"{current[key]:.2f}{unit}"))
+    return flags
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slowdown (default 0.2)")
+    return parser
+
+
+def main(argv=None):
+    args = _build_parser().parse_args(argv)
+    results = run(args.scale, args.repeat)
+
+    print(f"{'case':<36} {'input MB':>9} {'seconds':>9} {'peak MB':>9}")
+    for name, r in results.items():
+        print(f"{name:<36} {r['input_mb']:>9.1f} {r['seconds']:>9.2f} "
+              f"{r['peak_rss_mb']:>9.0f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({args.scale: results}, fh, indent=2)
+
+    # Baseline file: {scale: {case: metrics}}, one machine per file
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            stored = json.load(fh)
+    flags = compare(results, stored.get(args.scale, {}), args.tolerance)
+    for name, reason in flags:
+        print(f"REGRESSION {name}: {reason}")
+
+    if args.save_baseline:
+        stored[args.scale] = results
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(stored, fh, indent=2)
+    return 1 if flags else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
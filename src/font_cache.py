@@ -0,0 +1,135 @@
+"""Persistent content-hash cache of converted files.
+
+An entry is keyed by the SHA-256 of the input bytes, the target font, the
+engine and ``ENGINE_VERSION``, so re-running a migration only converts files
+whose content (or settings) changed. Entries are plain files in one
+directory; the least recently used ones are evicted once the directory grows
+past ``max_bytes``. ``clear()`` (or ``font_cli --clear-cache``) empties it.
+
+The directory is scanned once when the cache is opened; after that a running
+total decides when to evict, so storing an entry costs one stat, not a scan
+of every entry. Eviction (a scan, which also resyncs the total with other
+processes sharing the directory) goes down to ``EVICT_TO`` of the limit, so
+the next one is many stores away.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from font_core import ENGINE_VERSION
+
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "font_unifier")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Fraction of max_bytes left after an eviction
+EVICT_TO = 0.9
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_digest(path):
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._total = sum(size for _mtime, size, _path in self._entries())
+
+    def key(self, path, font_name, engine, digest=None):
+        """Entry name for converting ``path``; OSError if it is unreadable.
+
+        ``digest`` is ``file_digest(path)`` when already computed (batches
+        hash their inputs on the worker pool)."""
+        if digest is None:
+            digest = file_digest(path)
+        # str(): a FontMapping has a canonical text form
+        settings = "\0".join((str(font_name), engine, ENGINE_VERSION))
+        digest = hashlib.sha256(digest.encode("ascii"))
+        digest.update(settings.encode("utf-8"))
+        return digest.hexdigest() + os.path.splitext(path)[1].lower()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def fetch(self, key, output_path):
+        """Copy a cached result to ``output_path``; False on a miss.
+
+        The copy goes through a temporary file next to ``output_path``, so
+        a failed fetch never leaves a partial output behind."""
+        entry = self._entry(key)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(output_path) or ".",
+                                   suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(entry, tmp)
+            os.replace(tmp, output_path)
+        except BaseException as e:
+            os.unlink(tmp)
+            if isinstance(e, FileNotFoundError):
+                return False
+            raise
+        try:
+            os.utime(entry)  # mark as recently used for eviction
+        except OSError:
+            pass  # evicted by another process meanwhile: the copy stands
+        return True
+
+    def store(self, key, output_path):
+        """Add a freshly converted file, evicting once past ``max_bytes``."""
+        entry = self._entry(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(output_path, tmp)
+            size = os.path.getsize(tmp)
+            try:
+                replaced = os.path.getsize(entry)
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, entry)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._total += size - replaced
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _mtime, size, _path in entries)
+        if total > self.max_bytes:
+            for _mtime, size, path in entries:
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass  # evicted concurrently by another process
+                total -= size
+        self._total = total
+
+    def clear(self):
+        """Invalidate every cached result."""
+        for _mtime, _size, path in self._entries():
+            os.unlink(path)
+        self._total = 0
@@ -0,0 +1,281 @@
+"""Headless command-line entry point (no Qt).
+
+Usage:
+    python src/font_cli.py PATH... [--font NAME] [--jobs N]
+                           [--engine NAME] [--summary FILE] [--stats]
+                           [--cache [DIR]] [--cache-max-mb MB] [--clear-cache]
+                           [--skip-uniform] [--scan] [--map RULES.json]
+                           [--verify] [--profile DIR]
+                           [--profile-min-seconds SECONDS]
+                           [--profile-memory N]
+
+PATH may be a file, a directory (walked recursively) or a glob pattern.
+``--scan`` only reports the fonts each file uses (read-only).
+``--verify`` checks every output for font references left unconverted
+(font_verify) and logs where they are. ``--profile DIR`` keeps a cProfile
+report per converted file (font_profile), optionally only for slow files.
+Exit status: 0 when every file converted (and verified), 1 when any failed
+or still references another font, 2 on usage errors (argparse).
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+
+from font_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ResultCache
+from font_core import (
+    ENGINE_NAMES, SUPPORTED_EXTENSIONS, process_office_files,
+    scan_office_files
+)
+from font_mapping import FontMapping
+from font_profile import Profiler
+from font_scan import uses_only
+
+
+logger = logging.getLogger("font_cli")
+
+DEFAULT_FONT = "Meiryo UI"
+
+
+def _is_candidate(path):
+    """Supported extension, not an Office lock file, not our own output."""
+    name = os.path.basename(path)
+    root, ext = os.path.splitext(name)
+    return (ext.lower() in SUPPORTED_EXTENSIONS and not name.startswith("~$")
+            and not root.endswith("_modified"))
+
+
+def collect_files(inputs, unmatched=None):
+    """Expand files, directories (recursively) and globs into a sorted,
+    de-duplicated list of convertible Office files.
+
+    Lock files and ``*_modified`` outputs are skipped when walking or
+    globbing; a file named explicitly is kept if its extension is supported.
+    Inputs that name nothing usable — a glob without matches, a path that
+    neither is a directory nor has a supported extension — are appended to
+    ``unmatched`` when given.
+    """
+    found = set()
+    for item in inputs:
+        if not glob.has_magic(item) and not os.path.isdir(item):
+            if os.path.splitext(item)[1].lower() in SUPPORTED_EXTENSIONS:
+                found.add(os.path.abspath(item))
+            elif unmatched is not None:
+                unmatched.append(item)
+            continue
+        candidates = (glob.glob(item, recursive=True)
+                      if glob.has_magic(item) else [item])
+        if not candidates and unmatched is not None:
+            unmatched.append(item)
+        for candidate in candidates:
+            if os.path.isdir(candidate):
+                paths = (os.path.join(dirpath, name)
+                         for dirpath, _dirnames, filenames
+                         in os.walk(candidate) for name in filenames)
+            else:
+                paths = [candidate]
+            found.update(os.path.abspath(path) for path in paths
+                         if _is_candidate(path))
+    return sorted(found)
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog="font_cli",
+        description="Unify fonts in .docx/.xlsx/.pptx files.")
+    parser.add_argument("inputs", nargs="+",
+                        help="files, directories or glob patterns")
+    parser.add_argument("--font", default=DEFAULT_FONT,
+                        help=f"target font name (default: {DEFAULT_FONT})")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--engine", choices=ENGINE_NAMES,
+                        default="object", help="conversion engine")
+    parser.add_argument("--summary", metavar="FILE",
+                        help="write a JSON summary to FILE ('-' = stdout)")
+    parser.add_argument("--stats", action="store_true",
+                        help="record per-stage timings and counters")
+    parser.add_argument("--cache", nargs="?", metavar="DIR",
+                        const=DEFAULT_CACHE_DIR,
+                        help="reuse results of earlier runs (default dir: "
+                             f"{DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int,
+                        default=DEFAULT_MAX_BYTES // 1024 ** 2,
+                        help="evict least recently used entries above this")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="empty the cache before converting")
+    parser.add_argument("--skip-uniform", action="store_true",
+                        help="leave files that already use only --font")
+    parser.add_argument("--map", metavar="RULES.json",
+                        help="map fonts by a rule table instead of --font "
+                             "(see font_mapping)")
+    parser.add_argument("--scan", action="store_true",
+                        help="only report the fonts used per file and "
+                             "location; nothing is converted")
+    parser.add_argument("--verify", action="store_true",
+                        help="check each output for font references that "
+                             "were not converted")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="write a cProfile report per converted file "
+                             "to DIR")
+    parser.add_argument("--profile-min-seconds", type=float, default=0.0,
+                        metavar="SECONDS",
+                        help="keep profiles only of files slower than this")
+    parser.add_argument("--profile-memory", type=int, default=0, metavar="N",
+                        help="also trace memory and list the top N "
+                             "allocation sites")
+    return parser
+
+
+def _write_summary(summary, target):
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    if target == "-":
+        print(text)
+    else:
+        with open(target, "w", encoding="utf-8") as fh:
+            fh.write(text)
+
+
+# Issues logged per file; the summary holds up to font_verify.DEFAULT_LIMIT
+_LOGGED_ISSUES = 5
+
+
+def _report_verify(result, entry):
+    """Log a FileResult's verification and make it JSON-friendly."""
+    checked = result.verify
+    if checked is None:
+        return False
+    entry["verify"] = {"total": checked.total, "error": checked.error,
+                       "issues": [i._asdict() for i in checked.issues]}
+    if checked.error is not None:
+        logger.error("FAIL %s: verification failed: %s", result.output_path,
+                     checked.error)
+        return True
+    if not checked.total:
+        return False
+    logger.warning("LEFT %s: %d font reference(s) not converted",
+                   result.output_path, checked.total)
+    for issue in checked.issues[:_LOGGED_ISSUES]:
+        logger.warning("     %s [%s] %s %s -> %s", issue.part, issue.location,
+                       issue.kind, issue.reference, issue.font)
+    return True
+
+
+def _scan(paths, args, font):
+    start = time.perf_counter()
+    files = []
+    for inventory in scan_office_files(paths, jobs=args.jobs):
+        if inventory.error is not None:
+            logger.error("FAIL %s: %s", inventory.path, inventory.error)
+        else:
+            names = sorted({name for names in inventory.locations.values()
+                            for name in names})
+            logger.info("%s %s: %s",
+                        "SAME" if uses_only(inventory, font) else "SCAN",
+                        inventory.path, ", ".join(names))
+        files.append(inventory._asdict())
+
+    failed = sum(1 for f in files if f["error"] is not None)
+    summary = {
+        "font": args.font,
+        "mapping": args.map,
+        "total": len(files),
+        "failed": failed,
+        "elapsed": time.perf_counter() - start,
+        "files": files,
+    }
+    if args.summary:
+        _write_summary(summary, args.summary)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    args = _build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.jobs is not None and args.jobs < 1:
+        logger.error("--jobs must be at least 1")
+        return 2
+
+    cache = None
+    if args.cache:
+        cache = ResultCache(args.cache, args.cache_max_mb * 1024 ** 2)
+    if args.clear_cache:
+        (cache or ResultCache()).clear()
+
+    font = args.font
+    if args.map:
+        try:
+            font = FontMapping.from_file(args.map)
+        except (OSError, ValueError) as e:
+            logger.error("--map %s: %s", args.map, e)
+            return 2
+
+    if args.profile:
+        profile = Profiler(args.profile, args.profile_min_seconds,
+                           args.profile_memory)
+    else:
+        try:
+            profile = Profiler.from_env()
+        except ValueError as e:
+            logger.error("%s", e)
+            return 2
+
+    unmatched = []
+    paths = collect_files(args.inputs, unmatched)
+    if unmatched:
+        for item in unmatched:
+            logger.error("%s: no such .docx/.xlsx/.pptx file or directory",
+                         item)
+        return 2
+    if not paths:
+        logger.warning("No .docx/.xlsx/.pptx files found")
+    if args.scan:
+        return _scan(paths, args, font)
+
+    start = time.perf_counter()
+    files = []
+    unverified = 0
+    for result in process_office_files(paths, font, jobs=args.jobs,
+                                       engine=args.engine, cache=cache,
+                                       stats=args.stats,
+                                       skip_uniform=args.skip_uniform,
+                                       verify=args.verify,
+                                       profile=profile or False):
+        if result.error is not None:
+            logger.error("FAIL %s: %s", result.path, result.error)
+        elif result.skipped:
+            logger.info("SKIP %s (nothing to change)", result.path)
+        else:
+            logger.info("%s %s -> %s", "HIT " if result.cached else "OK  ",
+                        result.path, result.output_path)
+        entry = result._asdict()
+        unverified += _report_verify(result, entry)
+        files.append(entry)
+
+    failed = sum(1 for f in files if f["error"] is not None)
+    summary = {
+        "font": args.font,
+        "mapping": args.map,
+        "engine": args.engine,
+        "total": len(files),
+        "succeeded": len(files) - failed,
+        "failed": failed,
+        "skipped": sum(1 for f in files if f["skipped"]),
+        "unverified": unverified,
+        "elapsed": time.perf_counter() - start,
+        "files": files,
+    }
+    if args.summary:
+        _write_summary(summary, args.summary)
+    logger.info("%d succeeded, %d failed", summary["succeeded"], failed)
+    if unverified:
+        logger.warning("%d output(s) still reference another font",
+                       unverified)
+    return 1 if failed or unverified else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
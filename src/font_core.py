@@ -0,0 +1,866 @@
+"""Core font-unification API (no Qt).
+
+Everything needed to convert .docx/.xlsx/.pptx files lives here so that
+batch jobs, worker processes and other headless callers can import it
+without pulling in PyQt6. The GUI in font_unifier.py is a thin layer on top.
+
+python-docx, openpyxl and python-pptx are imported lazily inside the
+change_* function that needs them, so importing this module stays cheap
+(budget enforced by tests/test_font_core.py::test_import_time_budget).
+"""
+import io
+import os
+import logging
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from functools import partial
+
+from font_mapping import FontMapping
+from font_profile import Profiler
+from font_progress import ProcessingCancelled, checkpoint  # noqa: F401
+from font_scan import FontInventory, scan_fonts, uses_only
+from font_verify import VerifyResult, verify_fonts
+from ooxml_engines import (
+    DOCX_STORY_PARTS, STYLE_FONT_CHANGERS, THEME_FONT_CHANGERS,
+    XML_FONT_CHANGERS, set_docx_part_fonts, set_docx_r_font,
+    set_docx_style_fonts, set_pptx_default_fonts, set_pptx_rpr_font
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# --- Font helpers (handle East Asian / complex scripts) ---
+
+def _set_docx_run_font(run, font_name):
+    """Word: set latin + eastAsia + complex-script fonts on a run.
+
+    The theme-reference attributes (asciiTheme/eastAsiaTheme/cstheme/...) are
+    removed too: when they coexist with an explicit name, some viewers fall
+    back to the theme font instead of the explicit one (the same class of
+    issue as Excel's <scheme>).
+    """
+    set_docx_r_font(run._element, font_name)
+
+
+def _set_pptx_run_font(run, font_name):
+    """PowerPoint: set latin + eastAsian + complex-script fonts on a run."""
+    set_pptx_rpr_font(run._r.get_or_add_rPr(), font_name)
+
+
+def _set_pptx_text_frame_fonts(text_frame, font_name, stats=None):
+    """Apply the pptx font helper to every run in a text frame."""
+    for paragraph in text_frame.paragraphs:
+        runs = paragraph.runs
+        for run in runs:
+            _set_pptx_run_font(run, font_name)
+        if stats is not None:
+            stats.count("runs", len(runs))
+
+
+# --- Instrumentation ---
+
+class ProcessingStats:
+    """Stage timings and counters for one file.
+
+    Pass an instance as ``stats=`` to process_office_file (or a change_*
+    function) to fill it in; with the default ``stats=None`` nothing is
+    measured. ``timings`` maps a stage (load/transform/save) to seconds,
+    ``counts`` holds runs/shapes/cells/charts/fonts touched and the input
+    and output sizes in bytes.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.counts = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = (self.timings.get(name, 0.0)
+                                  + time.perf_counter() - start)
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def __str__(self):
+        parts = [f"{name}={seconds:.3f}s"
+                 for name, seconds in self.timings.items()]
+        parts += [f"{name}={n}" for name, n in self.counts.items()]
+        return " ".join(parts)
+
+
+_NO_STAGE = nullcontext()
+
+
+def _stage(stats, name):
+    """``stats.stage(name)``, or a shared no-op when stats are disabled."""
+    return _NO_STAGE if stats is None else stats.stage(name)
+
+
+# --- Core Logic for Font Changing ---
+
+def _set_docx_font(paragraphs, font_name, stats=None):
+    """Apply the docx font helper to every run across the given paragraphs."""
+    for para in paragraphs:
+        runs = para.runs
+        for run in runs:
+            _set_docx_run_font(run, font_name)
+        if stats is not None:
+            stats.count("runs", len(runs))
+
+
+def _process_docx_container(container, font_name, stats=None):
+    """Process paragraphs + tables of a body/header/footer/cell.
+
+    A cell may itself contain nested tables, so this recurses naturally via
+    _process_docx_table -> _process_docx_container.
+    """
+    _set_docx_font(container.paragraphs, font_name, stats)
+    for table in getattr(container, 'tables', ()):
+        _process_docx_table(table, font_name, stats)
+
+
+def _process_docx_table(table, font_name, stats=None):
+    for row in table.rows:
+        cells = row.cells
+        for cell in cells:
+            _process_docx_container(cell, font_name, stats)
+        if stats is not None:
+            stats.count("cells", len(cells))
+
+
+def change_word_font(path, font_name, stats=None, progress=None,
+                     cancel=None):
+    """Changes the font for all text in a .docx file.
+
+    Covers body paragraphs/tables (incl. nested tables) and per-section
+    headers/footers (default, first-page, even-page). Drawing text boxes
+    (<w:txbxContent>) are not covered — known limitation; the "xpath" and
+    "xml" engines reach them.
+
+    Progress units: each top-level body paragraph/table, then each section.
+    With a FontMapping the styles are mapped too, since runs without their
+    own rFonts are left to inherit.
+    """
+    # Format libraries are imported on first dispatch, not at module load:
+    # a .xlsx-only worker never pays for python-docx/python-pptx
+    from docx import Document
+    from docx.table import Table as DocxTable
+
+    with _stage(stats, "load"):
+        doc = Document(path)
+    with _stage(stats, "transform"):
+        if isinstance(font_name, FontMapping):
+            set_docx_style_fonts(doc.styles.element, font_name)
+        blocks = list(doc.iter_inner_content())
+        sections = doc.sections
+        total = len(blocks) + len(sections)
+        for done, block in enumerate(blocks):
+            checkpoint(progress, cancel, done, total)
+            if isinstance(block, DocxTable):
+                _process_docx_table(block, font_name, stats)
+            else:
+                _set_docx_font((block,), font_name, stats)
+        for done, section in enumerate(sections, len(blocks)):
+            checkpoint(progress, cancel, done, total)
+            for part in (section.header, section.footer,
+                         section.first_page_header, section.first_page_footer,
+                         section.even_page_header, section.even_page_footer):
+                _process_docx_container(part, font_name, stats)
+        checkpoint(progress, cancel, total, total)
+    return doc
+
+
+def change_word_font_xpath(path, font_name, stats=None, progress=None,
+                           cancel=None):
+    """Changes the font for every run in a .docx file, proxies bypassed.
+
+    Same per-run edit as change_word_font, but each story part (body,
+    headers/footers, foot/endnotes) is handled with one compiled XPath over
+    its lxml tree instead of building Paragraph/Run/_Cell proxies. One pass
+    reaches nested tables, content controls and text boxes.
+    Progress units: story parts. With a FontMapping the styles are mapped
+    too, as in change_word_font.
+    """
+    from docx import Document
+
+    with _stage(stats, "load"):
+        doc = Document(path)
+    with _stage(stats, "transform"):
+        if isinstance(font_name, FontMapping):
+            set_docx_style_fonts(doc.styles.element, font_name)
+        story = re.compile(DOCX_STORY_PARTS)
+        parts = [part for part in doc.part.package.iter_parts()
+                 if story.fullmatch(part.partname.lstrip("/"))
+                 and hasattr(part, "_element")]
+        for done, part in enumerate(parts):
+            checkpoint(progress, cancel, done, len(parts))
+            runs = set_docx_part_fonts(part._element, font_name)
+            if stats is not None:
+                stats.count("runs", runs)
+        checkpoint(progress, cancel, len(parts), len(parts))
+    return doc
+
+
+def _replace_all_fonts(workbook, font_name):
+    """Replace the name of every font definition in the workbook.
+
+    All cells, named styles and the default (Normal) style reference these
+    shared font definitions, so updating them in place covers the whole
+    workbook — including unstyled/empty cells that otherwise keep the old
+    default font across sheets. Other font attributes (size, bold, ...) are
+    preserved.
+
+    The ``scheme`` attribute (minor/major) is also cleared: when present,
+    Excel ignores the explicit <name> and renders text with the theme font
+    (e.g. the East-Asian minor font), so previously unstyled cells would
+    keep showing the old font even after the name was changed.
+
+    With a FontMapping only the fonts whose name it maps are changed.
+
+    注意: workbook._fonts は openpyxl 3.x の非公開 API。依存バージョンは
+    requirements.txt で openpyxl==3.1.5 に固定済み。アップグレード時は再検証が必要。
+    """
+    mapping = font_name if isinstance(font_name, FontMapping) else None
+    for font in workbook._fonts:
+        if mapping is not None:
+            font_name = mapping.map(font.name)
+            if font_name is None:
+                continue
+        font.name = font_name
+        font.scheme = None
+
+
+def change_excel_font(path, font_name, stats=None, progress=None,
+                      cancel=None):
+    """Changes the font for all cells in a .xlsx file, preserving other style.
+
+    The only unit of work is the shared font table (see _replace_all_fonts).
+    """
+    from openpyxl import load_workbook
+
+    with _stage(stats, "load"):
+        workbook = load_workbook(path)
+    with _stage(stats, "transform"):
+        checkpoint(progress, cancel, 0, 1)
+        _replace_all_fonts(workbook, font_name)
+        checkpoint(progress, cancel, 1, 1)
+    if stats is not None:
+        stats.count("fonts", len(workbook._fonts))
+    return workbook
+
+
+def _save_workbook_to_stream(workbook, stream):
+    """Workbook.save(stream) without openpyxl's per-sheet temp files.
+
+    openpyxl serialises every worksheet into a NamedTemporaryFile before
+    adding it to the zip; here each sheet goes through a BytesIO instead.
+
+    注意: ExcelWriter / WorksheetWriter は openpyxl 3.x の非公開 API
+    （write_worksheet の処理を BytesIO 向けに写したもの）。requirements.txt で
+    openpyxl==3.1.5 に固定済み。アップグレード時は再検証が必要。
+    """
+    import datetime
+    import zipfile
+    from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+    from openpyxl.worksheet._writer import WorksheetWriter
+    from openpyxl.writer.excel import ExcelWriter
+
+    class InMemoryWriter(ExcelWriter):
+        def write_worksheet(self, ws):
+            ws._drawing = SpreadsheetDrawing()
+            ws._drawing.charts = ws._charts
+            ws._drawing.images = ws._images
+            writer = WorksheetWriter(ws, out=io.BytesIO())
+            writer.write()
+            ws._rels = writer._rels
+            self._archive.writestr(ws.path[1:], writer.read())
+            self.manifest.append(ws)
+
+    archive = zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED,
+                              allowZip64=True)
+    workbook.properties.modified = datetime.datetime.now(
+        tz=datetime.timezone.utc).replace(tzinfo=None)
+    InMemoryWriter(workbook, archive).save()
+
+
+def _save_to_stream(document, stream):
+    openpyxl = sys.modules.get("openpyxl")
+    if openpyxl is not None and isinstance(document, openpyxl.Workbook):
+        _save_workbook_to_stream(document, stream)
+    else:
+        document.save(stream)
+
+
+def _process_chart_fonts(chart, font_name, stats=None):
+    """Set fonts on a chart's title and axis titles.
+
+    Wrapped defensively: a malformed chart must never crash the whole file.
+    python-pptx exposes category_axis/value_axis (not x_axis/y_axis). Per-point
+    data-label fonts are not reliably settable, so they are skipped.
+    """
+    try:
+        if chart.has_title:
+            _set_pptx_text_frame_fonts(
+                chart.chart_title.text_frame, font_name, stats)
+        for axis_attr in ('category_axis', 'value_axis', 'series_axis'):
+            axis = getattr(chart, axis_attr, None)
+            if axis is not None and getattr(axis, 'has_title', False):
+                try:
+                    _set_pptx_text_frame_fonts(
+                        axis.axis_title.text_frame, font_name, stats)
+                except Exception:
+                    logger.debug("chart axis font failed", exc_info=True)
+    except Exception:
+        logger.debug("chart font failed", exc_info=True)
+
+
+def _process_ppt_shape(shape, font_name, stats=None):
+    """Recursively processes text in a shape, including nested groups."""
+    if stats is not None:
+        stats.count("shapes")
+    if getattr(shape, 'has_text_frame', False):
+        _set_pptx_text_frame_fonts(shape.text_frame, font_name, stats)
+    if getattr(shape, 'has_table', False):
+        for row in shape.table.rows:
+            cells = row.cells
+            for cell in cells:
+                _set_pptx_text_frame_fonts(cell.text_frame, font_name, stats)
+            if stats is not None:
+                stats.count("cells", len(cells))
+    if getattr(shape, 'has_chart', False):
+        if stats is not None:
+            stats.count("charts")
+        _process_chart_fonts(shape.chart, font_name, stats)
+    if getattr(shape, 'has_group', False):
+        for sub_shape in shape.shapes:
+            _process_ppt_shape(sub_shape, font_name, stats)
+
+
+def _ppt_inherited_parts(prs, notes_slides):
+    """Slide masters, layouts, notes slides and the notes master, each once.
+
+    Placeholders inherit from these, so they are visited per part (not per
+    slide pointing at them): the cost follows the number of unique parts.
+    """
+    unique = {}
+    for master in prs.slide_masters:
+        unique.setdefault(master.part, master)
+        for layout in master.slide_layouts:
+            unique.setdefault(layout.part, layout)
+    for notes_slide in notes_slides:
+        unique.setdefault(notes_slide.part, notes_slide)
+        notes_master = notes_slide.part.notes_master
+        unique.setdefault(notes_master.part, notes_master)
+    return list(unique.values())
+
+
+def change_ppt_font(path, font_name, stats=None, progress=None,
+                    cancel=None):
+    """Changes the font for all text in a .pptx file.
+
+    Covers text frames, tables, charts (title/axes) and nested groups on
+    slides, and once per part on slide masters, layouts, notes slides and
+    the notes master — including the default run properties of p:txStyles
+    and every a:lstStyle. Progress units: slides, then those parts.
+    """
+    from pptx import Presentation
+
+    with _stage(stats, "load"):
+        prs = Presentation(path)
+    with _stage(stats, "transform"):
+        slides = list(prs.slides)
+        # has_notes_slide first: reading notes_slide would create one
+        parts = slides + _ppt_inherited_parts(
+            prs, [slide.notes_slide for slide in slides
+                  if slide.has_notes_slide])
+        total = len(parts)
+        for done, part in enumerate(parts):
+            checkpoint(progress, cancel, done, total)
+            for shape in part.shapes:
+                _process_ppt_shape(shape, font_name, stats)
+            defaults = set_pptx_default_fonts(part._element, font_name)
+            if stats is not None:
+                stats.count("parts")
+                stats.count("defaults", defaults)
+        checkpoint(progress, cancel, total, total)
+    return prs
+
+
+# Extension -> handler (case-insensitive dispatch in process_office_file)
+_FONT_CHANGERS = {
+    ".docx": change_word_font,
+    ".xlsx": change_excel_font,
+    ".pptx": change_ppt_font,
+}
+
+# Engine name -> extension table. "object" loads the full document model;
+# "xml" rewrites only the font-bearing XML parts of the zip package;
+# "styles" (.docx only) sets the font in styles.xml and leaves inheriting
+# runs alone; "theme" rewrites the theme fonts and keeps theme references;
+# "xpath" (.docx only) is the object engine's per-run edit done with one
+# XPath query per part.
+_ENGINES = {
+    "object": _FONT_CHANGERS,
+    "xml": XML_FONT_CHANGERS,
+    "styles": STYLE_FONT_CHANGERS,
+    "theme": THEME_FONT_CHANGERS,
+    "xpath": {".docx": change_word_font_xpath},
+}
+
+SUPPORTED_EXTENSIONS = tuple(_FONT_CHANGERS)
+ENGINE_NAMES = tuple(_ENGINES)
+
+# Part of every result-cache key: bump whenever an engine's output changes
+# so results cached by an older version are never reused.
+ENGINE_VERSION = "6"
+
+
+def output_path_for(path):
+    """``dir/name.ext`` -> ``dir/name_modified.ext``."""
+    root, ext = os.path.splitext(path)
+    return f"{root}_modified{ext}"
+
+
+def _save_atomically(document, output_path):
+    """Save via a temp file in the same directory, then rename into place,
+    so a failed or cancelled save never leaves a half-written output."""
+    directory, name = os.path.split(output_path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory or ".", prefix=".~" + name, suffix=".tmp")
+    os.close(fd)
+    try:
+        document.save(tmp_path)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _changer_for(ext, engine):
+    """The engine's changer for ``ext`` (case-insensitive); ValueError on an
+    unsupported extension or an unknown/unsupported engine."""
+    if ext.lower() not in _FONT_CHANGERS:
+        raise ValueError(f"Unsupported file type: {ext}")
+    changers = _ENGINES.get(engine)
+    if changers is None:
+        raise ValueError(f"Unknown engine: {engine}")
+    changer = changers.get(ext.lower())
+    if changer is None:
+        raise ValueError(f"Engine '{engine}' does not support {ext} files")
+    return changer
+
+
+def _convert(changer, source, font_name, save, stats, progress, cancel):
+    """Run ``changer`` on ``source`` (a path or seekable stream) and hand the
+    result to ``save(document)``; load and save count as one progress unit
+    each around the engine's own units."""
+    units = [1]
+
+    def engine_progress(done, total):
+        units[0] = total
+        progress(done + 1, total + 2)
+
+    checkpoint(progress, cancel, 0, units[0] + 2)
+    document = changer(source, font_name, stats,
+                       None if progress is None else engine_progress, cancel)
+    with _stage(stats, "save"):
+        save(document)
+    if progress is not None:
+        progress(units[0] + 2, units[0] + 2)
+
+
+def process_office_file(path, font_name, engine="object", stats=None,
+                        progress=None, cancel=None, skip_uniform=False,
+                        profile=None):
+    """Process a single Office file and save the modified copy.
+
+    Returns the output path. Raises ValueError on unsupported extensions or
+    an unknown/unsupported engine. Case-insensitive on the extension.
+    ``font_name`` may be a font_mapping.FontMapping: every rule is then
+    applied in the same single load/transform/save pass.
+    With ``skip_uniform`` the file is scanned first (font_scan) and, if it
+    already uses only ``font_name``, nothing is loaded or written and None
+    is returned.
+    A ProcessingStats passed as ``stats`` receives the load/transform/save
+    timings, counters and sizes, which are also logged at INFO.
+
+    ``progress(done, total)`` is called between units of work (the engine's
+    units, plus one each for load and save); once ``cancel.is_set()`` the
+    next checkpoint raises ProcessingCancelled and no output is written.
+
+    ``profile`` (a font_profile.Profiler) writes a cProfile/tracemalloc
+    report of this conversion; None follows the FONT_UNIFIER_PROFILE*
+    environment variables and False turns profiling off. Callers converting
+    many files resolve the environment once (Profiler.from_env) and pass
+    the result, or False, instead of None.
+    """
+    if profile is None:
+        profile = Profiler.from_env()
+    if not profile:
+        return _process_office_file(path, font_name, engine, stats,
+                                    progress, cancel, skip_uniform)
+    with profile.capture(path) as capture:
+        return _process_office_file(path, font_name, engine, stats,
+                                    progress, cancel, skip_uniform,
+                                    capture.snapshot)
+
+
+def _process_office_file(path, font_name, engine, stats, progress, cancel,
+                         skip_uniform, before_save=None):
+    output_path = output_path_for(path)
+    changer = _changer_for(os.path.splitext(path)[1], engine)
+
+    if skip_uniform:
+        with _stage(stats, "scan"):
+            uniform = uses_only(scan_fonts(path), font_name)
+        if uniform:
+            if stats is not None:
+                stats.count("skipped")
+            logger.info("%s: already uses only %s, skipped", path, font_name)
+            if progress is not None:
+                progress(1, 1)
+            return None
+
+    def save(document):
+        if before_save is not None:
+            before_save()
+        _save_atomically(document, output_path)
+
+    if stats is not None:
+        stats.count("input_bytes", os.path.getsize(path))
+    _convert(changer, path, font_name, save, stats, progress, cancel)
+    if stats is not None:
+        stats.count("output_bytes", os.path.getsize(output_path))
+        logger.info("%s: %s", path, stats)
+    return output_path
+
+
+def process_office_stream(source, ext, font_name, engine="object",
+                          output=None, stats=None, progress=None,
+                          cancel=None):
+    """Convert a package held in memory; nothing is read from or written to
+    the filesystem.
+
+    ``source`` is the package as bytes (bytes, bytearray, memoryview) or a
+    binary file-like object; a non-seekable stream is read into memory
+    first, since a zip package is read from its end. ``ext`` names the
+    format (".docx", "xlsx", ... case-insensitive). Same engines, errors,
+    ``stats``, ``progress`` and ``cancel`` as process_office_file.
+
+    Returns the converted package as bytes, or writes it to the binary
+    ``output`` stream and returns None. ``output`` is written directly: if
+    the conversion fails or is cancelled while saving, what was written so
+    far is incomplete.
+    """
+    if not ext.startswith("."):
+        ext = "." + ext
+    changer = _changer_for(ext, engine)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif not source.seekable():
+        source = io.BytesIO(source.read())
+    if stats is not None and isinstance(source, io.BytesIO):
+        stats.count("input_bytes", source.getbuffer().nbytes)
+
+    target = io.BytesIO() if output is None else output
+    _convert(changer, source, font_name,
+             partial(_save_to_stream, stream=target), stats, progress, cancel)
+    if stats is not None:
+        if output is None:
+            stats.count("output_bytes", target.getbuffer().nbytes)
+        logger.info("<%s stream>: %s", ext, stats)
+    return None if output is not None else target.getvalue()
+
+
+# --- Batch processing (multi-core) ---
+
+# Per-file outcome of process_office_files. ``output_path`` is None and
+# ``error`` holds the message when the file failed; ``timings`` maps a
+# stage name to seconds ("total" is always present); ``cached`` is True when
+# the output was copied from the result cache or from an identical file;
+# ``counts`` holds the ProcessingStats counters when stats were requested;
+# ``skipped`` is True when the file already used only the target font (no
+# output was written, ``output_path`` is None); ``verify`` is the
+# font_verify.VerifyResult of the output when verification was requested.
+FileResult = namedtuple(
+    "FileResult",
+    "path output_path error timings cached counts skipped verify",
+    defaults=(False, None, False, None))
+
+
+def _verify_one(path, font_name):
+    """verify_fonts that reports errors instead of raising."""
+    try:
+        return verify_fonts(path, font_name)
+    except Exception as e:
+        return VerifyResult(path, [], 0, str(e))
+
+
+def _process_one(path, font_name, engine, with_stats=False,
+                 skip_uniform=False, verify=False, profile=None):
+    """Pool entry point: never raises, so one bad file can't stop a batch."""
+    stats = ProcessingStats() if with_stats else None
+    start = time.perf_counter()
+    try:
+        output_path = process_office_file(path, font_name, engine, stats,
+                                          skip_uniform=skip_uniform,
+                                          profile=profile)
+        error = None
+    except Exception as e:
+        output_path, error = None, str(e)
+    checked = None
+    if verify and output_path is not None:
+        with _stage(stats, "verify"):
+            checked = _verify_one(output_path, font_name)
+    timings = {"total": time.perf_counter() - start}
+    skipped = error is None and output_path is None
+    if stats is None:
+        return FileResult(path, output_path, error, timings,
+                          skipped=skipped, verify=checked)
+    timings.update(stats.timings)
+    return FileResult(path, output_path, error, timings, False, stats.counts,
+                      skipped, checked)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _pool_failure(path, error):
+    return FileResult(path, None, error, {})
+
+
+class _InlineExecutor:
+    """Executor running each task as it is submitted (``jobs=1``)."""
+
+    def submit(self, fn, *args):
+        from concurrent.futures import Future
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def _executor(jobs):
+    if jobs == 1:
+        return _InlineExecutor()
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(max_workers=jobs)
+
+
+def _run_pool(paths, worker, jobs, failure=_pool_failure):
+    """Run ``worker(path)`` (a picklable partial of _process_one) per path.
+
+    ``failure(path, message)`` builds the result for a file whose worker
+    process died.
+    """
+    paths = sorted(paths, key=_file_size, reverse=True)
+    if jobs == 1:
+        for path in paths:
+            yield worker(path)
+        return
+
+    from concurrent.futures import as_completed
+    executor = _executor(jobs)
+    try:
+        futures = {executor.submit(worker, path): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # Worker process died (BrokenProcessPool, ...)
+                yield failure(futures[future], str(e))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _copy_result(source_output, path):
+    """Reuse an existing output for ``path``; returns a cached FileResult."""
+    start = time.perf_counter()
+    output_path = output_path_for(path)
+    try:
+        shutil.copyfile(source_output, output_path)
+    except OSError as e:
+        return FileResult(path, None, str(e), {}, True)
+    timings = {"total": time.perf_counter() - start}
+    return FileResult(path, output_path, None, timings, True)
+
+
+def _duplicate_result(result, path):
+    """Result for ``path``, whose content is identical to ``result.path``."""
+    if result.output_path is not None:
+        return _copy_result(result.output_path, path)
+    return result._replace(path=path, cached=True)
+
+
+def _input_digest(path):
+    """Pool entry point for cache keys: font_cache.file_digest, or None
+    when ``path`` is unreadable (its conversion reports the error)."""
+    from font_cache import file_digest
+    try:
+        return file_digest(path)
+    except OSError:
+        return None
+
+
+def _run_cached(paths, worker, jobs, cache):
+    """Serve cache hits, convert one file per distinct key, copy the rest.
+
+    Inputs are hashed on the pool (largest first) and a file's conversion
+    is submitted as soon as its hash misses the cache, so hashing overlaps
+    the conversions instead of preceding them all in this process.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    font_name = worker.keywords["font_name"]
+    engine = worker.keywords["engine"]
+    groups = {}          # cache key -> paths with identical content
+    finished = {}        # cache key -> result of its first path
+    pending = {}         # future -> (task, path, cache key)
+    executor = _executor(jobs)
+
+    def submit(task, path, key=None):
+        """Queue ``task`` ("hash" or "convert"); the failure result when
+        the pool broke (a worker died) and runs nothing any more."""
+        fn = _input_digest if task == "hash" else worker
+        try:
+            pending[executor.submit(fn, path)] = (task, path, key)
+        except Exception as e:
+            return _pool_failure(path, str(e))
+
+    def hashed(path, key):
+        if key in groups:
+            groups[key].append(path)
+            if key in finished:
+                yield _duplicate_result(finished[key], path)
+            return
+        groups[key] = [path]
+        start = time.perf_counter()
+        if cache.fetch(key, output_path_for(path)):
+            timings = {"total": time.perf_counter() - start}
+            result = FileResult(path, output_path_for(path), None, timings,
+                                True)
+        else:
+            result = submit("convert", path, key)
+        if result is not None:
+            finished[key] = result
+            yield result
+
+    def converted(path, key, result):
+        yield result
+        if key is None:
+            return
+        if result.output_path is not None:
+            cache.store(key, result.output_path)
+        finished[key] = result
+        for duplicate in groups[key][1:]:
+            yield _duplicate_result(result, duplicate)
+
+    try:
+        for path in sorted(dict.fromkeys(paths), key=_file_size,
+                           reverse=True):
+            failed = submit("hash", path)
+            if failed is not None:
+                yield failed
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, path, key = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    # Worker process died (BrokenProcessPool, ...)
+                    value = _pool_failure(path, str(e))
+                    if task == "hash":
+                        yield value
+                        continue
+                if task == "convert":
+                    yield from converted(path, key, value)
+                elif value is None:
+                    # Unreadable input: the worker reports the read error
+                    failed = submit("convert", path)
+                    if failed is not None:
+                        yield failed
+                else:
+                    yield from hashed(path, cache.key(
+                        path, font_name, engine, value))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def process_office_files(paths, font_name, jobs=None, engine="object",
+                         cache=None, stats=False, skip_uniform=False,
+                         verify=False, profile=None):
+    """Process many Office files on a pool of ``jobs`` worker processes.
+
+    Yields a FileResult per file as soon as it finishes (completion order,
+    not input order). The largest files are submitted first so a big file
+    picked up last can't leave the batch waiting on a single core.
+    ``jobs=None`` uses every CPU; ``jobs=1`` runs in this process.
+
+    With a ``cache`` (font_cache.ResultCache), files converted by an earlier
+    run are copied from the cache instead, and files with identical content
+    within this batch are converted only once.
+
+    ``stats=True`` collects a ProcessingStats per converted file: its stage
+    timings are merged into ``timings`` and its counters become ``counts``.
+    ``skip_uniform=True`` leaves files that already use only ``font_name``
+    alone (``skipped=True``, see process_office_file).
+    ``verify=True`` streams each output through font_verify.verify_fonts
+    right after it is written, in the same worker, so it overlaps the
+    conversions running on the other workers; the result is ``verify``.
+    Outputs copied from the cache or from an identical file are not
+    verified again (``verify`` is None).
+    ``profile`` (font_profile.Profiler) profiles each conversion in its
+    worker; None follows the environment, read once here (a malformed
+    value raises ValueError before any file is converted) and handed to
+    the workers.
+    """
+    if profile is None:
+        profile = Profiler.from_env()
+    worker = partial(_process_one, font_name=font_name, engine=engine,
+                     with_stats=stats, skip_uniform=skip_uniform,
+                     verify=verify, profile=profile or False)
+    if cache is None:
+        yield from _run_pool(paths, worker, jobs)
+    else:
+        yield from _run_cached(paths, worker, jobs, cache)
+
+
+def _scan_one(path):
+    """Pool entry point for scans: errors are reported, not raised."""
+    try:
+        return scan_fonts(path)
+    except Exception as e:
+        return FontInventory(path, {}, False, str(e))
+
+
+def _scan_failure(path, error):
+    return FontInventory(path, {}, False, error)
+
+
+def scan_office_files(paths, jobs=None):
+    """Font inventory (font_scan.FontInventory) of many files, read-only.
+
+    Same pool and scheduling as process_office_files; yields in completion
+    order, with ``error`` set for files that could not be read.
+    """
+    yield from _run_pool(paths, _scan_one, jobs, _scan_failure)
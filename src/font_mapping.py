@@ -0,0 +1,108 @@
+"""Multi-rule font mapping (no Qt, no format libraries).
+
+A :class:`FontMapping` can be passed wherever a target ``font_name`` is
+accepted (process_office_file, process_office_files, every change_* and
+engine function). Instead of replacing every font with one name, each
+explicit font name found while the document is traversed is looked up in
+the rule table and replaced by the rule's target for that script — all
+rules in the same single pass.
+
+Rules are ``(source, target)`` pairs:
+
+- ``source`` is an exact font name, or a glob pattern (``*``, ``?``,
+  ``[...]``); matching is case-insensitive. Exact names win over patterns;
+  patterns are tried in order.
+- ``target`` is a font name for every script, ``None`` to leave matching
+  fonts alone, or a dict with any of ``"latin"``, ``"east_asia"`` and
+  ``"cs"`` (scripts not listed are left alone).
+
+``default`` is the target for names no rule matches (``None``: leave them).
+Text without an explicit font name inherits it (styles, masters, theme) and
+follows whatever the mapping does to that source; theme references are kept
+as they are, so theme fonts are remapped only by engine="theme".
+
+Example (JSON file for ``font_cli --map``)::
+
+    {"rules": [["MS Mincho", "Yu Mincho"],
+               ["Arial*", {"latin": "Segoe UI"}],
+               ["Wingdings", null]]}
+"""
+import fnmatch
+import json
+import re
+
+
+SCRIPTS = ("latin", "east_asia", "cs")
+
+
+def _compile_target(target):
+    if target is None:
+        return None
+    if isinstance(target, str):
+        return dict.fromkeys(SCRIPTS, target)
+    unknown = set(target) - set(SCRIPTS)
+    if unknown:
+        raise ValueError(f"Unknown script(s) in font rule: {sorted(unknown)}")
+    return {script: name for script, name in target.items() if name}
+
+
+class FontMapping:
+    """Compiled rule table: ``map(name, script)`` -> new name or None."""
+
+    def __init__(self, rules, default=None):
+        self.rules = [(source, target) for source, target in rules]
+        self.default = default
+        self._exact = {}
+        self._patterns = []
+        for source, target in self.rules:
+            compiled = _compile_target(target)
+            if any(ch in source for ch in "*?["):
+                self._patterns.append((re.compile(
+                    fnmatch.translate(source), re.IGNORECASE), compiled))
+            else:
+                self._exact.setdefault(source.casefold(), compiled)
+        self._default = _compile_target(default)
+        # Documents repeat a handful of names many thousands of times
+        self._memo = {}
+
+    @classmethod
+    def from_file(cls, path):
+        """Load ``{"rules": [[source, target], ...], "default": ...}``."""
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        return cls(data.get("rules", ()), data.get("default"))
+
+    def _lookup(self, name):
+        try:
+            return self._memo[name]
+        except KeyError:
+            pass
+        targets = self._exact.get(name.casefold(), False)
+        if targets is False:
+            targets = next((t for pattern, t in self._patterns
+                            if pattern.match(name)), self._default)
+        self._memo[name] = targets
+        return targets
+
+    def map(self, name, script="latin"):
+        """Target for ``name`` in ``script``; None = keep ``name`` as is
+        (no rule, a leave-alone rule, or the name is already the target)."""
+        if not name:
+            return None
+        targets = self._lookup(name)
+        if targets is None:
+            return None
+        target = targets.get(script)
+        return None if target == name else target
+
+    def __str__(self):
+        # Canonical form: part of result-cache keys and log lines
+        return json.dumps({"rules": self.rules, "default": self.default},
+                          ensure_ascii=False, sort_keys=True)
+
+    def __getstate__(self):
+        # Worker processes rebuild the compiled table (memo not shipped)
+        return {"rules": self.rules, "default": self.default}
+
+    def __setstate__(self, state):
+        self.__init__(state["rules"], state["default"])
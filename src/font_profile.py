@@ -0,0 +1,171 @@
+"""Opt-in per-file profiling (no Qt).
+
+A :class:`Profiler` passed as ``profile=`` to process_office_file (or
+process_office_files, the GUI workers, ``font_cli --profile DIR``) runs
+each conversion under cProfile — and, with ``memory_top``, tracemalloc —
+and, for every file that took at least ``min_seconds``, writes to its
+directory:
+
+- ``<file name>.<stamp>.prof``: pstats data (``python -m pstats``,
+  snakeviz, ...);
+- ``<file name>.<stamp>.txt``: wall time, outcome, the functions with the
+  highest cumulative time and, with tracemalloc, the peak traced memory and
+  the top allocation sites of what is held just before saving (the
+  document fully loaded and transformed). tracemalloc sees the Python heap
+  only: lxml trees live in libxml2's memory and count in neither.
+
+Without ``profile=`` the environment decides: ``FONT_UNIFIER_PROFILE=DIR``
+switches profiling on, ``FONT_UNIFIER_PROFILE_MIN_SECONDS`` sets the
+threshold and ``FONT_UNIFIER_PROFILE_MEMORY=N`` the number of allocation
+sites (0, the default, leaves tracemalloc off). Entry points read it once
+(Profiler.from_env: the CLI, process_office_files, the watch service, the
+GUI queue), so a malformed value stops them at start-up rather than failing
+every file, and hand the resolved profiler down to their workers.
+
+cProfile and tracemalloc are process-wide in effect, so a process profiles
+one conversion at a time: concurrent conversions in the same process (GUI
+job threads) wait for each other while profiling is on.
+"""
+import cProfile
+import itertools
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV = "FONT_UNIFIER_PROFILE"
+MIN_SECONDS_ENV = "FONT_UNIFIER_PROFILE_MIN_SECONDS"
+MEMORY_ENV = "FONT_UNIFIER_PROFILE_MEMORY"
+
+# Functions listed in the text report (by cumulative time)
+TOP_FUNCTIONS = 40
+
+_active = threading.Lock()
+_sequence = itertools.count(1)
+
+
+def _env_number(environ, name, convert):
+    value = environ.get(name) or "0"
+    try:
+        return convert(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}={value!r}") from None
+
+
+class _Capture:
+    """Handed to the profiled code: ``snapshot()`` records the allocation
+    sites at the point of interest (the last call wins)."""
+
+    def __init__(self, memory_top):
+        self.memory_top = memory_top
+        self.snapshot_taken = None
+
+    def snapshot(self):
+        if self.memory_top:
+            self.snapshot_taken = tracemalloc.take_snapshot()
+
+
+class Profiler:
+    """Where and when to keep per-file profiles (picklable, so it can be
+    handed to worker processes)."""
+
+    def __init__(self, directory, min_seconds=0.0, memory_top=0):
+        self.directory = directory
+        self.min_seconds = min_seconds
+        self.memory_top = memory_top
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """Profiler configured by FONT_UNIFIER_PROFILE*, or None when
+        profiling is off. Raises ValueError on a malformed number."""
+        environ = os.environ if environ is None else environ
+        directory = environ.get(PROFILE_ENV)
+        if not directory:
+            return None
+        return cls(directory,
+                   _env_number(environ, MIN_SECONDS_ENV, float),
+                   _env_number(environ, MEMORY_ENV, int))
+
+    @contextmanager
+    def capture(self, path):
+        """Profile the body of the ``with`` block as the conversion of
+        ``path``; the report is written even when the body raises."""
+        with _active:
+            started_tracing = (self.memory_top
+                               and not tracemalloc.is_tracing())
+            if started_tracing:
+                tracemalloc.start()
+            elif self.memory_top:
+                tracemalloc.reset_peak()
+            capture = _Capture(self.memory_top)
+            profile = cProfile.Profile()
+            error = None
+            start = time.perf_counter()
+            profile.enable()
+            try:
+                yield capture
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                profile.disable()
+                seconds = time.perf_counter() - start
+                peak = None
+                if self.memory_top:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    if capture.snapshot_taken is None:
+                        capture.snapshot()
+                    if started_tracing:
+                        tracemalloc.stop()
+                if seconds >= self.min_seconds:
+                    try:
+                        self._write(path, seconds, error, profile,
+                                    capture.snapshot_taken, peak)
+                    except OSError as e:
+                        # A profile is diagnostics: never fail the file
+                        logger.warning("%s: profile not written: %s", path,
+                                       e)
+
+    def _write(self, path, seconds, error, profile, snapshot, peak):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(
+            self.directory, f"{os.path.basename(path)}.{stamp}-"
+                            f"{os.getpid()}-{next(_sequence)}")
+        profile.dump_stats(base + ".prof")
+        with open(base + ".txt", "w", encoding="utf-8") as fh:
+            fh.write(f"file: {path}\n")
+            fh.write(f"seconds: {seconds:.3f}\n")
+            fh.write("result: ok\n" if error is None else
+                     f"result: {type(error).__name__}: {error}\n")
+            fh.write(f"threshold: {self.min_seconds}\n\n")
+            pstats.Stats(profile, stream=fh).sort_stats(
+                "cumulative").print_stats(TOP_FUNCTIONS)
+            if snapshot is not None:
+                self._write_memory(fh, snapshot, peak)
+        logger.info("%s: %.3fs, profile written to %s.prof", path, seconds,
+                    base)
+
+    def _write_memory(self, fh, snapshot, peak):
+        # Module code loaded by the lazy format-library imports is not
+        # conversion data: leave it out, like our own bookkeeping
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*"),
+        ))
+        fh.write(f"tracemalloc peak: {peak / 1024 ** 2:.1f} MiB\n")
+        fh.write(f"top {self.memory_top} allocation sites held before "
+                 "saving:\n")
+        for i, stat in enumerate(
+                snapshot.statistics("lineno")[:self.memory_top], 1):
+            frame = stat.traceback[0]
+            fh.write(f"{i:4d}. {stat.size / 1024 ** 2:9.2f} MiB "
+                     f"{stat.count:9d} blocks  "
+                     f"{frame.filename}:{frame.lineno}\n")
@@ -0,0 +1,18 @@
+"""Progress reporting and cooperative cancellation (shared by all engines).
+
+``progress`` is any callable ``progress(done, total)``; ``cancel`` is any
+object with ``is_set()`` (typically a ``threading.Event``). Both default to
+None, in which case a checkpoint costs two ``is None`` tests.
+"""
+
+
+class ProcessingCancelled(Exception):
+    """Raised at the next checkpoint once the cancel token is set."""
+
+
+def checkpoint(progress, cancel, done, total):
+    """Cancellation point + progress report between two units of work."""
+    if cancel is not None and cancel.is_set():
+        raise ProcessingCancelled()
+    if progress is not None:
+        progress(done, total)
@@ -0,0 +1,174 @@
+"""Read-only font inventory of .docx/.xlsx/.pptx packages (no Qt).
+
+``scan_fonts(path)`` streams only the parts that name fonts — never the
+object model, never writing anything — and reports every font name per
+location with how often it occurs:
+
+- .docx: "runs" (w:rFonts in body/headers/footers/notes), "styles"
+  (word/styles.xml) and "theme" (the theme's major/minor fonts);
+- .xlsx: "fonts" (the xl/styles.xml font table, i.e. workbook._fonts),
+  "rich_text" (<rFont> in shared strings and inline strings) and "theme";
+- .pptx: "latin", "ea" and "cs" (typefaces in slides, layouts, masters,
+  notes and charts) and "theme".
+
+Theme fonts only affect text that refers to them (asciiTheme, <scheme>,
+"+mn-lt", ...); ``theme_referenced`` records whether anything does.
+``uses_only(inventory, font)`` is the skip-if-already-uniform test used by
+``process_office_file(..., skip_uniform=True)``.
+"""
+import os
+import re
+import zipfile
+from collections import Counter, namedtuple
+
+from lxml import etree
+
+from font_mapping import SCRIPTS, FontMapping
+from ooxml_engines import (
+    DOCX_STORY_PARTS, DOCX_THEME_ATTRS, PPTX_TEXT_PARTS,
+    XLSX_RICH_TEXT_NEEDLE, _qn, member_contains
+)
+
+
+# ``locations`` maps a location to {font name: occurrences}; ``error`` holds
+# the message when the file could not be scanned (batch scans only).
+FontInventory = namedtuple(
+    "FontInventory", "path locations theme_referenced error",
+    defaults=(None,))
+
+_DOCX_FONT_ATTRS = tuple(_qn(a) for a in
+                         ("w:ascii", "w:hAnsi", "w:eastAsia", "w:cs"))
+_DOCX_THEME_QN = tuple(_qn(a) for a in DOCX_THEME_ATTRS)
+_PPTX_TYPEFACES = {_qn("a:latin"): "latin", _qn("a:ea"): "ea",
+                   _qn("a:cs"): "cs"}
+
+
+class _Found:
+    def __init__(self):
+        self.locations = {}
+        self.theme_referenced = False
+
+    def add(self, location, name):
+        if name:
+            self.locations.setdefault(location, Counter())[name] += 1
+
+
+def _iter_ends(src, tags):
+    """Elements of the (leaf) ``tags`` as they are parsed. Every element is
+    freed once it ends, so memory stays flat on multi-million-element parts
+    — which is also why scanners only look at leaves and their attributes.
+    """
+    for _event, elem in etree.iterparse(src, huge_tree=True):
+        if elem.tag in tags:
+            yield elem
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def _scan_docx_rfonts(location):
+    def scan(src, found):
+        for rfonts in _iter_ends(src, {_qn("w:rFonts")}):
+            for attr in _DOCX_FONT_ATTRS:
+                found.add(location, rfonts.get(attr))
+            if any(attr in rfonts.attrib for attr in _DOCX_THEME_QN):
+                found.theme_referenced = True
+    return scan
+
+
+def _scan_theme(src, found):
+    # A theme part is small: parse it whole
+    root = etree.parse(src).getroot()
+    for collection in root.iter(_qn("a:majorFont"), _qn("a:minorFont")):
+        for font in collection.iter(_qn("a:latin"), _qn("a:ea"),
+                                    _qn("a:cs"), _qn("a:font")):
+            found.add("theme", font.get("typeface"))
+
+
+def _scan_xlsx_styles(src, found):
+    # <name>/<scheme> only occur inside font definitions
+    name_tag, scheme_tag = _qn("x:name"), _qn("x:scheme")
+    for elem in _iter_ends(src, {name_tag, scheme_tag}):
+        if elem.tag == name_tag:
+            found.add("fonts", elem.get("val"))
+        else:
+            found.theme_referenced = True
+
+
+def _scan_xlsx_rich_text(src, found):
+    for rfont in _iter_ends(src, {_qn("x:rFont")}):
+        found.add("rich_text", rfont.get("val"))
+
+
+def _scan_pptx_typefaces(src, found):
+    for elem in _iter_ends(src, _PPTX_TYPEFACES):
+        typeface = elem.get("typeface", "")
+        if typeface.startswith("+"):
+            found.theme_referenced = True  # "+mn-lt", "+mj-ea", ...
+        else:
+            found.add(_PPTX_TYPEFACES[elem.tag], typeface)
+
+
+# Extension -> [(member pattern, scanner[, bytes the member must contain])]
+_SCANNERS = {
+    ".docx": [
+        (DOCX_STORY_PARTS, _scan_docx_rfonts("runs")),
+        (r"word/styles\.xml", _scan_docx_rfonts("styles")),
+        (r"word/theme/theme\d+\.xml", _scan_theme),
+    ],
+    ".xlsx": [
+        (r"xl/styles\.xml", _scan_xlsx_styles),
+        (r"xl/sharedStrings\.xml", _scan_xlsx_rich_text),
+        (r"xl/theme/theme\d+\.xml", _scan_theme),
+        # Inline rich text is rare: sheets are only parsed if they have any
+        (r"xl/worksheets/sheet\d+\.xml", _scan_xlsx_rich_text,
+         XLSX_RICH_TEXT_NEEDLE),
+    ],
+    ".pptx": [
+        (PPTX_TEXT_PARTS, _scan_pptx_typefaces),
+        (r"ppt/presentation\.xml", _scan_pptx_typefaces),
+        (r"ppt/theme/theme\d+\.xml", _scan_theme),
+    ],
+}
+
+
+def scan_fonts(path):
+    """Font inventory of one package. Raises ValueError on unsupported
+    extensions (same rule as process_office_file)."""
+    ext = os.path.splitext(path)[1].lower()
+    scanners = _SCANNERS.get(ext)
+    if scanners is None:
+        raise ValueError(f"Unsupported file type: {ext}")
+    scanners = [(re.compile(pattern), fn, *needle)
+                for pattern, fn, *needle in scanners]
+    found = _Found()
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            for pattern, scan, *needle in scanners:
+                if pattern.fullmatch(name):
+                    if not needle or member_contains(zf, name, needle[0]):
+                        with zf.open(name) as src:
+                            scan(src, found)
+                    break
+    locations = {location: dict(names)
+                 for location, names in found.locations.items()}
+    return FontInventory(path, locations, found.theme_referenced)
+
+
+def uses_only(inventory, font_name):
+    """True when every font the file can render with is ``font_name`` — or,
+    for a FontMapping, when it would not change any of them.
+
+    Theme fonts count only when something refers to the theme. False when
+    no font is named at all: the text renders in the application default,
+    which converting replaces with an explicit font.
+    """
+    names = {name for location, found in inventory.locations.items()
+             if location != "theme" or inventory.theme_referenced
+             for name in found}
+    if not names:
+        return False
+    if isinstance(font_name, FontMapping):
+        return not any(font_name.map(name, script) is not None
+                       for name in names for script in SCRIPTS)
+    return names == {font_name}
@@ -0,0 +1,417 @@
+"""Local HTTP conversion service (no Qt, standard library only).
+
+Usage:
+    python src/font_server.py [--host HOST] [--port PORT] [--font NAME]
+                              [--engine NAME] [--jobs N] [--queue-size N]
+                              [--timeout SECONDS] [--read-timeout SECONDS]
+                              [--max-mb MB]
+
+Endpoints:
+    POST /convert?filename=report.docx[&font=NAME][&engine=NAME]
+        Body: the raw .docx/.xlsx/.pptx bytes (``format=docx`` may replace
+        ``filename``). Returns the converted package; the file name in
+        Content-Disposition is ``report_modified.docx``.
+    GET /metrics    JSON counters, latency and current load
+    GET /health     200 "ok"
+
+Conversions run in memory (font_core.process_office_stream) on a process
+pool started — and warmed up, format libraries imported — before the first
+request is accepted. At most ``jobs`` files convert at once and ``queue``
+more may wait; beyond that requests get 503 with Retry-After. A request
+whose conversion exceeds ``timeout`` gets 504: the deadline is also handed
+to the worker as its cancel token, so the conversion stops at its next
+checkpoint instead of holding the worker. Bodies over ``max-mb`` get 413;
+a body is only read once its request holds a conversion slot, and a client
+that goes silent for ``read-timeout`` (headers or body) is dropped — with
+408 if it held a slot — so a stalled upload cannot pin one. If a worker
+process dies, its request gets 500 and the pool is restarted.
+Binds to 127.0.0.1 by default: this is a shared local service, not an
+internet-facing one.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from font_core import (
+    ENGINE_NAMES, SUPPORTED_EXTENSIONS, ProcessingCancelled, _changer_for,
+    output_path_for, process_office_stream
+)
+
+
+logger = logging.getLogger("font_server")
+
+DEFAULT_FONT = "Meiryo UI"
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_MAX_MB = 100
+
+CONTENT_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument."
+             "wordprocessingml.document",
+    ".xlsx": "application/vnd.openxmlformats-officedocument."
+             "spreadsheetml.sheet",
+    ".pptx": "application/vnd.openxmlformats-officedocument."
+             "presentationml.presentation",
+}
+
+# Time a worker gets past the deadline to reach its next checkpoint before
+# the request is answered with 504 regardless
+_GRACE_SECONDS = 1.0
+
+
+class _Deadline:
+    """Cancel token that is set once the wall-clock ``deadline`` passed
+    (picklable; time.time is shared by processes on the same box)."""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    def is_set(self):
+        return time.time() >= self.deadline
+
+
+def _warm_up():
+    """Pool initializer: pay the format-library imports before any request
+    (font_core imports them lazily on first dispatch)."""
+    import docx  # noqa: F401
+    import openpyxl  # noqa: F401
+    import pptx  # noqa: F401
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _ready():
+    return os.getpid()
+
+
+def _convert(data, ext, font_name, engine, deadline):
+    """Pool entry point: (seconds, converted bytes)."""
+    start = time.perf_counter()
+    output = process_office_stream(data, ext, font_name, engine,
+                                   cancel=_Deadline(deadline))
+    return time.perf_counter() - start, output
+
+
+def _content_disposition(filename):
+    """``attachment`` header value for any file name: control characters
+    (CR/LF would start a new header) are dropped, ``filename=`` gets an
+    ASCII stand-in and ``filename*=`` the UTF-8 name (RFC 5987)."""
+    filename = "".join(c for c in filename
+                       if unicodedata.category(c) != "Cc")
+    fallback = "".join(c if " " <= c < "\x7f" and c not in '"\\' else "_"
+                       for c in filename)
+    return (f'attachment; filename="{fallback}"; '
+            f"filename*=UTF-8''{quote(filename, safe='')}")
+
+
+class _HttpError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+
+class ServiceMetrics:
+    """Thread-safe counters for GET /metrics."""
+
+    STATUSES = ("ok", "bad_request", "too_large", "busy", "timeout",
+                "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self.requests = dict.fromkeys(self.STATUSES, 0)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.convert_seconds = 0.0
+        self.convert_max = 0.0
+        self.in_flight = 0
+
+    def record(self, status, bytes_in=0, bytes_out=0, seconds=None):
+        with self._lock:
+            self.requests[status] += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            if seconds is not None:
+                self.convert_seconds += seconds
+                self.convert_max = max(self.convert_max, seconds)
+
+    def admitted(self, delta):
+        with self._lock:
+            self.in_flight += delta
+
+    def snapshot(self):
+        with self._lock:
+            converted = self.requests["ok"]
+            return {
+                "uptime": time.time() - self._started,
+                "requests": dict(self.requests),
+                "total": sum(self.requests.values()),
+                "in_flight": self.in_flight,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "convert_seconds_total": self.convert_seconds,
+                "convert_seconds_avg": (self.convert_seconds / converted
+                                        if converted else 0.0),
+                "convert_seconds_max": self.convert_max,
+            }
+
+
+class FontServer(ThreadingHTTPServer):
+    """HTTP front end of a pre-warmed conversion pool."""
+    daemon_threads = True
+
+    def __init__(self, address, font_name=DEFAULT_FONT, engine="object",
+                 jobs=None, queue_size=None, convert_timeout=DEFAULT_TIMEOUT,
+                 max_bytes=DEFAULT_MAX_MB * 1024 ** 2,
+                 read_timeout=DEFAULT_READ_TIMEOUT):
+        self.font_name = font_name
+        self.engine = engine
+        self.jobs = jobs or os.cpu_count() or 1
+        self.capacity = self.jobs + (self.jobs if queue_size is None
+                                     else queue_size)
+        # not ``timeout``: BaseServer.timeout is handle_request()'s poll
+        self.convert_timeout = convert_timeout
+        self.read_timeout = read_timeout
+        self.max_bytes = max_bytes
+        self.metrics = ServiceMetrics()
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._pool_lock = threading.Lock()
+        self.pool = self._start_pool()
+        super().__init__(address, _Handler)
+
+    def _start_pool(self):
+        pool = ProcessPoolExecutor(max_workers=self.jobs,
+                                   initializer=_warm_up)
+        # One task per worker: every process is started (and has imported
+        # the format libraries) before the first request is accepted
+        for future in [pool.submit(_ready) for _ in range(self.jobs)]:
+            future.result()
+        return pool
+
+    def _restart_pool(self, broken):
+        """Replace ``broken`` (a worker died: the executor refuses all
+        further work) unless another request already did; the new pool."""
+        with self._pool_lock:
+            if self.pool is broken:
+                logger.warning("worker process died, restarting the pool")
+                self.pool = self._start_pool()
+                broken.shutdown(wait=False, cancel_futures=True)
+            return self.pool
+
+    def convert(self, read, ext, font_name, engine):
+        """Run one conversion on the pool; raises _HttpError on 500 (the
+        worker died), 503 and 504, and 408 when ``read()`` times out.
+
+        ``read()`` returns the upload: it is only called once a slot is
+        taken, so waiting and rejected requests hold no body in memory."""
+        if not self._slots.acquire(blocking=False):
+            raise _HttpError(503, "Server busy, retry later",
+                             [("Retry-After", "1")])
+        self.metrics.admitted(1)
+        try:
+            try:
+                data = read()
+            except TimeoutError:
+                raise _HttpError(408, "Timed out reading the upload")
+            args = (_convert, data, ext, font_name, engine,
+                    time.time() + self.convert_timeout)
+            pool = self.pool
+            try:
+                future = pool.submit(*args)
+            except BrokenProcessPool:
+                pool = self._restart_pool(pool)
+                future = pool.submit(*args)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the worker is really done, even when the
+        # client has already been answered with 504
+        future.add_done_callback(lambda _future: self._release())
+        try:
+            return future.result(self.convert_timeout + _GRACE_SECONDS)
+        except (FutureTimeout, ProcessingCancelled):
+            future.cancel()
+            raise _HttpError(
+                504, f"Conversion exceeded {self.convert_timeout}s")
+        except BrokenProcessPool:
+            # Not retried: the file may be what killed the worker
+            self._restart_pool(pool)
+            raise _HttpError(500, "Conversion worker exited unexpectedly")
+
+    def _release(self):
+        self.metrics.admitted(-1)
+        self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "font_server"
+
+    def setup(self):
+        # StreamRequestHandler applies ``timeout`` to the connection socket:
+        # every read (request line, headers, body) gives up after it
+        self.timeout = self.server.read_timeout
+        super().setup()
+
+    def log_message(self, format, *args):
+        logger.info("%s %s", self.address_string(), format % args)
+
+    def _send(self, status, body, content_type="text/plain; charset=utf-8",
+              headers=()):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/metrics":
+            snapshot = self.server.metrics.snapshot()
+            snapshot.update(jobs=self.server.jobs,
+                            capacity=self.server.capacity)
+            self._send(200, json.dumps(snapshot, indent=2),
+                       "application/json")
+        elif path == "/health":
+            self._send(200, "ok")
+        else:
+            self._send(404, "Not found")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/convert":
+            self._send(404, "Not found")
+            return
+        server = self.server
+        size, name = 0, None
+        try:
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            ext, name = self._format(params)
+            engine = params.get("engine", server.engine)
+            try:
+                _changer_for(ext, engine)
+            except ValueError as e:
+                raise _HttpError(400, str(e))
+            size = self._content_length()
+            seconds, output = server.convert(
+                lambda: self.rfile.read(size), ext,
+                params.get("font", server.font_name), engine)
+        except _HttpError as e:
+            status = {400: "bad_request", 408: "bad_request",
+                      411: "bad_request", 413: "too_large", 500: "failed",
+                      503: "busy", 504: "timeout"}
+            server.metrics.record(status[e.status], size)
+            if e.status in (408, 411, 413, 503):
+                self.close_connection = True  # body left (partly) unread
+            self._send(e.status, str(e), headers=e.headers)
+            return
+        except Exception as e:
+            server.metrics.record("failed", size)
+            logger.error("FAIL %s: %s", name, e)
+            self._send(422, f"Conversion failed: {e}")
+            return
+        filename = os.path.basename(output_path_for(name))
+        self._send(200, output, CONTENT_TYPES[ext.lower()], [
+            ("Content-Disposition", _content_disposition(filename))])
+        server.metrics.record("ok", size, len(output), seconds)
+
+    def _format(self, params):
+        """(extension, file name) from ?filename= or ?format=."""
+        name = params.get("filename")
+        if name:
+            ext = os.path.splitext(name)[1]
+        elif params.get("format"):
+            ext = "." + params["format"].lstrip(".")
+            name = "document" + ext
+        else:
+            raise _HttpError(400, "Missing ?filename= or ?format=")
+        if ext.lower() not in SUPPORTED_EXTENSIONS:
+            raise _HttpError(400, f"Unsupported file type: {ext}")
+        return ext, name
+
+    def _content_length(self):
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            raise _HttpError(411, "Content-Length required")
+        size = int(length)
+        if size > self.server.max_bytes:
+            raise _HttpError(
+                413, f"Upload exceeds {self.server.max_bytes} bytes")
+        return size
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog="font_server",
+        description="Serve .docx/.xlsx/.pptx font unification over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--font", default=DEFAULT_FONT,
+                        help="default target font (?font= overrides)")
+    parser.add_argument("--engine", choices=ENGINE_NAMES, default="object",
+                        help="default engine (?engine= overrides)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="requests waiting for a worker before 503 "
+                             "(default: jobs)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds per conversion before 504")
+    parser.add_argument("--read-timeout", type=float,
+                        default=DEFAULT_READ_TIMEOUT,
+                        help="seconds a client may stay silent while "
+                             "sending a request")
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_MB,
+                        help="largest accepted upload")
+    return parser
+
+
+def main(argv=None):
+    args = _build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(message)s")
+    if (args.jobs is not None and args.jobs < 1) or \
+            (args.queue_size is not None and args.queue_size < 0):
+        logger.error("--jobs must be at least 1, --queue-size at least 0")
+        return 2
+
+    server = FontServer((args.host, args.port), args.font, args.engine,
+                        args.jobs, args.queue_size, args.timeout,
+                        int(args.max_mb * 1024 ** 2), args.read_timeout)
+
+    def stop(*_):
+        # shutdown() waits for serve_forever: call it off the main thread
+        threading.Thread(target=server.shutdown).start()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    host, port = server.server_address[:2]
+    logger.info("serving on http://%s:%d (%d workers)", host, port,
+                server.jobs)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
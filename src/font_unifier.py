@@ -1,226 +1,294 @@
-import sys
-import os
+import hashlib
+import json
 import logging
+import os
+import sys
+import threading
+from collections import Counter
+from functools import partial
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QFileDialog, QMessageBox, QFrame,
-    QComboBox, QCompleter, QProgressBar, QStyle
+    QComboBox, QCompleter, QProgressBar, QStyle, QSpinBox, QTableWidget,
+    QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PyQt6.QtCore import (
+    Qt, QThread, pyqtSignal, QEvent, QObject, QRunnable, QThreadPool
+)
+from PyQt6.QtGui import QBrush, QColor, QFont, QFontDatabase
+
+from font_cli import collect_files
+from font_profile import Profiler
+# Core API re-exported for existing callers of font_unifier.*
+from font_core import (  # noqa: F401
+    FileResult, ProcessingCancelled, change_excel_font, change_ppt_font,
+    change_word_font, process_office_file, process_office_files,
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QEvent
-from PyQt6.QtGui import QFont, QFontDatabase
-from docx import Document
-from docx.oxml.ns import qn as docx_qn
-from openpyxl import load_workbook
-from pptx import Presentation
-from pptx.oxml.ns import qn as pptx_qn
-from lxml import etree
 
 
 logger = logging.getLogger(__name__)
 
 
-# --- Font helpers (handle East Asian / complex scripts) ---
-
-def _set_docx_run_font(run, font_name):
-    """Word: set latin + eastAsia + complex-script fonts on a run.
-
-    The theme-reference attributes (asciiTheme/eastAsiaTheme/cstheme/...) are
-    removed too: when they coexist with an explicit name, some viewers fall
-    back to the theme font instead of the explicit one (the same class of
-    issue as Excel's <scheme>).
-    """
-    rfonts = run._element.get_or_add_rPr().get_or_add_rFonts()
-    rfonts.set(docx_qn('w:ascii'), font_name)
-    rfonts.set(docx_qn('w:hAnsi'), font_name)
-    rfonts.set(docx_qn('w:eastAsia'), font_name)
-    rfonts.set(docx_qn('w:cs'), font_name)
-    for theme_attr in ('w:asciiTheme', 'w:hAnsiTheme',
-                       'w:eastAsiaTheme', 'w:cstheme'):
-        rfonts.attrib.pop(docx_qn(theme_attr), None)
-
-
-def _set_pptx_run_font(run, font_name):
-    """PowerPoint: set latin + eastAsian + complex-script typefaces on a run."""
-    # run.font.name への代入は rPr を確実に生成し、a:latin も設定する
-    run.font.name = font_name
-    rPr = run.font._rPr
-    for tag in ('a:latin', 'a:ea', 'a:cs'):
-        elem = rPr.find(pptx_qn(tag))
-        if elem is None:
-            elem = etree.SubElement(rPr, pptx_qn(tag))
-        elem.set('typeface', font_name)
-
-
-def _set_pptx_text_frame_fonts(text_frame, font_name):
-    """Apply the pptx font helper to every run in a text frame."""
-    for paragraph in text_frame.paragraphs:
-        for run in paragraph.runs:
-            _set_pptx_run_font(run, font_name)
-
+# --- Background worker (keeps the GUI responsive on large files) ---
 
-# --- Core Logic for Font Changing ---
+class FontProcessingWorker(QThread):
+    """Converts one file: started as a thread (``start()``), or driven by
+    a JobQueue's FileJob on a pool thread through ``convert()``."""
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(int)  # percent, emitted only when it changes
+    cancelled = pyqtSignal()
 
-def _set_docx_font(paragraphs, font_name):
-    """Apply the docx font helper to every run across the given paragraphs."""
-    for para in paragraphs:
-        for run in para.runs:
-            _set_docx_run_font(run, font_name)
+    def __init__(self, path, font_name, profile=None, cancel=None):
+        super().__init__()
+        self._path = path
+        self._font_name = font_name
+        # font_profile.Profiler; None reads the environment once, here
+        self._profile = Profiler.from_env() if profile is None else profile
+        # A shared token lets a batch cancel all of its workers at once
+        self._cancel = threading.Event() if cancel is None else cancel
+        self._percent = -1
+
+    def cancel(self):
+        """Ask the worker to stop at its next checkpoint (thread-safe)."""
+        self._cancel.set()
+
+    def _report(self, done, total):
+        percent = done * 100 // total if total else 100
+        if percent != self._percent:
+            self._percent = percent
+            self.progress.emit(percent)
+
+    def convert(self):
+        """Convert on the calling thread, emit the outcome's signal and
+        return it as (state, detail): ("done", output path), ("error",
+        message) or ("cancelled", "")."""
+        try:
+            output_path = process_office_file(
+                self._path, self._font_name,
+                progress=self._report, cancel=self._cancel,
+                profile=self._profile or False)
+        except ProcessingCancelled:
+            self.cancelled.emit()
+            return "cancelled", ""
+        except Exception as e:
+            self.error.emit(str(e))
+            return "error", str(e)
+        self.finished.emit(output_path)
+        return "done", output_path
 
+    def run(self):
+        self.convert()
 
-def _process_docx_container(container, font_name):
-    """Process paragraphs + tables of a body/header/footer/cell.
 
-    A cell may itself contain nested tables, so this recurses naturally via
-    _process_docx_table -> _process_docx_container.
-    """
-    _set_docx_font(container.paragraphs, font_name)
-    for table in getattr(container, 'tables', ()):
-        _process_docx_table(table, font_name)
+# --- Multi-file job queue (QThreadPool, bounded concurrency) ---
 
+DEFAULT_JOBS = min(4, os.cpu_count() or 1)
+MAX_JOBS = 32
+FINAL_STATES = ("done", "error", "cancelled")
 
-def _process_docx_table(table, font_name):
-    for row in table.rows:
-        for cell in row.cells:
-            _process_docx_container(cell, font_name)
 
+class FileJob(QRunnable):
+    """One file of a JobQueue batch, run on the queue's thread pool."""
 
-def change_word_font(path, font_name):
-    """Changes the font for all text in a .docx file.
+    def __init__(self, queue, row, path, font_name, cancel):
+        super().__init__()
+        self._queue = queue
+        self._row = row
+        self._path = path
+        self._font_name = font_name
+        self._cancel = cancel
 
-    Covers body paragraphs/tables (incl. nested tables) and per-section
-    headers/footers (default, first-page, even-page). Drawing text boxes
-    (<w:txbxContent>) are not covered — known limitation.
+    def run(self):
+        # シグナルは GUI スレッドの受信側へキュー接続で届く
+        state, detail = self._convert()
+        self._queue.job_changed.emit(self._row, state, detail)
+        self._queue._job_finished()
+
+    def _convert(self):
+        if self._cancel.is_set():
+            return "cancelled", ""
+        self._queue.job_changed.emit(self._row, "running", "")
+        worker = FontProcessingWorker(self._path, self._font_name,
+                                      self._queue.profile or False,
+                                      self._cancel)
+        # Direct: forwarded on this pool thread, queued from there to the
+        # queue's receivers like job_changed
+        worker.progress.connect(partial(self._queue.job_progress.emit,
+                                        self._row),
+                                Qt.ConnectionType.DirectConnection)
+        return worker.convert()
+
+
+class JobQueue(QObject):
+    """Converts a batch of files, at most ``max_jobs`` at a time.
+
+    Jobs wait in the pool's own queue, so hundreds of files cost no threads
+    up front. Each job reports only its state changes (queued -> running ->
+    done/error/cancelled) as ``job_changed(row, state, detail)``, where
+    detail is the output path or the error message; ``all_done`` follows the
+    last one. While a file converts, ``job_progress(row, percent)`` reports
+    its engine's progress (only when the percent changes); ``percent_done``
+    sums it over the batch, finished files counting 100.
+    ``profile`` (font_profile.Profiler) is handed to every conversion; None
+    reads the environment once, when the queue is created (ValueError on a
+    malformed value).
     """
-    doc = Document(path)
-    _process_docx_container(doc, font_name)
-    for section in doc.sections:
-        for part in (section.header, section.footer,
-                     section.first_page_header, section.first_page_footer,
-                     section.even_page_header, section.even_page_footer):
-            _process_docx_container(part, font_name)
-    return doc
-
-
-def _replace_all_fonts(workbook, font_name):
-    """Replace the name of every font definition in the workbook.
-
-    All cells, named styles and the default (Normal) style reference these
-    shared font definitions, so updating them in place covers the whole
-    workbook — including unstyled/empty cells that otherwise keep the old
-    default font across sheets. Other font attributes (size, bold, ...) are
-    preserved.
-
-    The ``scheme`` attribute (minor/major) is also cleared: when present,
-    Excel ignores the explicit <name> and renders text with the theme font
-    (e.g. the East-Asian minor font), so previously unstyled cells would
-    keep showing the old font even after the name was changed.
-
-    注意: workbook._fonts は openpyxl 3.x の非公開 API。依存バージョンは
-    requirements.txt で openpyxl==3.1.5 に固定済み。アップグレード時は再検証が必要。
+    job_changed = pyqtSignal(int, str, str)
+    job_progress = pyqtSignal(int, int)
+    all_done = pyqtSignal()
+
+    def __init__(self, max_jobs=DEFAULT_JOBS, parent=None, profile=None):
+        super().__init__(parent)
+        self.profile = Profiler.from_env() if profile is None else profile
+        self._pool = QThreadPool(self)
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.states = []
+        self.details = []
+        self.percents = []
+        self.percent_done = 0
+        self.set_max_jobs(max_jobs)
+        # Connected first, so other receivers see the updated bookkeeping
+        self.job_changed.connect(self._on_job_changed)
+        self.job_progress.connect(self._on_job_progress)
+
+    def set_max_jobs(self, max_jobs):
+        """Concurrency limit; may change while a batch runs."""
+        self._pool.setMaxThreadCount(max(1, max_jobs))
+
+    def is_running(self):
+        return self._pending > 0
+
+    def submit(self, paths, font_name):
+        """Queue every path (rows = indices into ``paths``)."""
+        if self.is_running():
+            raise RuntimeError("A batch is already running")
+        self._cancel = threading.Event()
+        self.states = ["queued"] * len(paths)
+        self.details = [""] * len(paths)
+        self.percents = [0] * len(paths)
+        self.percent_done = 0
+        self._pending = len(paths)
+        for row, path in enumerate(paths):
+            self._pool.start(
+                FileJob(self, row, path, font_name, self._cancel))
+        if not paths:
+            self.all_done.emit()
+
+    def cancel(self):
+        """Running jobs stop at their next checkpoint, queued ones skip."""
+        self._cancel.set()
+
+    def wait(self, msecs=-1):
+        return self._pool.waitForDone(msecs)
+
+    def counts(self):
+        return Counter(self.states)
+
+    def _job_finished(self):
+        # Called on the pool thread right after the job's final job_changed:
+        # emitting all_done from the same thread keeps it behind that state
+        # change in every receiver's event queue.
+        with self._lock:
+            self._pending -= 1
+            last = not self._pending
+        if last:
+            self.all_done.emit()
+
+    def _on_job_changed(self, row, state, detail):
+        self.states[row] = state
+        self.details[row] = detail
+        if state in FINAL_STATES:
+            self._on_job_progress(row, 100)
+
+    def _on_job_progress(self, row, percent):
+        self.percent_done += percent - self.percents[row]
+        self.percents[row] = percent
+
+
+# --- Font family cache (fast startup on machines with many fonts) ---
+
+# Not in font_cache's directory: every file there is a result entry that
+# --clear-cache and eviction may delete
+FONT_FAMILY_CACHE = os.path.join(os.path.expanduser("~"), ".cache",
+                                 "font_unifier_gui", "font_families.json")
+
+
+def _system_font_dirs():
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        local = os.environ.get("LOCALAPPDATA", "")
+        return [os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+                os.path.join(local, "Microsoft", "Windows", "Fonts")]
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/Library/Fonts",
+                os.path.join(home, "Library", "Fonts")]
+    return ["/usr/share/fonts", "/usr/local/share/fonts",
+            os.path.join(home, ".fonts"),
+            os.path.join(home, ".local", "share", "fonts")]
+
+
+def font_dirs_fingerprint(dirs=None):
+    """Hash of every font file's path, size and mtime in the font dirs.
+
+    Changes whenever a font is installed, removed or replaced; costs only
+    stat calls, so it is far cheaper than enumerating families.
     """
-    for font in workbook._fonts:
-        font.name = font_name
-        font.scheme = None
-
-
-def change_excel_font(path, font_name):
-    """Changes the font for all cells in a .xlsx file, preserving other style."""
-    workbook = load_workbook(path)
-    _replace_all_fonts(workbook, font_name)
-    return workbook
-
-
-def _process_chart_fonts(chart, font_name):
-    """Set fonts on a chart's title and axis titles.
-
-    Wrapped defensively: a malformed chart must never crash the whole file.
-    python-pptx exposes category_axis/value_axis (not x_axis/y_axis). Per-point
-    data-label fonts are not reliably settable, so they are skipped.
-    """
-    try:
-        if chart.has_title:
-            _set_pptx_text_frame_fonts(chart.chart_title.text_frame, font_name)
-        for axis_attr in ('category_axis', 'value_axis', 'series_axis'):
-            axis = getattr(chart, axis_attr, None)
-            if axis is not None and getattr(axis, 'has_title', False):
+    digest = hashlib.sha1()
+    for directory in _system_font_dirs() if dirs is None else dirs:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
                 try:
-                    _set_pptx_text_frame_fonts(
-                        axis.axis_title.text_frame, font_name)
-                except Exception:
-                    logger.debug("chart axis font failed", exc_info=True)
-    except Exception:
-        logger.debug("chart font failed", exc_info=True)
-
-
-def _process_ppt_shape(shape, font_name):
-    """Recursively processes text in a shape, including nested groups."""
-    if getattr(shape, 'has_text_frame', False):
-        _set_pptx_text_frame_fonts(shape.text_frame, font_name)
-    if getattr(shape, 'has_table', False):
-        for row in shape.table.rows:
-            for cell in row.cells:
-                _set_pptx_text_frame_fonts(cell.text_frame, font_name)
-    if getattr(shape, 'has_chart', False):
-        _process_chart_fonts(shape.chart, font_name)
-    if getattr(shape, 'has_group', False):
-        for sub_shape in shape.shapes:
-            _process_ppt_shape(sub_shape, font_name)
-
-
-def change_ppt_font(path, font_name):
-    """Changes the font for all text in a .pptx file.
-
-    Covers text frames, tables, charts (title/axes) and nested groups.
-    """
-    prs = Presentation(path)
-    for slide in prs.slides:
-        for shape in slide.shapes:
-            _process_ppt_shape(shape, font_name)
-    return prs
-
-
-# Extension -> handler (case-insensitive dispatch in process_office_file)
-_FONT_CHANGERS = {
-    ".docx": change_word_font,
-    ".xlsx": change_excel_font,
-    ".pptx": change_ppt_font,
-}
-
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                digest.update(
+                    f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
 
-def process_office_file(path, font_name):
-    """Process a single Office file and save the modified copy.
 
-    Returns the output path. Raises ValueError on unsupported extensions.
-    Case-insensitive on the extension.
-    """
-    root, ext = os.path.splitext(path)
-    output_path = f"{root}_modified{ext}"
+def load_cached_families(path=FONT_FAMILY_CACHE):
+    """Returns (fingerprint, families); (None, []) when missing/corrupt."""
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        return data["fingerprint"], list(data["families"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, []
 
-    changer = _FONT_CHANGERS.get(ext.lower())
-    if changer is None:
-        raise ValueError(f"Unsupported file type: {ext}")
-    changer(path, font_name).save(output_path)
-    return output_path
 
+def save_cached_families(fingerprint, families, path=FONT_FAMILY_CACHE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump({"fingerprint": fingerprint, "families": families}, fh,
+                  ensure_ascii=False)
+    os.replace(tmp_path, path)
 
-# --- Background worker (keeps the GUI responsive on large files) ---
 
-class FontProcessingWorker(QThread):
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
+class FontFamilyLoader(QThread):
+    """Re-enumerates font families only if the font dirs changed."""
+    loaded = pyqtSignal(list)
 
-    def __init__(self, path, font_name):
+    def __init__(self, cached_fingerprint):
         super().__init__()
-        self._path = path
-        self._font_name = font_name
+        self._cached_fingerprint = cached_fingerprint
 
     def run(self):
+        fingerprint = font_dirs_fingerprint()
+        if fingerprint == self._cached_fingerprint:
+            return
+        families = QFontDatabase.families()
         try:
-            output_path = process_office_file(self._path, self._font_name)
-            self.finished.emit(output_path)
-        except Exception as e:
-            self.error.emit(str(e))
+            save_cached_families(fingerprint, families)
+        except OSError:
+            logger.debug("font family cache not written", exc_info=True)
+        self.loaded.emit(families)
 
 
 # --- UI Styling ---
@@ -249,6 +317,14 @@ STATUS_COLORS = {
     "error": ("#FEE2E2", "#991B1B"),
     "info": ("#DBEAFE", "#1E40AF"),
 }
+# job state -> (label, status kind of its color)
+JOB_STATES = {
+    "queued": ("Queued", None),
+    "running": ("Processing...", "info"),
+    "done": ("Done", "success"),
+    "error": ("Failed", "error"),
+    "cancelled": ("Cancelled", None),
+}
 
 
 def _color_qss(selector, prop, colors):
@@ -312,7 +388,7 @@ QPushButton#ghost {{
 }}
 QPushButton#ghost:hover {{ background: {GHOST_HOVER}; }}
 
-QLineEdit, QComboBox {{
+QLineEdit, QComboBox, QSpinBox {{
     background: {CARD};
     border: 1px solid {BORDER};
     border-radius: 6px;
@@ -321,7 +397,9 @@ QLineEdit, QComboBox {{
     selection-background-color: {ACCENT};
     selection-color: #FFFFFF;
 }}
-QLineEdit:focus, QComboBox:focus {{ border: 1px solid {ACCENT}; }}
+QLineEdit:focus, QComboBox:focus, QSpinBox:focus {{
+    border: 1px solid {ACCENT};
+}}
 QLineEdit:disabled {{ color: {MUTED}; }}
 QComboBox::drop-down {{ border: none; width: 20px; }}
 QComboBox QAbstractItemView {{
@@ -332,6 +410,21 @@ QComboBox QAbstractItemView {{
     outline: none;
 }}
 
+QTableWidget#jobTable {{
+    background: {CARD};
+    border: 1px solid {BORDER};
+    border-radius: 6px;
+    gridline-color: {BORDER};
+    color: {TEXT};
+}}
+QHeaderView::section {{
+    background: {FILE_CARD_BG};
+    color: {MUTED};
+    border: none;
+    border-bottom: 1px solid {BORDER};
+    padding: 4px 8px;
+}}
+
 QProgressBar {{
     background: {BORDER};
     border: none;
@@ -352,15 +445,18 @@ QLabel#statusLabel {{
 # --- GUI Application ---
 
 class FontUnifierApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, profile=None):
         super().__init__()
         self.setWindowTitle("Font Unifier")
-        self.resize(620, 520)
-        self.setMinimumSize(560, 480)
+        self.resize(620, 640)
+        self.setMinimumSize(560, 560)
 
-        self.file_path = ""
+        self.file_paths = []
         self.font_name = "Meiryo UI"
-        self._worker = None
+        self._queue = JobQueue(DEFAULT_JOBS, self, profile)
+        self._queue.job_changed.connect(self._on_job_changed)
+        self._queue.job_progress.connect(self._on_job_progress)
+        self._queue.all_done.connect(self._on_all_done)
 
         central = QWidget()
         central.setObjectName("central")
@@ -412,6 +508,13 @@ class FontUnifierApp(QMainWindow):
         browse_button.setCursor(Qt.CursorShape.PointingHandCursor)
         browse_button.clicked.connect(self.browse_file)
         file_head.addWidget(browse_button)
+        folder_button = QPushButton("Folder…")
+        folder_button.setObjectName("ghost")
+        folder_button.setIcon(self.style().standardIcon(
+            QStyle.StandardPixmap.SP_DirOpenIcon))
+        folder_button.setCursor(Qt.CursorShape.PointingHandCursor)
+        folder_button.clicked.connect(self.browse_folder)
+        file_head.addWidget(folder_button)
         file_inner.addLayout(file_head)
 
         file_row = QHBoxLayout()
@@ -423,7 +526,23 @@ class FontUnifierApp(QMainWindow):
         self.file_entry.setPlaceholderText("未选择文件")
         file_row.addWidget(self.file_entry, 1)
         file_inner.addLayout(file_row)
-        layout.addWidget(file_card)
+
+        # ファイルごとの状態（数百件でも行単位の更新のみで軽い）
+        self.job_table = QTableWidget(0, 2)
+        self.job_table.setObjectName("jobTable")
+        self.job_table.setHorizontalHeaderLabels(["File", "Status"])
+        header = self.job_table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(
+            1, QHeaderView.ResizeMode.ResizeToContents)
+        self.job_table.verticalHeader().setVisible(False)
+        self.job_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.job_table.setSelectionMode(
+            QAbstractItemView.SelectionMode.NoSelection)
+        self.job_table.setVisible(False)
+        file_inner.addWidget(self.job_table, 1)
+        layout.addWidget(file_card, 1)
 
         # Font row
         font_row = QHBoxLayout()
@@ -432,36 +551,60 @@ class FontUnifierApp(QMainWindow):
         font_row.addWidget(font_label)
         self.font_entry = QComboBox()
         self.font_entry.setEditable(True)
-        font_families = QFontDatabase.families()
-        self.font_entry.addItems(font_families)
-        default = self.font_name if self.font_name in font_families else (
-            font_families[0] if font_families else "")
-        self.font_entry.setCurrentText(default)
+        # キャッシュ済みの一覧で即座に表示し、フォント構成が変わっていれば
+        # バックグラウンドで再列挙して差し替える（大量のフォントでも起動が速い）
+        cached_fingerprint, font_families = load_cached_families()
         # 入力時に前方一致で候補をポップアップ表示（大小区別なし）
-        completer = QCompleter(font_families, self)
+        completer = QCompleter([], self)
         completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
         completer.setFilterMode(Qt.MatchFlag.MatchStartsWith)
         completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
         self.font_entry.setCompleter(completer)
+        self._apply_font_families(font_families)
+        self._font_loader = FontFamilyLoader(cached_fingerprint)
+        self._font_loader.loaded.connect(self._apply_font_families)
+        self._font_loader.start()
         # 入力欄のクリックでドロップダウンを開く（Excel のフォント選択と同様の挙動）
         self.font_entry.lineEdit().installEventFilter(self)
         font_row.addWidget(self.font_entry, 1)
         layout.addLayout(font_row)
 
-        # Progress (busy spinner, hidden until processing)
+        # Concurrency limit (applies immediately, also to a running batch)
+        jobs_row = QHBoxLayout()
+        jobs_label = self._muted_label("并发数")
+        jobs_label.setFixedWidth(80)
+        jobs_row.addWidget(jobs_label)
+        self.jobs_entry = QSpinBox()
+        self.jobs_entry.setRange(1, MAX_JOBS)
+        self.jobs_entry.setValue(DEFAULT_JOBS)
+        self.jobs_entry.valueChanged.connect(self._queue.set_max_jobs)
+        jobs_row.addWidget(self.jobs_entry)
+        jobs_row.addStretch()
+        layout.addLayout(jobs_row)
+
+        # Progress (finished files of the batch, hidden until processing)
         self.progress = QProgressBar()
         self.progress.setTextVisible(False)
-        self.progress.setRange(0, 0)
+        self.progress.setRange(0, 100)
         self.progress.setVisible(False)
         layout.addWidget(self.progress)
 
         # Action
+        action_row = QHBoxLayout()
+        action_row.addStretch()
         self.start_button = QPushButton("Start Processing")
         self.start_button.setObjectName("primary")
         self.start_button.setCursor(Qt.CursorShape.PointingHandCursor)
         self.start_button.clicked.connect(self.process_file)
-        layout.addWidget(self.start_button,
-                         alignment=Qt.AlignmentFlag.AlignCenter)
+        action_row.addWidget(self.start_button)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setObjectName("ghost")
+        self.cancel_button.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.cancel_button.clicked.connect(self.cancel_processing)
+        self.cancel_button.setVisible(False)
+        action_row.addWidget(self.cancel_button)
+        action_row.addStretch()
+        layout.addLayout(action_row)
 
         # Status
         self.status_label = QLabel("")
@@ -471,21 +614,32 @@ class FontUnifierApp(QMainWindow):
         layout.addWidget(self.status_label,
                          alignment=Qt.AlignmentFlag.AlignCenter)
 
-        layout.addStretch()
-
     def _muted_label(self, text):
         label = QLabel(text)
         label.setStyleSheet(f"color: {MUTED}; font-weight: bold;")
         return label
 
+    def _apply_font_families(self, families):
+        current = self.font_entry.currentText() or self.font_name
+        self.font_entry.clear()
+        self.font_entry.addItems(families)
+        self.font_entry.completer().model().setStringList(families)
+        # 既定フォントが未インストールなら先頭のフォントを選ぶ（ユーザー入力は保持）
+        if current == self.font_name and current not in families and families:
+            current = families[0]
+        self.font_entry.setCurrentText(current)
+
     def _finish_processing(self):
         self.progress.setVisible(False)
+        self.cancel_button.setVisible(False)
         self.start_button.setEnabled(True)
 
     def closeEvent(self, event):
-        # 処理中にウィンドウを閉じた場合、スレッド終了を待ってから破棄する
-        if self._worker is not None and self._worker.isRunning():
-            self._worker.wait(5000)
+        # 処理中にウィンドウを閉じた場合、キャンセルを要求しスレッド終了を待ってから破棄する
+        if self._queue.is_running():
+            self._queue.cancel()
+            self._queue.wait(5000)
+        self._font_loader.wait(5000)
         event.accept()
 
     def eventFilter(self, obj, event):
@@ -506,6 +660,7 @@ class FontUnifierApp(QMainWindow):
 
     def browse_file(self):
         file_dialog = QFileDialog(self)
+        file_dialog.setFileMode(QFileDialog.FileMode.ExistingFiles)
         file_dialog.setNameFilters([
             "Office Files (*.docx *.xlsx *.pptx)",
             "Word Documents (*.docx)",
@@ -514,17 +669,53 @@ class FontUnifierApp(QMainWindow):
             "All files (*.*)"
         ])
         if file_dialog.exec():
-            selected_files = file_dialog.selectedFiles()
-            if selected_files:
-                self.file_path = selected_files[0]
-                self.file_entry.setText(self.file_path)
-                self._set_status("", "idle")
+            self.set_files(file_dialog.selectedFiles())
+
+    def browse_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder")
+        if folder:
+            # 再帰的に探索（ロックファイルと *_modified 出力は除外）
+            paths = collect_files([folder])
+            if not paths:
+                QMessageBox.information(
+                    self, "No Files",
+                    "No .docx/.xlsx/.pptx files found in: " + folder)
+                return
+            self.set_files(paths)
+
+    def set_files(self, paths):
+        """Replace the selection; one table row per file."""
+        if not paths or self._queue.is_running():
+            return
+        self.file_paths = list(paths)
+        if len(self.file_paths) == 1:
+            self.file_entry.setText(self.file_paths[0])
+        else:
+            self.file_entry.setText(f"{len(self.file_paths)} files")
+        self.job_table.setUpdatesEnabled(False)
+        self.job_table.setRowCount(len(self.file_paths))
+        for row, path in enumerate(self.file_paths):
+            item = QTableWidgetItem(os.path.basename(path))
+            item.setToolTip(path)
+            self.job_table.setItem(row, 0, item)
+            self.job_table.setItem(row, 1, QTableWidgetItem(""))
+        self.job_table.setUpdatesEnabled(True)
+        self.job_table.setVisible(True)
+        self._set_status("", "idle")
+
+    def _set_job_state(self, row, state, detail=""):
+        label, kind = JOB_STATES[state]
+        item = self.job_table.item(row, 1)
+        item.setText(label)
+        item.setToolTip(detail)
+        item.setForeground(QBrush(QColor(
+            STATUS_COLORS[kind][1] if kind else MUTED)))
 
     def process_file(self):
-        path = self.file_path
+        paths = self.file_paths
         font = self.font_entry.currentText()
 
-        if not path:
+        if not paths:
             QMessageBox.critical(self, "Error", "Please select a file first.")
             return
         if not font:
@@ -532,34 +723,83 @@ class FontUnifierApp(QMainWindow):
                                  "Please enter a target font name.")
             return
 
-        self._set_status("Processing...", "info")
+        self._set_status(f"Processing {len(paths)} file(s)...", "info")
+        # Determinate over the whole batch: every file counts 0-100
+        self.progress.setRange(0, 100 * len(paths))
+        self.progress.setValue(0)
         self.progress.setVisible(True)
         self.start_button.setEnabled(False)
-
-        self._worker = FontProcessingWorker(path, font)
-        self._worker.finished.connect(self._on_processing_finished)
-        self._worker.error.connect(self._on_processing_error)
-        self._worker.start()
-
-    def _on_processing_finished(self, output_path):
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(True)
+
+        self.job_table.setUpdatesEnabled(False)
+        for row in range(len(paths)):
+            self._set_job_state(row, "queued")
+        self.job_table.setUpdatesEnabled(True)
+        self._queue.submit(paths, font)
+
+    def cancel_processing(self):
+        if self._queue.is_running():
+            self._queue.cancel()
+            self.cancel_button.setEnabled(False)
+            self._set_status("Cancelling...", "info")
+
+    def _on_job_changed(self, row, state, detail):
+        self._set_job_state(row, state, detail)
+        self.progress.setValue(self._queue.percent_done)
+
+    def _on_job_progress(self, row, percent):
+        if self._queue.states[row] == "running":
+            self.job_table.item(row, 1).setText(
+                f"{JOB_STATES['running'][0]} {percent}%")
+        self.progress.setValue(self._queue.percent_done)
+
+    def _on_all_done(self):
         self._finish_processing()
-        self._set_status(f"Success! Saved to {output_path}", "success")
-        QMessageBox.information(
-            self, "Success",
-            "File processed successfully and saved as: " + output_path)
-
-    def _on_processing_error(self, message):
-        self._finish_processing()
-        self._set_status("An error occurred.", "error")
-        QMessageBox.critical(
-            self, "Error",
-            "An error occurred during processing: " + message)
+        counts = self._queue.counts()
+        if len(self._queue.states) == 1:
+            self._report_single(self._queue.states[0],
+                                self._queue.details[0])
+            return
+        summary = (f"{counts['done']} succeeded, {counts['error']} failed, "
+                   f"{counts['cancelled']} cancelled.")
+        if counts["error"]:
+            self._set_status(summary, "error")
+            QMessageBox.warning(
+                self, "Finished with Errors",
+                summary + " Hover over a failed file to see its error.")
+        elif counts["cancelled"]:
+            self._set_status(summary, "info")
+        else:
+            self._set_status(summary, "success")
+            QMessageBox.information(
+                self, "Success",
+                f"All {counts['done']} files processed successfully.")
+
+    def _report_single(self, state, detail):
+        if state == "done":
+            self._set_status(f"Success! Saved to {detail}", "success")
+            QMessageBox.information(
+                self, "Success",
+                "File processed successfully and saved as: " + detail)
+        elif state == "cancelled":
+            self._set_status("Cancelled. No file was written.", "info")
+        else:
+            self._set_status("An error occurred.", "error")
+            QMessageBox.critical(
+                self, "Error",
+                "An error occurred during processing: " + detail)
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyleSheet(APP_QSS)
     app.setFont(QFont("Segoe UI", 10))
-    window = FontUnifierApp()
+    try:
+        profile = Profiler.from_env()
+    except ValueError as e:
+        QMessageBox.critical(None, "Error", str(e))
+        sys.exit(2)
+    window = FontUnifierApp(profile or False)
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,372 @@
+"""Post-conversion check of .docx/.xlsx/.pptx packages (no Qt).
+
+``verify_fonts(path, font_name)`` streams the font-bearing parts of a
+converted package — read-only, never the object model — and reports every
+font reference that still resolves to something other than the target:
+
+- "font": an explicit name (w:rFonts, the xlsx font table and rich-text
+  <rFont>, a:latin/a:ea/a:cs in slides, masters, charts and text boxes);
+- "theme": a theme reference (asciiTheme=..., "+mn-lt", ...) whose theme
+  font is not the target;
+- "scheme": an xlsx <scheme> (the cell uses the theme font instead of its
+  <name>) whose theme font is not the target.
+
+Each FontIssue names the zip member and where in it the reference sits,
+e.g. ``table 1 / row 2 / cell 1 / text box 1 / paragraph 1 / rPr``:
+the enclosing paragraphs, tables, shapes, cells, ... numbered among their
+siblings of the same kind (from 1), then the element holding the font.
+Names shadowed by a theme reference (w:ascii next to w:asciiTheme) are not
+rendered and not reported. With a FontMapping, a name counts as converted
+when the mapping would leave it alone.
+
+Style and default parts (word/styles.xml; pptx masters, layouts and the
+presentation's default text style) only reach text that does not name its
+own fonts: they are checked when some run of the package leaves a script
+unset (the object and xml engines set every script of every run, so their
+untouched styles are not reported).
+
+A package may have several themes (one per pptx master); a reference is
+reported when the slot it names is not the target in any of them.
+"""
+import os
+import re
+import zipfile
+from collections import namedtuple
+from itertools import chain
+
+from lxml import etree
+
+from font_mapping import FontMapping
+from ooxml_engines import (
+    _DOCX_SCRIPT_ATTRS, _PPTX_SCRIPT_TAGS, DOCX_STORY_PARTS,
+    XLSX_RICH_TEXT_NEEDLE, _qn, _theme_font_script, member_contains
+)
+
+
+# Issues kept per file; ``total`` still counts every one found
+DEFAULT_LIMIT = 100
+
+# ``kind`` is "font", "theme" or "scheme"; ``reference`` is the attribute
+# or element as written ('w:eastAsia', 'a:latin typeface="+mn-lt"', ...)
+# and ``font`` the font it resolves to.
+FontIssue = namedtuple("FontIssue", "part location kind reference font")
+
+# ``issues`` holds the first ``limit`` issues, ``total`` counts them all;
+# ``error`` holds the message when the file could not be read (batches).
+VerifyResult = namedtuple("VerifyResult", "path issues total error",
+                          defaults=(None,))
+
+_THEME_PARTS = re.compile(r"(word|xl|ppt)/theme/theme\d+\.xml")
+
+# "minorHAnsi" -> ("minor", "latin"), ...
+_DOCX_THEME_SLOTS = {
+    slot + suffix: (slot, script)
+    for slot in ("major", "minor")
+    for suffix, script in (("Ascii", "latin"), ("HAnsi", "latin"),
+                           ("EastAsia", "east_asia"), ("Bidi", "cs"))
+}
+# "+mn-lt" -> ("minor", "latin"), ...
+_PPTX_THEME_SLOTS = {
+    f"+{abbr}-{code}": (slot, script)
+    for abbr, slot in (("mj", "major"), ("mn", "minor"))
+    for code, script in (("lt", "latin"), ("ea", "east_asia"), ("cs", "cs"))
+}
+
+
+class _Target:
+    """The target font (or mapping), the package's theme fonts and whether
+    any run inherits a font from styles or defaults."""
+
+    def __init__(self, font_name):
+        self.mapping = (font_name if isinstance(font_name, FontMapping)
+                        else None)
+        self.font_name = font_name
+        self.theme = {}      # ("major"|"minor", script) -> [typeface, ...]
+        self.inherited = False
+
+    def off(self, name, script):
+        """True when ``name`` is a font the conversion should have
+        replaced."""
+        if not name:
+            return False
+        if self.mapping is not None:
+            return self.mapping.map(name, script) is not None
+        return name != self.font_name
+
+    def add_theme(self, src):
+        # A theme part is small: parse it whole
+        root = etree.parse(src).getroot()
+        for slot, tag in (("major", "a:majorFont"), ("minor", "a:minorFont")):
+            for collection in root.iter(_qn(tag)):
+                for font in collection.iter(_qn("a:latin"), _qn("a:ea"),
+                                            _qn("a:cs"), _qn("a:font")):
+                    key = (slot, _theme_font_script(font))
+                    self.theme.setdefault(key, []).append(
+                        font.get("typeface"))
+
+    def theme_font(self, slot):
+        """First font of a theme slot that is not converted, or None."""
+        return next((name for name in self.theme.get(slot, ())
+                     if self.off(name, slot[1])), None)
+
+
+# (name attribute, theme attribute, script, both as written)
+_RFONTS_ATTRS = tuple((_qn(attr), _qn(theme_attr), script, attr, theme_attr)
+                      for attr, theme_attr, script in _DOCX_SCRIPT_ATTRS)
+
+
+def _check_rfonts(rfonts, target):
+    attrib = rfonts.attrib
+    for attr, theme_attr, script, attr_name, theme_name in _RFONTS_ATTRS:
+        value = attrib.get(theme_attr)
+        if value is None:
+            name = attrib.get(attr)
+            if target.off(name, script):
+                yield "font", attr_name, name
+            continue
+        slot = _DOCX_THEME_SLOTS.get(value)
+        font = slot and target.theme_font(slot)
+        if font:
+            yield "theme", f'{theme_name}="{value}"', font
+
+
+def _check_typeface(elem, target):
+    typeface = elem.get("typeface", "")
+    tag = "a:" + etree.QName(elem).localname
+    if typeface.startswith("+"):
+        slot = _PPTX_THEME_SLOTS.get(typeface)
+        font = slot and target.theme_font(slot)
+        if font:
+            yield "theme", f'{tag} typeface="{typeface}"', font
+    elif target.off(typeface, _PPTX_SCRIPT_TAGS[elem.tag]):
+        yield "font", tag, typeface
+
+
+def _check_xlsx_name(elem, target):
+    # <name> in the font table, <rFont> in rich-text runs
+    name = elem.get("val")
+    if target.off(name, "latin"):
+        yield "font", "x:" + etree.QName(elem).localname, name
+
+
+def _check_xlsx_scheme(scheme, target):
+    value = scheme.get("val")
+    font = (target.theme_font((value, "latin"))
+            if value in ("major", "minor") else None)
+    if font:
+        yield "scheme", f'x:scheme="{value}"', font
+
+
+_W_RFONTS = _qn("w:rFonts")
+_W_RPR_RFONTS = f"{_qn('w:rPr')}/{_W_RFONTS}"
+
+
+def _docx_run_inherits(r):
+    rfonts = r.find(_W_RPR_RFONTS)
+    if rfonts is None:
+        return True
+    attrib = rfonts.attrib
+    return any(attr not in attrib and theme_attr not in attrib
+               for attr, theme_attr, *_names in _RFONTS_ATTRS)
+
+
+def _pptx_run_inherits(r):
+    rpr = r.find(_qn("a:rPr"))
+    return rpr is None or len(list(rpr.iterchildren(*_PPTX_SCRIPT_TAGS))) < 3
+
+
+_TYPEFACE_CHECKS = dict.fromkeys(_PPTX_SCRIPT_TAGS, _check_typeface)
+
+
+def _named(label):
+    return lambda _elem: label
+
+
+# Elements that locate a reference: tag -> label, numbered among siblings
+# of the same label, or a function naming the element itself
+_DRAWING_ANCHORS = {
+    _qn("p:sp"): "shape", _qn("p:grpSp"): "group",
+    _qn("p:graphicFrame"): "graphic frame", _qn("p:cxnSp"): "connector",
+    _qn("p:titleStyle"): _named("title style"),
+    _qn("p:bodyStyle"): _named("body style"),
+    _qn("p:otherStyle"): _named("other style"),
+    _qn("p:defaultTextStyle"): _named("default text style"),
+    _qn("a:lstStyle"): _named("list style"),
+    **{_qn(f"a:lvl{n}pPr"): _named(f"level {n}") for n in range(1, 10)},
+    _qn("a:tbl"): "table", _qn("a:tr"): "row", _qn("a:tc"): "cell",
+    _qn("a:p"): "paragraph", _qn("a:r"): "run", _qn("a:fld"): "field",
+    # Charts: titles, axes, legend, series and their labels
+    _qn("c:title"): "title", _qn("c:legend"): _named("legend"),
+    _qn("c:catAx"): "axis", _qn("c:valAx"): "axis", _qn("c:dateAx"): "axis",
+    _qn("c:serAx"): "axis", _qn("c:ser"): "series",
+    _qn("c:dLbls"): _named("data labels"),
+}
+_DOCX_ANCHORS = {
+    _qn("w:p"): "paragraph", _qn("w:r"): "run", _qn("w:tbl"): "table",
+    _qn("w:tr"): "row", _qn("w:tc"): "cell",
+    _qn("w:txbxContent"): "text box",
+    _qn("w:footnote"): "footnote", _qn("w:endnote"): "endnote",
+    **_DRAWING_ANCHORS,
+}
+_DOCX_STYLE_ANCHORS = {
+    _qn("w:docDefaults"): _named("document defaults"),
+    _qn("w:style"): lambda style: "style " + style.get(_qn("w:styleId"), ""),
+}
+
+# (anchors, {leaf tag: check(elem, target) -> (kind, reference, font)...},
+#  {run tag: True when the run inherits a font})
+_PPTX_RUNS = dict.fromkeys((_qn("a:r"), _qn("a:fld")), _pptx_run_inherits)
+_DOCX_STORY = (_DOCX_ANCHORS,
+               {_W_RFONTS: _check_rfonts, **_TYPEFACE_CHECKS},
+               {_qn("w:r"): _docx_run_inherits})
+_DOCX_STYLES = (_DOCX_STYLE_ANCHORS, {_W_RFONTS: _check_rfonts}, {})
+_DRAWING = (_DRAWING_ANCHORS, _TYPEFACE_CHECKS, _PPTX_RUNS)
+_XLSX_STYLES = ({_qn("x:font"): "font", _qn("x:dxf"): "dxf"},
+                {_qn("x:name"): _check_xlsx_name,
+                 _qn("x:scheme"): _check_xlsx_scheme}, {})
+_XLSX_RICH_TEXT_CHECKS = {_qn("x:rFont"): _check_xlsx_name,
+                          _qn("x:scheme"): _check_xlsx_scheme}
+_XLSX_SHARED_STRINGS = ({_qn("x:si"): "string", _qn("x:r"): "run"},
+                        _XLSX_RICH_TEXT_CHECKS, {})
+_XLSX_SHEET = ({_qn("x:c"): lambda cell: "cell " + cell.get("r", ""),
+                _qn("x:r"): "run"},
+               _XLSX_RICH_TEXT_CHECKS, {})
+
+_CHART_NEEDLE = b"typeface"
+
+# Extension -> [(member pattern, part spec[, bytes the member must contain])]
+_PARTS = {
+    ".docx": [
+        (DOCX_STORY_PARTS, _DOCX_STORY),
+        (r"word/charts/chart\d+\.xml", _DRAWING, _CHART_NEEDLE),
+    ],
+    ".xlsx": [
+        (r"xl/styles\.xml", _XLSX_STYLES),
+        (r"xl/sharedStrings\.xml", _XLSX_SHARED_STRINGS),
+        (r"xl/worksheets/sheet\d+\.xml", _XLSX_SHEET, XLSX_RICH_TEXT_NEEDLE),
+        (r"xl/charts/chart\d+\.xml", _DRAWING, _CHART_NEEDLE),
+    ],
+    ".pptx": [
+        (r"ppt/(slides/slide|notesSlides/notesSlide|charts/chart)\d+\.xml",
+         _DRAWING),
+    ],
+}
+# Style and default parts: checked once a run inherits from them
+_DEFAULT_PARTS = {
+    ".docx": [
+        (r"word/styles\.xml", _DOCX_STYLES),
+    ],
+    ".xlsx": [],
+    ".pptx": [
+        (r"ppt/(slideLayouts/slideLayout|slideMasters/slideMaster"
+         r"|notesMasters/notesMaster)\d+\.xml", _DRAWING),
+        (r"ppt/presentation\.xml", _DRAWING),
+    ],
+}
+
+
+def _iter_leaves(src, anchors, leaves):
+    """(event, element, open anchors) for every leaf of a streamed part, at
+    its start tag (attributes are parsed, children are not), and for every
+    anchor at its end tag (complete).
+
+    Only anchors and leaves produce parser events; an anchor is freed once
+    it ends, with the finished siblings before it, so memory stays flat on
+    multi-million-element parts.
+    """
+    frames = [("", {})]     # (name, label -> siblings seen) per open anchor
+    for event, elem in etree.iterparse(
+            src, events=("start", "end"), tag=(*anchors, *leaves),
+            huge_tree=True):
+        label = anchors.get(elem.tag)
+        if label is None:
+            if event == "start":
+                yield event, elem, frames
+        elif event == "start":
+            if callable(label):
+                name = label(elem)
+            else:
+                seen = frames[-1][1]
+                n = seen[label] = seen.get(label, 0) + 1
+                name = f"{label} {n}"
+            frames.append((name, {}))
+        else:
+            frames.pop()
+            yield event, elem, frames
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+
+def _check_part(src, part, spec, target):
+    anchors, checks, runs = spec
+    for event, elem, frames in _iter_leaves(src, anchors, checks):
+        if event == "end":
+            if (not target.inherited and elem.tag in runs
+                    and runs[elem.tag](elem)):
+                target.inherited = True
+            continue
+        for kind, reference, font in checks[elem.tag](elem, target):
+            names = [name for name, _seen in frames[1:]]
+            parent = elem.getparent()
+            if parent.tag not in anchors:
+                names.append(etree.QName(parent).localname)
+            yield FontIssue(part, " / ".join(names), kind, reference, font)
+
+
+def _match(parts, name):
+    """(spec, needle or None) of the first pattern matching ``name``."""
+    for pattern, spec, *needle in parts:
+        if pattern.fullmatch(name):
+            return spec, (needle or [None])[0]
+    return None
+
+
+def _compile(parts):
+    return [(re.compile(pattern), spec, *needle)
+            for pattern, spec, *needle in parts]
+
+
+def _check_member(zf, name, match, target):
+    spec, needle = match
+    if needle is not None and not member_contains(zf, name, needle):
+        return
+    with zf.open(name) as src:
+        yield from _check_part(src, name, spec, target)
+
+
+def verify_fonts(path, font_name, limit=DEFAULT_LIMIT):
+    """Font references of ``path`` that do not resolve to ``font_name`` (a
+    name or a FontMapping). Raises ValueError on unsupported extensions
+    (same rule as process_office_file)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _PARTS:
+        raise ValueError(f"Unsupported file type: {ext}")
+    parts, default_parts = _compile(_PARTS[ext]), _compile(_DEFAULT_PARTS[ext])
+    target = _Target(font_name)
+    issues, total = [], 0
+    with zipfile.ZipFile(path) as zf:
+        names = zf.namelist()
+        # Theme references are resolved against every theme of the package
+        for name in names:
+            if _THEME_PARTS.fullmatch(name):
+                with zf.open(name) as src:
+                    target.add_theme(src)
+        found, deferred = [], []
+        for name in names:
+            match = _match(parts, name)
+            if match is not None:
+                found.append(_check_member(zf, name, match, target))
+                continue
+            match = _match(default_parts, name)
+            if match is not None:
+                deferred.append((name, match))
+        # Text parts first: they decide whether the defaults matter
+        found = chain.from_iterable(found)
+        for issue in chain(found, chain.from_iterable(
+                _check_member(zf, name, match, target)
+                for name, match in deferred if target.inherited)):
+            total += 1
+            if len(issues) < limit:
+                issues.append(issue)
+    return VerifyResult(path, issues, total)
@@ -0,0 +1,276 @@
+"""Watch-folder service: convert files dropped into an inbox (no Qt).
+
+Usage:
+    python src/font_watch.py INBOX OUTBOX [--errors DIR] [--font NAME]
+                             [--map RULES.json] [--engine NAME] [--jobs N]
+                             [--queue-size N] [--interval SECONDS]
+
+The inbox is polled; a file is picked up once its size and mtime have not
+changed for ``settle_polls`` polls in a row, so files still being copied or
+saved are left alone. Picked-up files are moved to ``INBOX/.processing`` and
+put on a bounded queue; when the queue is full, polling waits — new files
+simply stay in the inbox until a worker frees a slot (backpressure).
+Workers convert on a process pool: the ``*_modified`` result goes to the
+outbox and the original to ``OUTBOX/originals``. A failed file is moved to
+the error folder next to ``<name>.error.txt`` holding the exception. A name
+already taken in a destination gets a `` (2)``, `` (3)``, ... suffix.
+Stop with Ctrl+C / SIGTERM: conversions in flight finish, files still
+waiting in ``.processing`` are queued again on the next start.
+"""
+import argparse
+import logging
+import os
+import queue
+import shutil
+import signal
+import sys
+import threading
+import traceback
+from functools import partial
+from itertools import count
+
+from font_core import (
+    ENGINE_NAMES, SUPPORTED_EXTENSIONS, output_path_for, process_office_file
+)
+from font_mapping import FontMapping
+from font_profile import Profiler
+
+
+logger = logging.getLogger("font_watch")
+
+DEFAULT_FONT = "Meiryo UI"
+PROCESSING_DIR = ".processing"
+
+
+def _is_ready_candidate(name):
+    """Supported, not an Office lock file, not a hidden/temp file."""
+    return (os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS
+            and not name.startswith(("~$", ".")))
+
+
+def _ignore_sigint():
+    """Pool initializer: Ctrl+C stops the service, not the conversions."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _free_path(directory, name, companion=""):
+    """``directory/name``, or ``name (2).ext``, ``name (3).ext``, ... when
+    that (or it plus ``companion``) is taken, so nothing is overwritten."""
+    root, ext = os.path.splitext(name)
+    for n in count(1):
+        target = os.path.join(directory,
+                              name if n == 1 else f"{root} ({n}){ext}")
+        if not any(os.path.lexists(target + suffix)
+                   for suffix in {"", companion}):
+            return target
+
+
+def _move(path, directory, companion=""):
+    """Move ``path`` into ``directory`` under a free name (see _free_path);
+    shutil.move also copes with the directory being on another file system."""
+    os.makedirs(directory, exist_ok=True)
+    target = _free_path(directory, os.path.basename(path), companion)
+    shutil.move(path, target)
+    return target
+
+
+class WatchFolder:
+    def __init__(self, inbox, outbox, error_dir=None, font_name=DEFAULT_FONT,
+                 engine="object", jobs=None, queue_size=None, interval=2.0,
+                 settle_polls=2, profile=None):
+        self.inbox = inbox
+        self.outbox = outbox
+        self.error_dir = error_dir or os.path.join(outbox, "errors")
+        self.archive_dir = os.path.join(outbox, "originals")
+        self.processing_dir = os.path.join(inbox, PROCESSING_DIR)
+        self.font_name = font_name
+        self.engine = engine
+        self.jobs = jobs or os.cpu_count() or 1
+        self.interval = interval
+        self.settle_polls = settle_polls
+        # font_profile.Profiler; None reads FONT_UNIFIER_PROFILE* once,
+        # here (ValueError on a malformed value), not once per file
+        self.profile = Profiler.from_env() if profile is None else profile
+        self.queue = queue.Queue(maxsize=queue_size or 2 * self.jobs)
+        self._seen = {}          # name -> ((size, mtime_ns), polls unchanged)
+        self._stop = threading.Event()
+        for directory in (self.outbox, self.processing_dir):
+            os.makedirs(directory, exist_ok=True)
+
+    def poll(self):
+        """One inbox scan; queues every file that has settled. Blocks while
+        the queue is full (returns early once stopped)."""
+        current = {}
+        with os.scandir(self.inbox) as entries:
+            for entry in entries:
+                if not entry.is_file() or not _is_ready_candidate(entry.name):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # removed between listing and stat
+                signature = (stat.st_size, stat.st_mtime_ns)
+                previous, unchanged = self._seen.get(entry.name, (None, 0))
+                unchanged = unchanged + 1 if signature == previous else 0
+                current[entry.name] = (signature, unchanged)
+        self._seen = current
+
+        for name, ((size, _mtime), unchanged) in sorted(current.items()):
+            if size and unchanged + 1 >= self.settle_polls:
+                if not self._enqueue(os.path.join(self.inbox, name)):
+                    return
+                del self._seen[name]
+
+    def _enqueue(self, path):
+        """Wait for a free queue slot, then claim ``path`` and queue it;
+        False once stopped while waiting (the file stays in the inbox)."""
+        # poll() is the only producer, so a free slot stays free
+        while self.queue.full():
+            if self._stop.wait(self.interval):
+                return False
+        if os.path.exists(os.path.join(self.processing_dir,
+                                       os.path.basename(path))):
+            return True  # same name still being converted: retry later
+        try:
+            claimed = _move(path, self.processing_dir)
+        except OSError:
+            return True  # gone or locked by its writer: next poll decides
+        self.queue.put(claimed)
+        return True
+
+    def _requeue_interrupted(self):
+        """Put files claimed by an interrupted run back into the inbox,
+        dropping outputs whose conversion never got moved out."""
+        names = set(os.listdir(self.processing_dir))
+        for name in sorted(names):
+            if not _is_ready_candidate(name):
+                continue
+            path = os.path.join(self.processing_dir, name)
+            if any(output_path_for(os.path.join(self.processing_dir, other))
+                   == path for other in names if other != name):
+                os.unlink(path)
+                continue
+            _move(path, self.inbox)
+
+    def _finish(self, path, error):
+        name = os.path.basename(path)
+        if error is None:
+            output = output_path_for(path)
+            _move(output, self.outbox)
+            _move(path, self.archive_dir)
+            logger.info("OK   %s", name)
+            return
+        target = _move(path, self.error_dir, ".error.txt")
+        with open(target + ".error.txt", "x", encoding="utf-8") as fh:
+            fh.write(error)
+        logger.error("FAIL %s: %s", name, error.strip().splitlines()[-1])
+
+    def _worker(self, convert):
+        while True:
+            path = self.queue.get()
+            try:
+                if path is None:
+                    return
+                if self._stop.is_set():
+                    continue  # stays in .processing, queued again on start
+                try:
+                    convert(path)
+                    error = None
+                except Exception as e:
+                    error = "".join(traceback.format_exception(e))
+                self._finish(path, error)
+            except OSError:
+                logger.exception("could not move %s", path)
+            finally:
+                self.queue.task_done()
+
+    def run(self):
+        """Poll until stop(); conversions run on ``jobs`` processes."""
+        self._requeue_interrupted()
+        convert = partial(process_office_file, font_name=self.font_name,
+                          engine=self.engine, profile=self.profile or False)
+        executor = None
+        if self.jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=self.jobs,
+                                           initializer=_ignore_sigint)
+            convert = partial(self._convert_on, executor, convert)
+        workers = [threading.Thread(target=self._worker, args=(convert,),
+                                    name=f"font-watch-{i}", daemon=True)
+                   for i in range(self.jobs)]
+        for worker in workers:
+            worker.start()
+        logger.info("watching %s -> %s", self.inbox, self.outbox)
+        try:
+            while not self._stop.is_set():
+                self.poll()
+                self._stop.wait(self.interval)
+        finally:
+            for _worker in workers:
+                self.queue.put(None)
+            for worker in workers:
+                worker.join()
+            if executor is not None:
+                executor.shutdown()
+
+    @staticmethod
+    def _convert_on(executor, convert, path):
+        return executor.submit(convert, path).result()
+
+    def stop(self):
+        self._stop.set()
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog="font_watch",
+        description="Convert .docx/.xlsx/.pptx files dropped into INBOX.")
+    parser.add_argument("inbox")
+    parser.add_argument("outbox")
+    parser.add_argument("--errors", metavar="DIR",
+                        help="failed files (default: OUTBOX/errors)")
+    parser.add_argument("--font", default=DEFAULT_FONT,
+                        help=f"target font name (default: {DEFAULT_FONT})")
+    parser.add_argument("--map", metavar="RULES.json",
+                        help="map fonts by a rule table instead of --font")
+    parser.add_argument("--engine", choices=ENGINE_NAMES, default="object")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="files waiting for a worker (default: 2×jobs)")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="seconds between inbox polls")
+    return parser
+
+
+def main(argv=None):
+    args = _build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(message)s")
+    if (args.jobs is not None and args.jobs < 1) or \
+            (args.queue_size is not None and args.queue_size < 1):
+        logger.error("--jobs and --queue-size must be at least 1")
+        return 2
+    font = args.font
+    if args.map:
+        try:
+            font = FontMapping.from_file(args.map)
+        except (OSError, ValueError) as e:
+            logger.error("--map %s: %s", args.map, e)
+            return 2
+
+    try:
+        watcher = WatchFolder(args.inbox, args.outbox, args.errors, font,
+                              args.engine, args.jobs, args.queue_size,
+                              args.interval)
+    except ValueError as e:
+        logger.error("%s", e)  # malformed FONT_UNIFIER_PROFILE*
+        return 2
+    signal.signal(signal.SIGTERM, lambda *_: watcher.stop())
+    signal.signal(signal.SIGINT, lambda *_: watcher.stop())
+    watcher.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,792 @@
+"""Raw OOXML package engines.
+
+These engines never build a python-docx/openpyxl/python-pptx object model.
+They open the .docx/.xlsx/.pptx as a zip package, rewrite only the XML parts
+that carry font information and copy every other member through untouched.
+Each ``change_*_font_xml`` function returns a :class:`PackageRewrite`, which —
+like the objects returned by ``Document()``/``load_workbook()``/
+``Presentation()`` — only needs ``.save(path)``.
+
+Wherever a ``font_name`` is taken, a font_mapping.FontMapping may be passed
+instead: the element-level setters then map each existing name by its
+rules rather than overwriting every font.
+"""
+import re
+import shutil
+import struct
+import zipfile
+from functools import partial
+
+from lxml import etree
+
+from font_mapping import FontMapping
+from font_progress import checkpoint
+
+
+_NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "c": "http://schemas.openxmlformats.org/drawingml/2006/chart",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+}
+
+# Theme-reference attributes dropped from w:rFonts (see set_docx_r_font)
+DOCX_THEME_ATTRS = ("w:asciiTheme", "w:hAnsiTheme",
+                    "w:eastAsiaTheme", "w:cstheme")
+
+_XML_DECLARATION = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n')
+
+# Buffer size for copying untouched members (large media, sheets, ...)
+_COPY_CHUNK = 1024 * 1024
+
+# Local file header: fixed part, then the name and extra field lengths
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+
+def _qn(tag):
+    """'x:font' -> '{namespace}font' (same convention as docx/pptx qn)."""
+    prefix, local = tag.split(":")
+    return f"{{{_NS[prefix]}}}{local}"
+
+
+def _clone_info(info):
+    """Fresh output ZipInfo keeping name, timestamp and compression."""
+    clone = zipfile.ZipInfo(info.filename, info.date_time)
+    clone.compress_type = info.compress_type
+    clone.external_attr = info.external_attr
+    # Size hint only: lets zipfile decide up-front whether ZIP64 is needed
+    clone.file_size = info.file_size
+    return clone
+
+
+def _raw_info(info):
+    """Output ZipInfo for a raw copy: same CRC, sizes and compression.
+
+    The data-descriptor flag is cleared because the sizes are known up
+    front and go into the local header; source extra fields (zip64 sizes,
+    timestamps) are not carried over — FileHeader() adds zip64 if needed.
+    """
+    clone = _clone_info(info)
+    clone.CRC = info.CRC
+    clone.compress_size = info.compress_size
+    clone.flag_bits = info.flag_bits & ~_DATA_DESCRIPTOR_FLAG
+    return clone
+
+
+def _copy_member_raw(zin, zout, info):
+    """Copy one member's compressed bytes as-is: no inflate, no deflate.
+
+    zipfile has no public raw-copy API, so this writes the local header and
+    data at the output position itself and registers the entry the way
+    ``ZipFile.write`` does (filelist/NameToInfo/start_dir), so the central
+    directory is written on close as usual.
+    """
+    zin.fp.seek(info.header_offset)
+    signature, name_len, extra_len = _LOCAL_HEADER.unpack(
+        zin.fp.read(_LOCAL_HEADER.size))
+    if signature != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header: {info.filename}")
+    zin.fp.seek(name_len + extra_len, 1)
+
+    clone = _raw_info(info)
+    clone.header_offset = zout.fp.tell()
+    zout.fp.write(clone.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = zin.fp.read(min(remaining, _COPY_CHUNK))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated member: {info.filename}")
+        zout.fp.write(chunk)
+        remaining -= len(chunk)
+    zout.filelist.append(clone)
+    zout.NameToInfo[clone.filename] = clone
+    zout.start_dir = zout.fp.tell()
+
+
+def member_contains(zf, name, needle, chunk_size=_COPY_CHUNK):
+    """Raw substring test on a member, without parsing it."""
+    tail = b""
+    with zf.open(name) as src:
+        for chunk in iter(lambda: src.read(chunk_size), b""):
+            if needle in tail + chunk:
+                return True
+            tail = chunk[-len(needle):]
+    return False
+
+
+class PackageRewrite:
+    """A source package plus per-member transforms, applied on ``save``.
+
+    ``transforms`` is a list of ``(pattern, fn)``: members whose name fully
+    matches ``pattern`` are streamed through ``fn(src, dst, font_name)``;
+    every other member (media, embedded objects, fonts, sheets, ...) is
+    copied as its original compressed bytes, so only the rewritten XML
+    parts are ever inflated or deflated. A transform may return a dict of
+    counters (e.g. ``{"runs": 12}``) which are added to ``stats``.
+    A ``(pattern, fn, needle)`` entry only applies to members containing the
+    bytes ``needle`` (member_contains); the others are copied raw, unparsed.
+
+    With a ``stats`` object (font_core.ProcessingStats) the time spent in
+    transforms and in plain copies is recorded as the "transform" and
+    "copy" stages — for these engines loading, rewriting and saving are one
+    streaming pass inside ``save``.
+
+    ``progress``/``cancel`` (see font_progress) are checked before every
+    member; progress units are uncompressed bytes.
+    """
+
+    def __init__(self, path, font_name, transforms, stats=None,
+                 progress=None, cancel=None):
+        self.path = path
+        self.font_name = font_name
+        self.stats = stats
+        self.progress = progress
+        self.cancel = cancel
+        self._transforms = [(re.compile(pattern), fn, *needle)
+                            for pattern, fn, *needle in transforms]
+
+    def _transform_for(self, zin, name):
+        for pattern, fn, *needle in self._transforms:
+            if pattern.fullmatch(name):
+                if needle and not member_contains(zin, name, needle[0]):
+                    return None
+                return fn
+        return None
+
+    def save(self, output_path):
+        with zipfile.ZipFile(self.path) as zin, \
+                zipfile.ZipFile(output_path, "w") as zout:
+            infos = zin.infolist()
+            total = sum(info.file_size for info in infos)
+            done = 0
+            for info in infos:
+                checkpoint(self.progress, self.cancel, done, total)
+                done += info.file_size
+                transform = self._transform_for(zin, info.filename)
+                if self.stats is None:
+                    self._write_member(zin, zout, info, transform)
+                    continue
+                stage = "copy" if transform is None else "transform"
+                with self.stats.stage(stage):
+                    counts = self._write_member(zin, zout, info, transform)
+                self.stats.count(f"parts_{stage}")
+                for name, n in (counts or {}).items():
+                    self.stats.count(name, n)
+            checkpoint(self.progress, self.cancel, total, total)
+
+    def _write_member(self, zin, zout, info, transform):
+        if transform is None:
+            if info.flag_bits & 0x01:  # encrypted: leave it to zipfile
+                with zin.open(info) as src, \
+                        zout.open(_clone_info(info), "w") as dst:
+                    shutil.copyfileobj(src, dst, _COPY_CHUNK)
+            else:
+                _copy_member_raw(zin, zout, info)
+            return None
+        with zin.open(info) as src, \
+                zout.open(_clone_info(info), "w") as dst:
+            return transform(src, dst, self.font_name)
+
+
+def _write_xml(tree, dst):
+    tree.write(dst, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _get_or_add_child(parent, tag, index=0):
+    """Return ``parent``'s first ``tag`` child, inserting one at ``index``.
+
+    ``makeelement`` keeps the parent document's element classes, so this is
+    safe on python-docx/python-pptx trees as well as on plain lxml ones.
+    """
+    child = parent.find(tag)
+    if child is None:
+        child = parent.makeelement(tag)
+        parent.insert(index, child)
+    return child
+
+
+def _ns_declarations(nsmap):
+    """Serialized ``xmlns`` attributes for ``nsmap`` (as lxml writes them)."""
+    decls = []
+    for prefix, uri in nsmap.items():
+        uri = (uri.replace("&", "&amp;").replace("<", "&lt;")
+               .replace(">", "&gt;").replace('"', "&quot;"))
+        name = "xmlns" if prefix is None else f"xmlns:{prefix}"
+        decls.append(f' {name}="{uri}"'.encode("utf-8"))
+    return decls
+
+
+def _serialize_fragment(elem, inherited):
+    """Serialize ``elem`` (with tail) without repeating inherited namespaces.
+
+    lxml declares every in-scope namespace on the top element of a subtree;
+    the root already declares them, so they are stripped from the start tag.
+    (lxml escapes '>' in attribute values, so the first '>' ends the tag.)
+    """
+    data = etree.tostring(elem, encoding="UTF-8")
+    end = data.index(b">")
+    start_tag = data[:end]
+    for decl in inherited:
+        start_tag = start_tag.replace(decl, b"", 1)
+    return start_tag + data[end:]
+
+
+def _stream_blocks(src, dst, is_container, rewrite_block, tags=None):
+    """Rewrite an XML part block by block with bounded memory.
+
+    ``is_container(elem, depth)`` marks the outer elements (e.g. w:document
+    and w:body) that are written as open/close tags. Every direct child of a
+    container is a "block": once fully parsed it goes through
+    ``rewrite_block``, is written out and then dropped from the tree, so peak
+    memory is one block (a paragraph or table), not the whole part.
+
+    ``tags`` limits parser events to the containers and the frequent block
+    tags (e.g. <si>, <row>) — far fewer Python-level events on parts with
+    millions of small elements. Children without events are still written,
+    in order, as soon as a later sibling is seen or their container ends.
+    """
+    dst.write(_XML_DECLARATION)
+    inherited = []
+    open_containers = []
+
+    def write_block(block):
+        rewrite_block(block)
+        dst.write(_serialize_fragment(block, inherited))
+        block.getparent().remove(block)
+
+    def flush(container, stop=None):
+        # Children before ``stop`` are complete: the parser has moved past
+        while len(container) and container[0] is not stop:
+            write_block(container[0])
+
+    for event, elem in etree.iterparse(src, events=("start", "end"),
+                                       tag=tags, huge_tree=True):
+        top = open_containers[-1][0] if open_containers else None
+        if event == "start":
+            if elem.getparent() is not top:
+                continue
+            if top is not None:
+                flush(top, elem)
+            if is_container(elem, len(open_containers)):
+                shell = etree.Element(elem.tag, dict(elem.attrib),
+                                      nsmap=elem.nsmap)
+                shell.text = ""
+                if top is None:
+                    inherited = _ns_declarations(elem.nsmap)
+                    data = etree.tostring(shell, encoding="UTF-8")
+                else:
+                    data = _serialize_fragment(shell, inherited)
+                split = data.rindex(b"</")
+                dst.write(data[:split])
+                open_containers.append((elem, data[split:]))
+            continue
+
+        if elem is top:
+            flush(elem)
+            dst.write(open_containers.pop()[1])
+            # Written out: a nested container must not be flushed again as
+            # an (empty) block of its parent
+            if open_containers:
+                elem.getparent().remove(elem)
+        elif top is not None and elem.getparent() is top:
+            flush(top, elem)
+            write_block(elem)
+
+
+# --- Excel (.xlsx): styles-only ---
+
+_X_NAME, _X_SCHEME = _qn("x:name"), _qn("x:scheme")
+_X_NAME_SUCCESSORS = (_qn("x:family"), _qn("x:charset"), _X_SCHEME)
+
+
+def _set_xlsx_font_name(font, font_name, keep_scheme=False,
+                        name_tag=_X_NAME):
+    """Same effect as ``_replace_all_fonts`` on one <font> element:
+    replace <name val>, drop <scheme> so Excel honours the explicit name.
+
+    With ``keep_scheme`` the <scheme> reference stays (theme mode: the
+    theme font it points at is rewritten instead). With a FontMapping only
+    fonts whose name it maps are touched. Rich-text run properties (<rPr>)
+    have the same shape with <rFont> as ``name_tag``."""
+    # iterchildren(tag) rather than find(): called once per rich-text run
+    name = next(font.iterchildren(name_tag), None)
+    if isinstance(font_name, FontMapping):
+        font_name = None if name is None else font_name.map(name.get("val"))
+        if font_name is None:
+            return
+    if name is None:
+        name = etree.Element(name_tag)
+        # Keep Excel's usual order (..., name, family, charset, scheme)
+        anchor = next(font.iterchildren(*_X_NAME_SUCCESSORS), None)
+        if anchor is None:
+            font.append(name)
+        else:
+            anchor.addprevious(name)
+    name.set("val", font_name)
+    if keep_scheme:
+        return
+    for scheme in list(font.iterchildren(_X_SCHEME)):
+        font.remove(scheme)
+
+
+def _rewrite_xlsx_styles(src, dst, font_name, keep_scheme=False):
+    tree = etree.parse(src)
+    fonts = tree.getroot().find(_qn("x:fonts"))
+    font_elems = [] if fonts is None else fonts.findall(_qn("x:font"))
+    for font in font_elems:
+        _set_xlsx_font_name(font, font_name, keep_scheme)
+    _write_xml(tree, dst)
+    return {"fonts": len(font_elems)}
+
+
+# Members holding rich text; only those containing the needle are parsed
+XLSX_RICH_TEXT_PARTS = r"xl/(sharedStrings|worksheets/sheet\d+)\.xml"
+XLSX_RICH_TEXT_NEEDLE = b"rFont"
+
+
+def _is_xlsx_container(elem, depth):
+    # <sst> and <worksheet>/<sheetData>: blocks are <si> items and rows
+    return depth == 0 or (depth == 1 and elem.tag == _qn("x:sheetData"))
+
+
+_XLSX_STREAM_TAGS = tuple(_qn(tag) for tag in (
+    "x:sst", "x:si", "x:worksheet", "x:sheetData", "x:row"))
+
+
+def _stream_xlsx_rich_text(src, dst, font_name, keep_scheme=False):
+    """Rich-text runs keep their own <rPr><rFont> (shared strings, inline
+    strings): rewrite those with the same rule as the fonts table. Runs
+    without rFont or scheme inherit the cell font and are left alone.
+    Streamed one <si>/row at a time, so memory does not grow with the
+    number of strings."""
+    rpr_tag, rfont_tag = _qn("x:rPr"), _qn("x:rFont")
+    counts = {"rich_text": 0}
+
+    def rewrite_block(block):
+        for rpr in block.iter(rpr_tag):
+            for _child in rpr.iterchildren(rfont_tag, _X_SCHEME):
+                _set_xlsx_font_name(rpr, font_name, keep_scheme, rfont_tag)
+                counts["rich_text"] += 1
+                break
+
+    _stream_blocks(src, dst, _is_xlsx_container, rewrite_block,
+                   _XLSX_STREAM_TAGS)
+    return counts
+
+
+def change_excel_font_xml(path, font_name, stats=None, progress=None,
+                          cancel=None):
+    """Styles-only .xlsx engine: rewrite the <fonts> table of xl/styles.xml.
+
+    Every cell, named style and the default (Normal) style point into this
+    table, so this is the same edit ``_replace_all_fonts`` makes — without
+    loading a single worksheet. Rich-text runs carry their own font, so
+    shared strings and sheets that contain any <rFont> are streamed through
+    _stream_xlsx_rich_text; all other members (plain sheets, drawings, ...)
+    are copied through with identical content.
+    """
+    return PackageRewrite(path, font_name, [
+        (r"xl/styles\.xml", _rewrite_xlsx_styles),
+        (XLSX_RICH_TEXT_PARTS, _stream_xlsx_rich_text, XLSX_RICH_TEXT_NEEDLE),
+    ], stats, progress, cancel)
+
+
+# --- Word (.docx): streaming ---
+
+def set_docx_r_font(r, font_name):
+    """Word: set latin + eastAsia + complex-script fonts on a <w:r> element.
+
+    Element-level core of ``_set_docx_run_font``: rPr/rFonts are created in
+    schema position when missing and the theme-reference attributes are
+    dropped so the explicit name wins. With a FontMapping only the run's
+    own explicit names are mapped; a run without rFonts inherits.
+    """
+    if isinstance(font_name, FontMapping):
+        rfonts = r.find(f"{_qn('w:rPr')}/{_qn('w:rFonts')}")
+        if rfonts is not None:
+            _map_docx_rfonts(rfonts, font_name)
+        return
+    rpr = _get_or_add_child(r, _qn("w:rPr"))
+    rstyle = rpr.find(_qn("w:rStyle"))
+    rfonts = _get_or_add_child(
+        rpr, _qn("w:rFonts"), 0 if rstyle is None else rpr.index(rstyle) + 1)
+    for attr in ("w:ascii", "w:hAnsi", "w:eastAsia", "w:cs"):
+        rfonts.set(_qn(attr), font_name)
+    for theme_attr in DOCX_THEME_ATTRS:
+        rfonts.attrib.pop(_qn(theme_attr), None)
+
+
+# Story parts that can hold runs: body, headers/footers, foot/endnotes
+DOCX_STORY_PARTS = (r"word/(document|header\d*|footer\d*"
+                    r"|footnotes|endnotes)\.xml")
+
+# Every run of a part in one compiled query: body, nested tables, content
+# controls (w:sdtContent) and text boxes (w:txbxContent) alike
+_DOCX_ALL_RUNS = etree.XPath("//w:r", namespaces=_NS)
+
+
+def set_docx_part_fonts(root, font_name):
+    """Apply ``set_docx_r_font`` to every <w:r> under a part's root element;
+    returns the number of runs."""
+    runs = _DOCX_ALL_RUNS(root)
+    for r in runs:
+        set_docx_r_font(r, font_name)
+    return len(runs)
+
+
+_DOCX_SCRIPT_ATTRS = (("w:ascii", "w:asciiTheme", "latin"),
+                      ("w:hAnsi", "w:hAnsiTheme", "latin"),
+                      ("w:eastAsia", "w:eastAsiaTheme", "east_asia"),
+                      ("w:cs", "w:cstheme", "cs"))
+
+
+def _map_docx_rfonts(rfonts, mapping):
+    """Map each explicit name of a <w:rFonts> by its script; attributes
+    shadowed by a theme reference are left to the theme. True if changed."""
+    changed = False
+    for attr, theme_attr, script in _DOCX_SCRIPT_ATTRS:
+        if _qn(theme_attr) in rfonts.attrib:
+            continue
+        target = mapping.map(rfonts.get(_qn(attr)), script)
+        if target is not None:
+            rfonts.set(_qn(attr), target)
+            changed = True
+    return changed
+
+
+def _is_docx_container(elem, depth):
+    return depth == 0 or (depth == 1 and elem.tag == _qn("w:body"))
+
+
+def _stream_docx_part(src, dst, font_name):
+    r_tag = _qn("w:r")
+    counts = {"runs": 0}
+
+    def rewrite_block(block):
+        for r in block.iter(r_tag):
+            set_docx_r_font(r, font_name)
+            counts["runs"] += 1
+
+    _stream_blocks(src, dst, _is_docx_container, rewrite_block)
+    return counts
+
+
+def change_word_font_xml(path, font_name, stats=None, progress=None,
+                         cancel=None):
+    """Streaming .docx engine for the story parts (DOCX_STORY_PARTS: body,
+    headers/footers, foot/endnotes).
+
+    Each part is read with ``iterparse`` and written back one top-level
+    block (paragraph/table) at a time, so memory stays bounded however large
+    ``word/document.xml`` is. Every <w:r> in a block is updated — which also
+    reaches text boxes and content controls the object walk does not visit.
+    A FontMapping leaves runs without rFonts to inherit, so styles.xml is
+    mapped as well (as every other engine does).
+    """
+    transforms = [
+        (DOCX_STORY_PARTS, _stream_docx_part),
+    ]
+    if isinstance(font_name, FontMapping):
+        transforms.append((r"word/styles\.xml", _rewrite_docx_styles))
+    return PackageRewrite(path, font_name, transforms, stats, progress,
+                          cancel)
+
+
+# --- Word (.docx): style-level ---
+
+def _set_docx_rfonts(rfonts, font_name, keep_theme=False):
+    """Point an existing <w:rFonts> at ``font_name``; False if it already
+    did, so nothing changed.
+
+    Theme references are dropped, or with ``keep_theme`` left in place
+    (theme mode): then only the explicit names that are not shadowed by a
+    theme reference are set. A FontMapping always keeps them.
+    """
+    if isinstance(font_name, FontMapping):
+        return _map_docx_rfonts(rfonts, font_name)
+    changed = False
+    for attr, theme_attr in zip(("w:ascii", "w:hAnsi", "w:eastAsia", "w:cs"),
+                                DOCX_THEME_ATTRS):
+        attr, theme_attr = _qn(attr), _qn(theme_attr)
+        if theme_attr in rfonts.attrib:
+            if keep_theme:
+                continue
+            del rfonts.attrib[theme_attr]
+            changed = True
+        if rfonts.get(attr) != font_name:
+            rfonts.set(attr, font_name)
+            changed = True
+    return changed
+
+
+def set_docx_style_fonts(root, font_name, keep_theme=False):
+    """Apply ``_set_docx_rfonts`` to every <w:rFonts> of a styles part
+    (docDefaults and each style); returns how many changed."""
+    return sum(_set_docx_rfonts(rfonts, font_name, keep_theme)
+               for rfonts in root.iter(_qn("w:rFonts")))
+
+
+def _rewrite_docx_styles(src, dst, font_name, keep_theme=False):
+    """docDefaults gets the font once; every style's own rFonts follows."""
+    tree = etree.parse(src)
+    root = tree.getroot()
+    if not isinstance(font_name, FontMapping):
+        defaults = _get_or_add_child(root, _qn("w:docDefaults"))
+        rpr_default = _get_or_add_child(defaults, _qn("w:rPrDefault"))
+        rpr = _get_or_add_child(rpr_default, _qn("w:rPr"))
+        _get_or_add_child(rpr, _qn("w:rFonts"))
+    styles = set_docx_style_fonts(root, font_name, keep_theme)
+    _write_xml(tree, dst)
+    return {"styles": styles}
+
+
+def _stream_docx_overrides(src, dst, font_name, keep_theme=False):
+    """Only runs (and paragraph marks) with their own rFonts are touched;
+    everything else already inherits the font from styles.xml."""
+    rfonts_tag = _qn("w:rFonts")
+    counts = {"runs": 0}
+
+    def rewrite_block(block):
+        for rfonts in block.iter(rfonts_tag):
+            counts["runs"] += _set_docx_rfonts(rfonts, font_name, keep_theme)
+
+    _stream_blocks(src, dst, _is_docx_container, rewrite_block)
+    return counts
+
+
+def change_word_font_styles(path, font_name, stats=None, progress=None,
+                            cancel=None):
+    """Style-level .docx engine: set the font once in ``word/styles.xml``.
+
+    The document defaults and every style that names its own fonts are
+    pointed at ``font_name``; runs without <w:rFonts> inherit it from there
+    and are left alone. Only runs (and paragraph marks) carrying their own
+    conflicting rFonts or theme references are rewritten, so the rendered
+    fonts match the per-run engines while ``document.xml`` does not grow a
+    redundant rFonts on every run.
+    """
+    return PackageRewrite(path, font_name, [
+        (r"word/styles\.xml", _rewrite_docx_styles),
+        (DOCX_STORY_PARTS, _stream_docx_overrides),
+    ], stats, progress, cancel)
+
+
+# --- PowerPoint (.pptx): direct slide/chart XML ---
+
+# CT_TextCharacterProperties children that must follow latin/ea/cs
+_PPTX_FONT_SUCCESSORS = ("a:sym", "a:hlinkClick", "a:hlinkMouseOver",
+                         "a:rtl", "a:extLst")
+
+
+_PPTX_SCRIPT_TAGS = {_qn("a:latin"): "latin", _qn("a:ea"): "east_asia",
+                     _qn("a:cs"): "cs"}
+
+
+def _map_pptx_typeface(elem, mapping):
+    """Map an explicit a:latin/a:ea/a:cs typeface; True if changed."""
+    typeface = elem.get("typeface", "")
+    if typeface.startswith("+"):
+        return False
+    target = mapping.map(typeface, _PPTX_SCRIPT_TAGS[elem.tag])
+    if target is None:
+        return False
+    elem.set("typeface", target)
+    return True
+
+
+def set_pptx_rpr_font(rpr, font_name):
+    """PowerPoint: set latin + eastAsian + complex-script typefaces on an
+    <a:rPr>/<a:endParaRPr>/<a:defRPr> element (in schema order).
+
+    With a FontMapping only existing explicit typefaces are mapped; none is
+    added and "+mn-lt"-style theme references are kept.
+    """
+    if isinstance(font_name, FontMapping):
+        for elem in rpr.iterchildren(*_PPTX_SCRIPT_TAGS):
+            _map_pptx_typeface(elem, font_name)
+        return
+    tags = ("a:latin", "a:ea", "a:cs")
+    for i, tag in enumerate(tags):
+        elem = rpr.find(_qn(tag))
+        if elem is None:
+            elem = rpr.makeelement(_qn(tag))
+            successors = {_qn(t) for t in tags[i + 1:] + _PPTX_FONT_SUCCESSORS}
+            anchor = next((child for child in rpr
+                           if child.tag in successors), None)
+            if anchor is None:
+                rpr.append(elem)
+            else:
+                anchor.addprevious(elem)
+        elem.set("typeface", font_name)
+
+
+def set_pptx_default_fonts(root, font_name):
+    """Set the typefaces of every default run property (<a:defRPr>) under
+    ``root`` — the levels of p:txStyles, a:lstStyle and a:defaultTextStyle;
+    returns how many were set."""
+    defaults = list(root.iter(_qn("a:defRPr")))
+    for rpr in defaults:
+        set_pptx_rpr_font(rpr, font_name)
+    return len(defaults)
+
+
+# Parts carrying text or inherited run defaults: slides and charts, plus
+# the masters, layouts and notes placeholders inherit from
+PPTX_TEXT_PARTS = (r"ppt/(slides/slide|slideLayouts/slideLayout"
+                   r"|slideMasters/slideMaster|notesSlides/notesSlide"
+                   r"|notesMasters/notesMaster|charts/chart)\d+\.xml")
+
+
+def _rewrite_pptx_part(src, dst, font_name):
+    tree = etree.parse(src)
+    run_tags = {_qn("a:r"), _qn("a:fld")}
+    rpr_tags = {_qn("a:rPr"), _qn("a:endParaRPr"), _qn("a:defRPr")}
+    # Collect first, then edit: one walk of the part, no mutation mid-walk
+    runs, rprs = [], []
+    for elem in tree.getroot().iter(*run_tags, *rpr_tags):
+        (runs if elem.tag in run_tags else rprs).append(elem)
+    for run in runs:
+        if run.find(_qn("a:rPr")) is None:
+            rprs.append(_get_or_add_child(run, _qn("a:rPr")))
+    for rpr in rprs:
+        set_pptx_rpr_font(rpr, font_name)
+    _write_xml(tree, dst)
+    return {"runs": len(runs)}
+
+
+def change_ppt_font_xml(path, font_name, stats=None, progress=None,
+                        cancel=None):
+    """Direct .pptx engine for slide, chart, master, layout and notes parts.
+
+    Each part is parsed once (a master or layout shared by many slides is
+    still one zip member) and every run, end-of-paragraph and default run
+    property — including p:txStyles and a:lstStyle levels — gets the same
+    latin/ea/cs typefaces ``_set_pptx_run_font`` writes. Media and all other
+    members are copied through untouched.
+    """
+    return PackageRewrite(path, font_name, [
+        (PPTX_TEXT_PARTS, _rewrite_pptx_part),
+    ], stats, progress, cancel)
+
+
+# --- Theme mode: rewrite the theme fonts, keep theme references ---
+
+# Per-script theme fonts (a:font script=...) that are East Asian
+_EAST_ASIAN_SCRIPTS = {"Jpan", "Hang", "Hans", "Hant"}
+
+
+def _theme_font_script(font):
+    if font.tag == _qn("a:font"):
+        return ("east_asia" if font.get("script") in _EAST_ASIAN_SCRIPTS
+                else "cs")
+    return _PPTX_SCRIPT_TAGS[font.tag]
+
+
+def _rewrite_theme(src, dst, font_name):
+    """Point the major/minor latin, ea, cs and per-script fonts of a theme
+    part (a:fontScheme) at ``font_name`` (or map them by script)."""
+    tree = etree.parse(src)
+    mapping = font_name if isinstance(font_name, FontMapping) else None
+    fonts = 0
+    for collection in tree.getroot().iter(_qn("a:majorFont"),
+                                          _qn("a:minorFont")):
+        for font in collection.iter(_qn("a:latin"), _qn("a:ea"),
+                                    _qn("a:cs"), _qn("a:font")):
+            if mapping is not None:
+                font_name = mapping.map(font.get("typeface"),
+                                        _theme_font_script(font))
+                if font_name is None:
+                    continue
+            font.set("typeface", font_name)
+            fonts += 1
+    _write_xml(tree, dst)
+    return {"theme_fonts": fonts}
+
+
+def _rewrite_pptx_explicit(src, dst, font_name):
+    """Set explicit latin/ea/cs typefaces; "+mj-*"/"+mn-*" theme references
+    and text without its own typeface are left to the rewritten theme."""
+    tree = etree.parse(src)
+    runs = 0
+    for font in tree.getroot().iter(*_PPTX_SCRIPT_TAGS):
+        if isinstance(font_name, FontMapping):
+            runs += _map_pptx_typeface(font, font_name)
+            continue
+        typeface = font.get("typeface", "")
+        if not typeface.startswith("+") and typeface != font_name:
+            font.set("typeface", font_name)
+            runs += 1
+    _write_xml(tree, dst)
+    return {"runs": runs}
+
+
+def change_word_font_theme(path, font_name, stats=None, progress=None,
+                           cancel=None):
+    """Theme-mode .docx engine.
+
+    ``word/theme/theme1.xml`` gets the new major/minor fonts, so every
+    asciiTheme/eastAsiaTheme/... reference — usually the document defaults
+    and most styles — now resolves to ``font_name`` and is kept as is. Only
+    explicit font names not shadowed by a theme reference are rewritten, in
+    the same places as the "styles" engine.
+    """
+    return PackageRewrite(path, font_name, [
+        (r"word/theme/theme\d+\.xml", _rewrite_theme),
+        (r"word/styles\.xml", partial(_rewrite_docx_styles, keep_theme=True)),
+        (DOCX_STORY_PARTS, partial(_stream_docx_overrides, keep_theme=True)),
+    ], stats, progress, cancel)
+
+
+def change_excel_font_theme(path, font_name, stats=None, progress=None,
+                            cancel=None):
+    """Theme-mode .xlsx engine: rewrite ``xl/theme/theme1.xml`` and the font
+    names in ``xl/styles.xml`` and rich-text runs while keeping every
+    <scheme> reference."""
+    return PackageRewrite(path, font_name, [
+        (r"xl/theme/theme\d+\.xml", _rewrite_theme),
+        (r"xl/styles\.xml", partial(_rewrite_xlsx_styles, keep_scheme=True)),
+        (XLSX_RICH_TEXT_PARTS,
+         partial(_stream_xlsx_rich_text, keep_scheme=True),
+         XLSX_RICH_TEXT_NEEDLE),
+    ], stats, progress, cancel)
+
+
+def change_ppt_font_theme(path, font_name, stats=None, progress=None,
+                          cancel=None):
+    """Theme-mode .pptx engine.
+
+    Every ``ppt/theme/theme*.xml`` gets the new major/minor fonts; masters
+    refer to them as "+mj-lt"/"+mn-ea"/..., so placeholder and default text
+    follows without touching it. Only explicit typefaces in slides, layouts,
+    masters, notes and charts are rewritten — no latin/ea/cs is added.
+    """
+    return PackageRewrite(path, font_name, [
+        (r"ppt/theme/theme\d+\.xml", _rewrite_theme),
+        (r"ppt/(presentation|(slides/slide|slideLayouts/slideLayout"
+         r"|slideMasters/slideMaster|notesSlides/notesSlide"
+         r"|notesMasters/notesMaster|charts/chart)\d+)\.xml",
+         _rewrite_pptx_explicit),
+    ], stats, progress, cancel)
+
+
+# Extension -> raw XML handler (see _ENGINES in font_core)
+XML_FONT_CHANGERS = {
+    ".docx": change_word_font_xml,
+    ".pptx": change_ppt_font_xml,
+    ".xlsx": change_excel_font_xml,
+}
+
+# Extension -> style-level handler (Word only)
+STYLE_FONT_CHANGERS = {
+    ".docx": change_word_font_styles,
+}
+
+# Extension -> theme-mode handler
+THEME_FONT_CHANGERS = {
+    ".docx": change_word_font_theme,
+    ".pptx": change_ppt_font_theme,
+    ".xlsx": change_excel_font_theme,
+}
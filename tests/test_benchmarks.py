@@ -0,0 +1,40 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from docx import Document  # noqa: E402
+from openpyxl import load_workbook  # noqa: E402
+from pptx import Presentation  # noqa: E402
+
+import generators  # noqa: E402
+import run_benchmarks  # noqa: E402
+
+
+def test_generators_honour_size_parameters(tmp_path):
+    """ジェネレータはパラメータ通りの規模のファイルを生成する"""
+    doc = Document(generators.make_docx(
+        str(tmp_path / "g.docx"), paragraphs=10, tables=2, sections=1))
+    assert len(doc.paragraphs) >= 10
+    assert len(doc.tables) == 2 and doc.tables[0].cell(0, 0).tables
+
+    wb = load_workbook(generators.make_xlsx(
+        str(tmp_path / "g.xlsx"), sheets=2, rows=5, cols=3, distinct_fonts=4))
+    assert wb.sheetnames == ["Sheet1", "Sheet2"]
+    assert wb["Sheet2"].max_row == 5
+    assert len({f.name for f in wb._fonts} - {"Calibri"}) == 4
+
+    prs = Presentation(generators.make_pptx(str(tmp_path / "g.pptx"),
+                                            slides=3))
+    assert len(prs.slides) == 3
+
+
+def test_compare_flags_regressions_and_prd_limits():
+    """許容幅を超える悪化と PRD 上限超過を検出し、ノイズは無視する"""
+    baseline = {"a": {"seconds": 1.0, "peak_rss_mb": 100.0},
+                "b": {"seconds": 0.01, "peak_rss_mb": 100.0}}
+    results = {"a": {"seconds": 1.5, "peak_rss_mb": 101.0},
+               "b": {"seconds": 0.03, "peak_rss_mb": 100.0},
+               "c": {"seconds": 31.0, "peak_rss_mb": 600.0}}
+    flags = run_benchmarks.compare(results, baseline, tolerance=0.2)
+    assert [name for name, _ in flags] == ["a", "c", "c"]
@@ -0,0 +1,142 @@
+import sys
+import os
+import shutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+
+import font_core  # noqa: E402
+from font_cache import ResultCache  # noqa: E402
+
+TARGET_FONT = "Arial"
+
+
+def _make_xlsx(path, text="x"):
+    wb = Workbook()
+    wb.active["A1"] = text
+    wb.save(str(path))
+    return str(path)
+
+
+def _run(paths, cache, font=TARGET_FONT):
+    return {r.path: r for r in font_core.process_office_files(
+        paths, font, jobs=1, cache=cache)}
+
+
+def test_cache_hit_on_rerun_and_key_includes_font(tmp_path):
+    """2 回目は変換せずキャッシュから出力を得る。フォントが変われば再変換"""
+    cache = ResultCache(str(tmp_path / "cache"))
+    path = _make_xlsx(tmp_path / "in.xlsx")
+
+    first = _run([path], cache)[path]
+    assert first.error is None and not first.cached
+    os.remove(first.output_path)
+
+    second = _run([path], cache)[path]
+    assert second.cached and os.path.exists(second.output_path)
+
+    other_font = _run([path], cache, font="Segoe UI")[path]
+    assert not other_font.cached
+
+
+def test_identical_files_in_batch_converted_once(tmp_path):
+    """同一内容のファイルはバッチ内で 1 回だけ変換される"""
+    cache = ResultCache(str(tmp_path / "cache"))
+    original = _make_xlsx(tmp_path / "a.xlsx")
+    copy = str(tmp_path / "b.xlsx")
+    shutil.copyfile(original, copy)
+
+    results = _run([original, copy], cache)
+    assert sorted(r.cached for r in results.values()) == [False, True]
+    for result in results.values():
+        assert os.path.exists(result.output_path)
+
+
+def test_cache_eviction_and_clear(tmp_path):
+    """サイズ上限を超えると古いエントリから削除、clear で全削除"""
+    out = _make_xlsx(tmp_path / "out.xlsx")
+    size = os.path.getsize(out)
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=size * 2)
+    for i in range(3):
+        cache.store(f"k{i}.xlsx", out)
+        os.utime(os.path.join(cache.directory, f"k{i}.xlsx"), (i, i))
+    cache.store("k3.xlsx", out)
+    assert sorted(os.listdir(cache.directory)) == ["k2.xlsx", "k3.xlsx"]
+
+    cache.clear()
+    assert os.listdir(cache.directory) == []
+    assert not cache.fetch("k3.xlsx", str(tmp_path / "restored.xlsx"))
+
+
+def test_store_keeps_running_total_without_rescanning(tmp_path):
+    """store はディレクトリを走査せず合計サイズを更新し、上限超過時のみ走査する"""
+    out = _make_xlsx(tmp_path / "out.xlsx")
+    size = os.path.getsize(out)
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=size * 10)
+    cache.store("k0.xlsx", out)
+    scans = []
+    entries = cache._entries
+    cache._entries = lambda: scans.append(1) or entries()
+    for i in range(1, 4):
+        cache.store(f"k{i}.xlsx", out)
+    cache.store("k0.xlsx", out)  # 同じキーの上書きは増えない
+    assert scans == [] and cache._total == size * 4
+
+    cache.max_bytes = size * 3
+    cache.store("k4.xlsx", out)
+    assert scans == [1]
+    assert len(os.listdir(cache.directory)) == 2  # 上限の 9 割まで削除
+    # 既存のエントリは再オープン時に 1 回だけ走査して合計を得る
+    assert ResultCache(cache.directory)._total == size * 2
+
+
+def test_batch_hashes_on_pool_with_duplicates_and_unreadable(tmp_path):
+    """プールでハッシュ計算しつつ、重複は 1 回だけ変換、読めないファイルはエラー"""
+    cache = ResultCache(str(tmp_path / "cache"))
+    original = _make_xlsx(tmp_path / "a.xlsx")
+    copy = str(tmp_path / "b.xlsx")
+    shutil.copyfile(original, copy)
+    other = _make_xlsx(tmp_path / "c.xlsx", text="y")
+    missing = str(tmp_path / "missing.xlsx")
+
+    results = {r.path: r for r in font_core.process_office_files(
+        [original, copy, other, missing], TARGET_FONT, jobs=2, cache=cache)}
+    assert set(results) == {original, copy, other, missing}
+    assert results[missing].error and results[missing].output_path is None
+    assert sorted(results[p].cached for p in (original, copy)) == \
+        [False, True]
+    assert not results[other].cached
+
+    again = {r.path: r for r in font_core.process_office_files(
+        [original, other], TARGET_FONT, jobs=2, cache=cache)}
+    assert all(r.cached and r.error is None for r in again.values())
+
+
+def test_fetch_is_atomic_and_survives_eviction(tmp_path, monkeypatch):
+    """取得失敗時は部分的な出力を残さず、取得後の削除競合は無視する"""
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.store("k", _make_xlsx(tmp_path / "in.xlsx"))
+    target = tmp_path / "out" / "in_modified.xlsx"
+    target.parent.mkdir()
+
+    def broken_copy(src, dst):
+        with open(dst, "wb") as fh:
+            fh.write(b"PK")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(shutil, "copyfile", broken_copy)
+    with pytest.raises(OSError):
+        cache.fetch("k", str(target))
+    assert os.listdir(target.parent) == []
+    monkeypatch.undo()
+
+    def evicted(path, *args):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "utime", evicted)
+    assert cache.fetch("k", str(target))
+    assert target.read_bytes()[:2] == b"PK"
+    assert cache.fetch("missing", str(target.parent / "x.xlsx")) is False
+    assert os.listdir(target.parent) == ["in_modified.xlsx"]
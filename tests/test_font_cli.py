@@ -0,0 +1,130 @@
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from openpyxl import Workbook  # noqa: E402
+
+import font_cli  # noqa: E402
+
+TARGET_FONT = "Arial"
+
+
+def _make_xlsx(path):
+    wb = Workbook()
+    wb.active["A1"] = "x"
+    wb.save(str(path))
+    return str(path)
+
+
+def test_collect_files_walks_dirs_and_globs(tmp_path):
+    """ディレクトリ再帰・glob 展開し、ロック/出力/未対応ファイルは除外する"""
+    sub = tmp_path / "a" / "b"
+    sub.mkdir(parents=True)
+    deep = _make_xlsx(sub / "deep.xlsx")
+    top = _make_xlsx(tmp_path / "top.XLSX")
+    _make_xlsx(tmp_path / "top_modified.xlsx")
+    _make_xlsx(tmp_path / "~$lock.xlsx")
+    (tmp_path / "notes.txt").write_text("x")
+
+    assert font_cli.collect_files([str(tmp_path)]) == sorted([deep, top])
+    pattern = str(tmp_path / "**" / "deep.*")
+    assert font_cli.collect_files([pattern]) == [deep]
+
+
+def test_main_rejects_inputs_that_match_nothing(tmp_path):
+    """存在しないパス・未対応ファイル・一致なしの glob は終了コード 2"""
+    good = _make_xlsx(tmp_path / "good.xlsx")
+    (tmp_path / "notes.txt").write_text("x")
+    for item in ("missing", "notes.txt", "*.pptx"):
+        unmatched = []
+        assert font_cli.collect_files([good, str(tmp_path / item)],
+                                      unmatched) == [good]
+        assert unmatched == [str(tmp_path / item)]
+        assert font_cli.main([good, str(tmp_path / item), "-j", "1"]) == 2
+    assert not os.path.exists(tmp_path / "good_modified.xlsx")
+
+
+def test_main_writes_summary_and_exit_code(tmp_path):
+    """JSON サマリを出力し、失敗があれば終了コード 1"""
+    good = _make_xlsx(tmp_path / "good.xlsx")
+    summary_path = tmp_path / "summary.json"
+    code = font_cli.main([str(tmp_path), "--font", TARGET_FONT, "-j", "1",
+                          "--summary", str(summary_path)])
+    assert code == 0
+    summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    assert summary["succeeded"] == 1 and summary["failed"] == 0
+    assert summary["files"][0]["path"] == good
+
+    (tmp_path / "bad.docx").write_bytes(b"not a zip")
+    code = font_cli.main([str(tmp_path / "*.docx"), "-j", "1",
+                          "--summary", str(summary_path)])
+    assert code == 1
+    summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    assert summary["failed"] == 1 and summary["files"][0]["error"]
+
+
+def test_cli_does_not_import_qt():
+    """CLI モジュールは PyQt6 を読み込まない"""
+    import subprocess
+    code = ("import sys; sys.path.insert(0, %r); import font_cli; "
+            "assert not any(m.startswith('PyQt6') for m in sys.modules)"
+            % os.path.dirname(font_cli.__file__))
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_main_scan_reports_without_converting(tmp_path):
+    """--scan はフォント一覧を出力するだけで変換しない"""
+    _make_xlsx(tmp_path / "in.xlsx")
+    summary_path = tmp_path / "summary.json"
+    code = font_cli.main([str(tmp_path / "in.xlsx"), "--scan", "-j", "1",
+                          "--summary", str(summary_path)])
+    assert code == 0
+    assert not (tmp_path / "in_modified.xlsx").exists()
+    summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    assert "Calibri" in summary["files"][0]["locations"]["fonts"]
+
+
+def test_main_map_applies_rule_file(tmp_path):
+    """--map のルール表で変換し、不正なルールファイルは終了コード 2"""
+    from openpyxl import load_workbook
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps({"rules": [["Calibri", "Segoe UI"]]}),
+                     encoding="utf-8")
+    assert font_cli.main([path, "--map", str(rules), "-j", "1"]) == 0
+    out = load_workbook(str(tmp_path / "in_modified.xlsx"))
+    assert out.active["A1"].font.name == "Segoe UI"
+
+    rules.write_text("{not json", encoding="utf-8")
+    assert font_cli.main([path, "--map", str(rules)]) == 2
+
+
+def test_main_verify_reports_fonts_left(tmp_path):
+    """--verify は残った旧フォント参照をサマリに記録し、終了コード 1"""
+    from docx import Document
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    summary_path = tmp_path / "summary.json"
+    assert font_cli.main([path, "--verify", "-j", "1",
+                          "--summary", str(summary_path)]) == 0
+    summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    assert summary["unverified"] == 0
+    assert summary["files"][0]["verify"]["total"] == 0
+
+    # object エンジンはテキストボックス内の run を変換しない
+    doc = Document()
+    doc.add_paragraph().add_run()._r.append(parse_xml(
+        f'<w:txbxContent {nsdecls("w")}><w:p><w:r><w:rPr>'
+        '<w:rFonts w:ascii="MS Gothic"/></w:rPr></w:r></w:p>'
+        '</w:txbxContent>'))
+    doc.save(str(tmp_path / "box.docx"))
+    assert font_cli.main([str(tmp_path / "box.docx"), "--verify", "-j", "1",
+                          "--summary", str(summary_path)]) == 1
+    summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    issue = summary["files"][0]["verify"]["issues"][0]
+    assert summary["unverified"] == 1 and summary["failed"] == 0
+    assert issue["location"].startswith("paragraph 1 / run 1 / text box 1")
+    assert issue["font"] == "MS Gothic"
@@ -0,0 +1,282 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from openpyxl import Workbook  # noqa: E402
+
+import font_core  # noqa: E402
+
+TARGET_FONT = "Arial"
+
+
+def _make_xlsx(path, rows=1):
+    wb = Workbook()
+    ws = wb.active
+    for i in range(1, rows + 1):
+        ws[f"A{i}"] = f"row {i}"
+    wb.save(str(path))
+    return str(path)
+
+
+# font_core の import 時間の上限（秒）。CI の遅いマシンも考慮した値
+IMPORT_TIME_BUDGET = 0.3
+
+
+def _run_isolated(code):
+    """src を path に追加した新しいインタプリタで code を実行し stdout を返す"""
+    import subprocess
+    prelude = "import sys; sys.path.insert(0, %r)\n" % os.path.dirname(
+        font_core.__file__)
+    return subprocess.run([sys.executable, "-c", prelude + code], check=True,
+                          capture_output=True, text=True).stdout
+
+
+def test_import_time_budget_and_no_heavy_imports():
+    """コア API は予算内で import でき、Qt や各形式ライブラリを読み込まない"""
+    out = _run_isolated(
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import font_core\n"
+        "print(time.perf_counter() - start)\n"
+        "heavy = ('PyQt6', 'docx', 'openpyxl', 'pptx')\n"
+        "print([m for m in sys.modules if m.split('.')[0] in heavy])\n")
+    seconds, loaded = out.splitlines()
+    assert float(seconds) < IMPORT_TIME_BUDGET
+    assert loaded == "[]"
+
+
+def test_dispatch_imports_only_the_needed_library(tmp_path):
+    """.xlsx の変換では openpyxl のみ読み込まれる"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    out = _run_isolated(
+        "import font_core\n"
+        "font_core.process_office_file(%r, 'Arial')\n"
+        "print(sorted({m.split('.')[0] for m in sys.modules}\n"
+        "             & {'docx', 'openpyxl', 'pptx', 'PyQt6'}))\n" % path)
+    assert out.strip() == "['openpyxl']"
+
+
+def test_process_office_files_pool_reports_each_file(tmp_path):
+    """プールで全ファイルを処理し、成功/失敗をファイル毎に返す"""
+    good = [_make_xlsx(tmp_path / f"in{i}.xlsx") for i in range(3)]
+    bad = str(tmp_path / "broken.docx")
+    with open(bad, "wb") as fh:
+        fh.write(b"not a zip")
+
+    results = list(font_core.process_office_files(
+        good + [bad], TARGET_FONT, jobs=2))
+    by_path = {r.path: r for r in results}
+    assert set(by_path) == set(good + [bad])
+    for path in good:
+        assert by_path[path].error is None
+        assert os.path.exists(by_path[path].output_path)
+        assert by_path[path].timings["total"] >= 0
+    assert by_path[bad].output_path is None
+    assert by_path[bad].error
+
+
+def test_process_office_files_largest_first(tmp_path):
+    """大きいファイルから順にスケジュールされる"""
+    small = _make_xlsx(tmp_path / "small.xlsx")
+    large = _make_xlsx(tmp_path / "large.xlsx", rows=2000)
+    results = list(font_core.process_office_files(
+        [small, large], TARGET_FONT, jobs=1))
+    assert [r.path for r in results] == [large, small]
+
+
+def test_process_office_file_stats_stages_and_counts(tmp_path, caplog):
+    """stats 指定時は load/transform/save の時間・件数・サイズを記録しログ出力"""
+    import logging
+    from docx import Document
+    doc = Document()
+    doc.add_paragraph().add_run("a")
+    doc.add_paragraph().add_run("b")
+    doc.add_table(rows=1, cols=2).cell(0, 0).text = "c"
+    path = str(tmp_path / "in.docx")
+    doc.save(path)
+
+    stats = font_core.ProcessingStats()
+    with caplog.at_level(logging.INFO, logger="font_core"):
+        font_core.process_office_file(path, TARGET_FONT, stats=stats)
+    assert set(stats.timings) == {"load", "transform", "save"}
+    assert stats.counts["runs"] == 3
+    assert stats.counts["cells"] == 2
+    assert stats.counts["input_bytes"] > 0 and stats.counts["output_bytes"] > 0
+    assert "runs=3" in caplog.text
+
+
+def test_xml_engine_stats_and_batch_counts(tmp_path):
+    """xml エンジンと process_office_files(stats=True) でも統計が返る"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    stats = font_core.ProcessingStats()
+    font_core.process_office_file(path, TARGET_FONT, "xml", stats)
+    assert stats.counts["fonts"] >= 1 and stats.counts["parts_transform"] == 1
+    assert "copy" in stats.timings
+
+    [result] = font_core.process_office_files(
+        [path], TARGET_FONT, jobs=1, stats=True)
+    assert result.counts["fonts"] >= 1
+    assert {"total", "load", "transform", "save"} <= set(result.timings)
+
+
+def test_progress_reports_until_complete(tmp_path):
+    """progress(done, total) が単調増加し、最後は done == total"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    for engine in ("object", "xml"):
+        calls = []
+        font_core.process_office_file(
+            path, TARGET_FONT, engine,
+            progress=lambda done, total: calls.append(done / total))
+        assert calls == sorted(calls), engine
+        assert calls[-1] == 1.0
+
+
+def test_cancel_stops_without_output(tmp_path):
+    """キャンセル時は ProcessingCancelled を送出し、出力・一時ファイルを残さない"""
+    import threading
+    from pptx import Presentation
+    prs = Presentation()
+    for _ in range(3):
+        prs.slides.add_slide(prs.slide_layouts[6])
+    path = str(tmp_path / "in.pptx")
+    prs.save(path)
+
+    for engine in ("object", "xml"):
+        cancel = threading.Event()
+
+        def progress(done, total):
+            if done >= 2:
+                cancel.set()
+        try:
+            font_core.process_office_file(path, TARGET_FONT, engine,
+                                          progress=progress, cancel=cancel)
+        except font_core.ProcessingCancelled:
+            pass
+        else:
+            raise AssertionError("ProcessingCancelled was expected")
+        assert os.listdir(tmp_path) == ["in.pptx"], engine
+
+
+def _make_docx_with_textbox(path):
+    """テキストボックス・コンテンツコントロール・入れ子の表を含む docx を生成する"""
+    from docx import Document
+    from docx.oxml import parse_xml
+    doc = Document()
+    doc.add_paragraph("body")
+    textbox = (
+        '<w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/'
+        '2006/main" xmlns:v="urn:schemas-microsoft-com:vml"><w:r><w:pict>'
+        '<v:shape><v:textbox><w:txbxContent><w:p><w:r><w:t>in box</w:t>'
+        '</w:r></w:p></w:txbxContent></v:textbox></v:shape></w:pict></w:r>'
+        '</w:p>')
+    sdt = (
+        '<w:sdt xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/'
+        '2006/main"><w:sdtContent><w:p><w:r><w:t>in control</w:t></w:r>'
+        '</w:p></w:sdtContent></w:sdt>')
+    body = doc.element.body
+    body.insert(len(body) - 1, parse_xml(textbox))
+    body.insert(len(body) - 1, parse_xml(sdt))
+    doc.add_table(rows=1, cols=1).cell(0, 0).add_table(
+        rows=1, cols=1).cell(0, 0).text = "nested"
+    doc.sections[0].header.paragraphs[0].add_run("header")
+    doc.save(str(path))
+    return str(path)
+
+
+def test_xpath_engine_reaches_textboxes_and_controls(tmp_path):
+    """xpath エンジンはテキストボックス・SDT・入れ子の表・ヘッダの全 run を更新する"""
+    from docx import Document
+    from docx.oxml.ns import qn
+    path = _make_docx_with_textbox(tmp_path / "in.docx")
+    stats = font_core.ProcessingStats()
+    out = font_core.process_office_file(path, TARGET_FONT, engine="xpath",
+                                        stats=stats)
+    doc = Document(out)
+    runs = list(doc.element.body.iter(qn('w:r')))
+    runs += doc.sections[0].header._element.iter(qn('w:r'))
+    assert len(runs) == 6 == stats.counts["runs"]
+    for r in runs:
+        rfonts = r.find(qn('w:rPr') + '/' + qn('w:rFonts'))
+        assert rfonts.get(qn('w:eastAsia')) == TARGET_FONT
+
+    # object エンジンはテキストボックス内の run を更新しない（既知の制限）
+    obj_out = str(tmp_path / "object.docx")
+    font_core.change_word_font(path, TARGET_FONT).save(obj_out)
+    boxed = [r for r in Document(obj_out).element.body.iter(qn('w:r'))
+             if r.xpath('ancestor::w:txbxContent')]
+    assert boxed and boxed[0].find(qn('w:rPr')) is None
+
+
+def test_process_office_stream_in_memory(tmp_path, monkeypatch):
+    """bytes/ストリームを入出力とし、全エンジンでファイルシステムに触れない"""
+    import builtins
+    import io
+    import docx as docx_module
+    from docx import Document
+    from openpyxl import load_workbook
+    from pptx import Presentation
+    prs = Presentation()
+    prs.slides.add_slide(prs.slide_layouts[0]).shapes.title.text = "t"
+    prs.save(str(tmp_path / "in.pptx"))
+    inputs = {
+        ".docx": _make_docx_with_textbox(tmp_path / "in.docx"),
+        ".xlsx": _make_xlsx(tmp_path / "in.xlsx"),
+        ".pptx": str(tmp_path / "in.pptx"),
+    }
+    data = {ext: open(path, "rb").read() for ext, path in inputs.items()}
+    # 書式ライブラリの遅延 import を済ませてから open を禁止する
+    for ext in data:
+        font_core.process_office_stream(data[ext], ext, TARGET_FONT)
+
+    # 読み込みはライブラリ同梱のテンプレート（python-docx の既定ヘッダ等）のみ許可
+    library_dir = os.path.dirname(os.path.dirname(docx_module.__file__))
+    real_open = builtins.open
+
+    def library_reads_only(file, mode="r", *args, **kwargs):
+        if set(mode) & set("wax+") or not str(file).startswith(library_dir):
+            raise AssertionError(f"filesystem access: {file} ({mode})")
+        return real_open(file, mode, *args, **kwargs)
+
+    def no_files(*args, **kwargs):
+        raise AssertionError(f"filesystem access: {args}")
+    monkeypatch.setattr(builtins, "open", library_reads_only)
+    monkeypatch.setattr(os, "open", no_files)
+
+    outputs = {}
+    for engine in font_core.ENGINE_NAMES:
+        for ext in font_core._ENGINES[engine]:
+            out = font_core.process_office_stream(data[ext], ext[1:].upper(),
+                                                  TARGET_FONT, engine)
+            assert out[:2] == b"PK", (engine, ext)
+            outputs[engine, ext] = out
+
+    class _Pipe(io.RawIOBase):
+        """seek できない入力ストリーム"""
+        def __init__(self, payload):
+            self._buf = io.BytesIO(payload)
+
+        def readable(self):
+            return True
+
+        def readinto(self, b):
+            return self._buf.readinto(b)
+    sink = io.BytesIO()
+    assert font_core.process_office_stream(
+        _Pipe(data[".xlsx"]), ".xlsx", TARGET_FONT, output=sink) is None
+    monkeypatch.undo()
+
+    wb = load_workbook(io.BytesIO(sink.getvalue()))
+    assert {font.name for font in wb._fonts} == {TARGET_FONT}
+    doc = Document(io.BytesIO(outputs["xpath", ".docx"]))
+    assert doc.element.body.xpath(
+        "string(.//w:txbxContent//w:rFonts/@w:ascii)") == TARGET_FONT
+    prs = Presentation(io.BytesIO(outputs["object", ".pptx"]))
+    run = prs.slides[0].shapes.title.text_frame.paragraphs[0].runs[0]
+    assert run.font.name == TARGET_FONT
+
+    try:
+        font_core.process_office_stream(b"", ".txt", TARGET_FONT)
+    except ValueError:
+        return
+    raise AssertionError("ValueError was expected for .txt")
@@ -0,0 +1,141 @@
+import sys
+import os
+import pickle
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from docx import Document  # noqa: E402
+from docx.oxml.ns import qn  # noqa: E402
+from openpyxl import Workbook, load_workbook  # noqa: E402
+from openpyxl.styles import Font  # noqa: E402
+from pptx import Presentation  # noqa: E402
+from pptx.util import Inches  # noqa: E402
+
+import font_core  # noqa: E402
+import font_verify  # noqa: E402
+from font_mapping import FontMapping  # noqa: E402
+
+RULES = [
+    ("MS Mincho", "Yu Mincho"),
+    ("Arial*", {"latin": "Segoe UI"}),
+    ("Wingdings", None),
+]
+
+
+def test_lookup_exact_pattern_script_and_leave_alone():
+    """完全一致 > パターン、用字系別ターゲット、変更しないルールの解決"""
+    mapping = FontMapping(RULES + [("MS*", "Meiryo")], default="Meiryo UI")
+    assert mapping.map("ms mincho", "east_asia") == "Yu Mincho"
+    assert mapping.map("MS Gothic") == "Meiryo"
+    assert mapping.map("Arial Narrow") == "Segoe UI"
+    assert mapping.map("Arial", "east_asia") is None
+    assert mapping.map("Wingdings") is None
+    assert mapping.map("Calibri", "cs") == "Meiryo UI"
+    assert mapping.map("Meiryo UI") is None  # 既に対象フォント
+    assert mapping.map(None) is None
+
+    clone = pickle.loads(pickle.dumps(mapping))
+    assert str(clone) == str(mapping)
+    assert clone.map("Arial Black") == "Segoe UI"
+
+
+def test_unknown_script_is_rejected():
+    try:
+        FontMapping([("Arial", {"greek": "Segoe UI"})])
+    except ValueError:
+        return
+    raise AssertionError("ValueError was expected for an unknown script")
+
+
+def _make_docx(path):
+    doc = Document()
+    para = doc.add_paragraph()
+    for text, name in (("a", "MS Mincho"), ("b", "Arial"),
+                       ("c", "Wingdings"), ("d", None)):
+        run = para.add_run(text)
+        if name:
+            run.font.name = name
+            run._element.rPr.rFonts.set(qn('w:eastAsia'), name)
+    doc.save(str(path))
+    return str(path)
+
+
+def _docx_fonts(path):
+    para = Document(path).paragraphs[0]
+    found = []
+    for run in para.runs:
+        rfonts = run._element.find(qn('w:rPr') + '/' + qn('w:rFonts'))
+        found.append(None if rfonts is None else
+                     (rfonts.get(qn('w:ascii')), rfonts.get(qn('w:eastAsia'))))
+    return found
+
+
+def test_docx_rules_applied_in_one_pass(tmp_path):
+    """Word: 全ルールを 1 回の変換で適用し、継承 run には rFonts を追加しない"""
+    path = _make_docx(tmp_path / "in.docx")
+    expected = [("Yu Mincho", "Yu Mincho"), ("Segoe UI", "Arial"),
+                ("Wingdings", "Wingdings"), None]
+    for engine in ("object", "xml", "xpath"):
+        out = font_core.process_office_file(path, FontMapping(RULES),
+                                            engine=engine)
+        assert _docx_fonts(out) == expected, engine
+
+
+def test_docx_styles_mapped_on_every_engine(tmp_path):
+    """Word: どのエンジンでも styles.xml の Normal スタイルをマッピングする"""
+    doc = Document()
+    normal = doc.styles["Normal"]
+    normal.font.name = "MS Mincho"
+    normal.element.rPr.rFonts.set(qn('w:eastAsia'), "MS Mincho")
+    doc.add_paragraph("inherits")
+    path = str(tmp_path / "in.docx")
+    doc.save(path)
+    mapping = FontMapping([("MS Mincho", "Yu Mincho")])
+    for engine in font_core.ENGINE_NAMES:
+        out = font_core.process_office_file(path, mapping, engine=engine)
+        rfonts = Document(out).styles["Normal"].element.rPr.rFonts
+        assert [rfonts.get(qn(attr)) for attr in
+                ('w:ascii', 'w:hAnsi', 'w:eastAsia')] == \
+            ["Yu Mincho"] * 3, engine
+        assert font_verify.verify_fonts(out, mapping).total == 0, engine
+
+
+def test_xlsx_rules_map_font_table(tmp_path):
+    """Excel: フォント定義ごとにルールを適用し、対象外はそのまま残す"""
+    wb = Workbook()
+    ws = wb.active
+    for row, name in enumerate(("MS Mincho", "Arial", "Wingdings"), 1):
+        ws.cell(row, 1, name).font = Font(name=name, size=10 + row)
+    path = str(tmp_path / "in.xlsx")
+    wb.save(path)
+    for engine in ("object", "xml"):
+        out = font_core.process_office_file(path, FontMapping(RULES),
+                                            engine=engine)
+        ws = load_workbook(out).active
+        assert [ws.cell(r, 1).font.name for r in (1, 2, 3)] == \
+            ["Yu Mincho", "Segoe UI", "Wingdings"], engine
+        assert ws.cell(3, 1).font.size == 13
+
+
+def test_pptx_rules_keep_theme_references(tmp_path):
+    """PowerPoint: 明示 typeface だけを変換し、+mn-lt 等は残す"""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    para = slide.shapes.add_textbox(
+        Inches(1), Inches(1), Inches(3), Inches(1)).text_frame.paragraphs[0]
+    for text, name in (("a", "MS Mincho"), ("b", "Arial")):
+        run = para.add_run()
+        run.text = text
+        run.font.name = name
+    path = str(tmp_path / "in.pptx")
+    prs.save(path)
+    for engine in ("object", "xml"):
+        out = font_core.process_office_file(path, FontMapping(RULES),
+                                            engine=engine)
+        runs = Presentation(out).slides[0].shapes[0].text_frame \
+            .paragraphs[0].runs
+        assert [r.font.name for r in runs] == ["Yu Mincho", "Segoe UI"]
+        master = zipfile.ZipFile(out).read(
+            "ppt/slideMasters/slideMaster1.xml")
+        assert b'typeface="+mn-lt"' in master, engine
@@ -0,0 +1,90 @@
+import sys
+import os
+import pstats
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+
+import font_cli  # noqa: E402
+import font_core  # noqa: E402
+import font_profile  # noqa: E402
+import font_watch  # noqa: E402
+from font_profile import Profiler  # noqa: E402
+
+TARGET_FONT = "Arial"
+
+
+def _make_xlsx(path):
+    wb = Workbook()
+    wb.active["A1"] = "x"
+    wb.save(str(path))
+    return str(path)
+
+
+def _reports(directory, suffix):
+    return sorted(str(directory / name) for name in os.listdir(directory)
+                  if name.endswith(suffix))
+
+
+def test_profile_writes_pstats_and_memory_report(tmp_path):
+    """profile= でファイル毎に .prof と tracemalloc 上位を含む .txt を書き出す"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    out_dir = tmp_path / "profiles"
+    font_core.process_office_file(path, TARGET_FONT,
+                                  profile=Profiler(str(out_dir),
+                                                   memory_top=5))
+    prof, = _reports(out_dir, ".prof")
+    assert os.path.basename(prof).startswith("in.xlsx.")
+    stats = pstats.Stats(prof)
+    assert any(name == "change_excel_font"
+               for _file, _line, name in stats.stats)
+    text, = _reports(out_dir, ".txt")
+    with open(text, encoding="utf-8") as fh:
+        report = fh.read()
+    assert "result: ok" in report and "change_excel_font" in report
+    assert "tracemalloc peak" in report and "   1. " in report
+
+
+def test_profile_threshold_and_failed_files(tmp_path):
+    """閾値未満のファイルは保存せず、失敗したファイルも例外付きで記録する"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    out_dir = tmp_path / "profiles"
+    font_core.process_office_file(
+        path, TARGET_FONT, profile=Profiler(str(out_dir), min_seconds=3600))
+    assert not out_dir.exists()
+
+    bad = tmp_path / "bad.docx"
+    bad.write_bytes(b"not a zip")
+    with pytest.raises(Exception) as failure:
+        font_core.process_office_file(str(bad), TARGET_FONT,
+                                      profile=Profiler(str(out_dir)))
+    text, = _reports(out_dir, ".txt")
+    with open(text, encoding="utf-8") as fh:
+        assert f"result: {type(failure.value).__name__}" in fh.read()
+
+
+def test_profile_from_environment(tmp_path, monkeypatch):
+    """環境変数で有効化され、バッチのワーカーにも引き継がれる。profile=False で無効"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    out_dir = tmp_path / "profiles"
+    monkeypatch.setenv(font_profile.PROFILE_ENV, str(out_dir))
+    font_core.process_office_file(path, TARGET_FONT, profile=False)
+    assert not out_dir.exists()
+    result, = font_core.process_office_files([path], TARGET_FONT, jobs=1)
+    assert result.error is None and len(_reports(out_dir, ".prof")) == 1
+
+    monkeypatch.setenv(font_profile.MIN_SECONDS_ENV, "soon")
+    with pytest.raises(ValueError, match=font_profile.MIN_SECONDS_ENV):
+        Profiler.from_env()
+    # 不正値はファイル毎ではなく入口で 1 回だけ失敗し、何も変換しない
+    fresh = _make_xlsx(tmp_path / "fresh.xlsx")
+    with pytest.raises(ValueError, match=font_profile.MIN_SECONDS_ENV):
+        next(font_core.process_office_files([fresh], TARGET_FONT, jobs=1))
+    assert font_cli.main([fresh]) == 2
+    with pytest.raises(ValueError, match=font_profile.MIN_SECONDS_ENV):
+        font_watch.WatchFolder(str(tmp_path / "in"), str(tmp_path / "out"))
+    assert not os.path.exists(font_core.output_path_for(fresh))
+    monkeypatch.delenv(font_profile.PROFILE_ENV)
+    assert Profiler.from_env() is None
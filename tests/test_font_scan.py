@@ -0,0 +1,135 @@
+import sys
+import os
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from docx import Document  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+from openpyxl.cell.rich_text import CellRichText, TextBlock  # noqa: E402
+from openpyxl.cell.text import InlineFont  # noqa: E402
+from openpyxl.styles import Font  # noqa: E402
+from pptx import Presentation  # noqa: E402
+from pptx.util import Inches  # noqa: E402
+
+import font_core  # noqa: E402
+import font_scan  # noqa: E402
+import ooxml_engines  # noqa: E402
+
+TARGET_FONT = "Arial"
+
+
+PLAIN_DOCX_TYPES = (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'content-types"><Default Extension="rels" ContentType="application/'
+    'vnd.openxmlformats-package.relationships+xml"/><Default Extension="xml"'
+    ' ContentType="application/xml"/><Override PartName="/word/document.xml"'
+    ' ContentType="application/vnd.openxmlformats-officedocument.'
+    'wordprocessingml.document.main+xml"/></Types>')
+PLAIN_DOCX_RELS = (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships"><Relationship Id="rId1" Type="http://schemas.'
+    'openxmlformats.org/officeDocument/2006/relationships/officeDocument"'
+    ' Target="word/document.xml"/></Relationships>')
+PLAIN_DOCX_DOCUMENT = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+    'wordprocessingml/2006/main"><w:body><w:p><w:r><w:t>x</w:t></w:r></w:p>'
+    '</w:body></w:document>')
+
+
+def _make_docx(path):
+    doc = Document()
+    doc.add_paragraph().add_run("x").font.name = "MS Mincho"
+    doc.save(str(path))
+    return str(path)
+
+
+def test_scan_docx_reports_runs_styles_and_theme(tmp_path):
+    """run/スタイル/テーマ毎にフォント名と出現数を返し、何も書き込まない"""
+    path = _make_docx(tmp_path / "in.docx")
+    before = os.listdir(tmp_path)
+    inventory = font_scan.scan_fonts(path)
+    assert os.listdir(tmp_path) == before
+    assert inventory.locations["runs"]["MS Mincho"] >= 1
+    assert "Calibri" in inventory.locations["theme"]
+    assert "styles" in inventory.locations
+    assert inventory.theme_referenced  # docDefaults の asciiTheme 等
+    assert not font_scan.uses_only(inventory, TARGET_FONT)
+
+
+def test_scan_xlsx_fonts_and_rich_text(tmp_path):
+    """workbook._fonts 相当と共有文字列のリッチテキスト rFont を報告する"""
+    wb = Workbook()
+    wb.active["A1"] = "plain"
+    wb.active["A1"].font = Font(name="MS Gothic")
+    wb.active["A2"] = CellRichText(
+        [TextBlock(InlineFont(rFont="Meiryo"), "rich")])
+    path = str(tmp_path / "in.xlsx")
+    wb.save(path)
+    inventory = font_scan.scan_fonts(path)
+    assert "MS Gothic" in inventory.locations["fonts"]
+    assert inventory.locations["rich_text"] == {"Meiryo": 1}
+
+
+def test_scan_pptx_typefaces_and_theme_references(tmp_path):
+    """a:latin/a:ea は位置別に集計し、+mn-lt 等はテーマ参照として扱う"""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    run = slide.shapes.add_textbox(
+        Inches(1), Inches(1), Inches(2), Inches(1)).text_frame.paragraphs[0]
+    run = run.add_run()
+    run.text = "x"
+    run.font.name = "Yu Gothic"
+    path = str(tmp_path / "in.pptx")
+    prs.save(path)
+    inventory = font_scan.scan_fonts(path)
+    assert inventory.locations["latin"]["Yu Gothic"] == 1
+    assert inventory.theme_referenced
+
+
+def test_skip_uniform_leaves_uniform_files_alone(tmp_path):
+    """対象フォントのみのファイルは読込/保存せずスキップし、それ以外は変換する"""
+    path = _make_docx(tmp_path / "in.docx")
+    uniform = str(tmp_path / "uniform.docx")
+    ooxml_engines.change_word_font_theme(path, TARGET_FONT).save(uniform)
+    assert font_scan.uses_only(font_scan.scan_fonts(uniform), TARGET_FONT)
+
+    stats = font_core.ProcessingStats()
+    assert font_core.process_office_file(
+        uniform, TARGET_FONT, stats=stats, skip_uniform=True) is None
+    assert stats.counts["skipped"] == 1 and "load" not in stats.timings
+    assert not os.path.exists(font_core.output_path_for(uniform))
+
+    out = font_core.process_office_file(path, TARGET_FONT, skip_uniform=True)
+    assert zipfile.is_zipfile(out)
+
+    results = {r.path: r for r in font_core.process_office_files(
+        [path, uniform], TARGET_FONT, jobs=1, skip_uniform=True)}
+    assert results[uniform].skipped and results[uniform].error is None
+    assert not results[path].skipped and results[path].output_path
+
+
+def test_uses_only_is_false_without_any_named_font(tmp_path):
+    """rFonts もテーマもない docx は既定フォント表示のため「統一済み」としない"""
+    path = str(tmp_path / "plain.docx")
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("[Content_Types].xml", PLAIN_DOCX_TYPES)
+        zf.writestr("_rels/.rels", PLAIN_DOCX_RELS)
+        zf.writestr("word/document.xml", PLAIN_DOCX_DOCUMENT)
+    inventory = font_scan.scan_fonts(path)
+    assert inventory.error is None
+    assert not any(inventory.locations.values())
+    assert not font_scan.uses_only(inventory, TARGET_FONT)
+    assert font_core.process_office_file(path, TARGET_FONT,
+                                         skip_uniform=True)
+
+
+def test_scan_office_files_reports_errors(tmp_path):
+    """読めないファイルは error 付きで返り、バッチは止まらない"""
+    good = _make_docx(tmp_path / "good.docx")
+    bad = tmp_path / "bad.docx"
+    bad.write_bytes(b"not a zip")
+    results = {inv.path: inv for inv in font_core.scan_office_files(
+        [good, str(bad)], jobs=1)}
+    assert results[good].error is None and results[good].locations
+    assert results[str(bad)].error
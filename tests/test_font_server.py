@@ -0,0 +1,174 @@
+import sys
+import os
+import io
+import json
+import signal
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest  # noqa: E402
+from openpyxl import Workbook, load_workbook  # noqa: E402
+
+import font_server  # noqa: E402
+
+TARGET_FONT = "Arial"
+
+
+def _xlsx_bytes():
+    wb = Workbook()
+    wb.active["A1"] = "x"
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+class _Running:
+    """ポート 0 でサーバを起動し、終了時に停止する"""
+
+    def __init__(self, **kwargs):
+        self.server = font_server.FontServer(("127.0.0.1", 0), TARGET_FONT,
+                                             jobs=1, **kwargs)
+        self.url = "http://127.0.0.1:%d" % self.server.server_address[1]
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.server.serve_forever)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self._thread.join()
+        self.server.server_close()
+
+    def request(self, path, data=None):
+        """(status, headers, body)；エラー応答も例外にせず返す"""
+        try:
+            with urllib.request.urlopen(self.url + path, data,
+                                        timeout=30) as resp:
+                return resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+    def metrics(self):
+        return json.loads(self.request("/metrics")[2])
+
+
+def test_convert_upload_and_metrics():
+    """アップロードした xlsx を変換して返し、metrics に計上する"""
+    data = _xlsx_bytes()
+    with _Running() as service:
+        status, headers, body = service.request(
+            "/convert?filename=book.xlsx&font=Calibri", data)
+        assert status == 200
+        assert 'filename="book_modified.xlsx"' in \
+            headers["Content-Disposition"]
+        wb = load_workbook(io.BytesIO(body))
+        assert {font.name for font in wb._fonts} == {"Calibri"}
+
+        status, _, body = service.request(
+            "/convert?format=xlsx&engine=xml", data)
+        assert status == 200 and body[:2] == b"PK"
+
+        assert service.request("/convert?filename=a.txt", data)[0] == 400
+        assert service.request(
+            "/convert?format=xlsx&engine=xpath", data)[0] == 400
+        assert service.request("/convert?format=docx", b"not a zip")[0] == \
+            422
+        metrics = service.metrics()
+    assert metrics["requests"]["ok"] == 2
+    assert metrics["requests"]["bad_request"] == 2
+    assert metrics["requests"]["failed"] == 1
+    assert metrics["bytes_in"] >= 2 * len(data)
+    assert metrics["in_flight"] == 0 and metrics["capacity"] == 2
+
+
+def test_size_limit_and_timeout():
+    """上限超のアップロードは 413、期限切れの変換は 504"""
+    data = _xlsx_bytes()
+    with _Running(max_bytes=len(data) - 1) as service:
+        assert service.request("/convert?format=xlsx", data)[0] == 413
+        assert service.metrics()["requests"]["too_large"] == 1
+    with _Running(convert_timeout=0) as service:
+        assert service.request("/convert?format=xlsx", data)[0] == 504
+        metrics = service.metrics()
+        assert metrics["requests"]["timeout"] == 1
+
+
+def test_stalled_upload_releases_its_slot():
+    """本文を送らないクライアントは read_timeout で 408 となり槽を返す"""
+    with _Running(queue_size=0, read_timeout=0.2) as service:
+        host, port = service.server.server_address[:2]
+        with socket.create_connection((host, port), timeout=30) as sock:
+            sock.sendall(b"POST /convert?format=xlsx HTTP/1.1\r\n"
+                         b"Host: x\r\nContent-Length: 100\r\n\r\nPK")
+            reply = sock.makefile("rb").readline()
+        assert reply.split()[1] == b"408"
+        assert service.request("/convert?format=xlsx",
+                               _xlsx_bytes())[0] == 200
+
+
+def test_full_pool_answers_busy():
+    """同時実行数＋待機数を超えた要求は 503（Retry-After 付き）"""
+    with _Running(queue_size=0) as service:
+        service.server._slots.acquire()  # 実行中の変換 1 件を模擬
+        try:
+            status, headers, _ = service.request("/convert?format=xlsx",
+                                                 _xlsx_bytes())
+        finally:
+            service.server._slots.release()
+        assert status == 503 and headers["Retry-After"] == "1"
+        assert service.metrics()["requests"]["busy"] == 1
+
+
+def test_non_ascii_and_control_characters_in_filename():
+    """日本語名は filename*（RFC 5987）で返し、CR/LF によるヘッダ注入を防ぐ"""
+    data = _xlsx_bytes()
+    with _Running() as service:
+        status, headers, body = service.request(
+            "/convert?filename=%E5%A0%B1%E5%91%8A.xlsx", data)
+        assert status == 200 and body[:2] == b"PK"
+        disposition = headers["Content-Disposition"]
+        assert 'filename="__' in disposition
+        assert "filename*=UTF-8''%E5%A0%B1%E5%91%8A_modified.xlsx" in \
+            disposition
+
+        status, headers, _ = service.request(
+            "/convert?filename=a%0D%0AX-Injected:%201%22.xlsx", data)
+        assert status == 200 and "X-Injected" not in headers
+        assert 'filename="aX-Injected: 1__modified.xlsx"' in \
+            headers["Content-Disposition"]
+
+
+def test_body_is_read_only_after_admission():
+    """スロットが空くまで本文を読まず、503 で返す"""
+    with _Running(queue_size=0) as service:
+        reads = []
+        service.server._slots.acquire()
+        try:
+            with pytest.raises(font_server._HttpError) as busy:
+                service.server.convert(lambda: reads.append(1), ".xlsx",
+                                       TARGET_FONT, "object")
+        finally:
+            service.server._slots.release()
+        assert busy.value.status == 503 and reads == []
+
+
+def test_pool_restarts_after_worker_dies():
+    """ワーカープロセスが落ちてもプールを作り直し、以降の要求は成功する"""
+    data = _xlsx_bytes()
+    with _Running() as service:
+        pool = service.server.pool
+        for pid in list(pool._processes):
+            os.kill(pid, signal.SIGKILL)
+        deadline = time.time() + 10
+        while not pool._broken and time.time() < deadline:
+            time.sleep(0.05)
+        assert service.request("/convert?format=xlsx", data)[0] == 200
+        assert service.server.pool is not pool
+        assert service.request("/convert?format=xlsx", data)[0] == 200
+        assert service.metrics()["in_flight"] == 0
@@ -7,6 +7,7 @@ from docx import Document  # noqa: E402
 from openpyxl import Workbook, load_workbook  # noqa: E402
 from pptx import Presentation  # noqa: E402
 from pptx.util import Inches  # noqa: E402
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer  # noqa: E402
 
 import font_unifier  # noqa: E402
 
@@ -234,6 +235,40 @@ def test_change_ppt_font_persists_after_save(tmp_path):
             assert run.font.name == TARGET_FONT
 
 
+def test_change_ppt_font_masters_layouts_notes_once(tmp_path):
+    """マスター/レイアウト/ノートは部件ごとに一度だけ処理され、txStyles も更新される"""
+    from pptx.oxml.ns import qn as pptx_qn
+    from font_core import ProcessingStats
+
+    def convert(slides):
+        prs = Presentation()
+        for i in range(slides):
+            slide = prs.slides.add_slide(prs.slide_layouts[1])
+            slide.notes_slide.notes_text_frame.text = f"note {i}"
+        path = str(tmp_path / f"deck{slides}.pptx")
+        prs.save(path)
+        stats = ProcessingStats()
+        return font_unifier.change_ppt_font(path, TARGET_FONT, stats), stats
+
+    prs, few = convert(2)
+    _, many = convert(20)
+    # マスター/レイアウト/ノートマスターは共有: 増えるのはスライドとノート分だけ
+    assert many.counts["parts"] - few.counts["parts"] == 18 * 2
+
+    master = prs.slide_masters[0]
+    tx_styles = master._element.find(pptx_qn('p:txStyles'))
+    latins = list(tx_styles.iter(pptx_qn('a:latin')))
+    assert latins and {e.get('typeface') for e in latins} == {TARGET_FONT}
+    for layout in master.slide_layouts:
+        for defrpr in layout._element.iter(pptx_qn('a:defRPr')):
+            assert defrpr.find(pptx_qn('a:ea')).get('typeface') == TARGET_FONT
+    notes_master = prs.slides[0].notes_slide.part.notes_master
+    assert {e.get('typeface') for e in notes_master._element.iter(
+        pptx_qn('a:latin'))} == {TARGET_FONT}
+    note_run = prs.slides[0].notes_slide.notes_text_frame.paragraphs[0].runs[0]
+    assert note_run.font.name == TARGET_FONT
+
+
 # ---------------------------------------------------------------------------
 # 追加: S1 Excel スタイル保持 / S2 東アジアフォント / S3 チャート / S4 拡張子
 # ---------------------------------------------------------------------------
@@ -363,3 +398,117 @@ def test_process_office_file_unsupported_extension(tmp_path):
     except ValueError:
         return
     raise AssertionError("ValueError was expected for .txt")
+
+
+def test_worker_emits_progress_and_cancelled(tmp_path):
+    """ワーカーは進捗 % を通知し、キャンセル時は cancelled を発行する"""
+    path = _make_pptx(tmp_path / "in.pptx")
+    worker = font_unifier.FontProcessingWorker(path, TARGET_FONT)
+    percents, done = [], []
+    worker.progress.connect(percents.append)
+    worker.finished.connect(done.append)
+    worker.run()
+    assert percents[-1] == 100 and percents == sorted(percents)
+    assert done and os.path.exists(done[0])
+
+    os.remove(done[0])
+    worker = font_unifier.FontProcessingWorker(path, TARGET_FONT)
+    cancelled = []
+    worker.cancelled.connect(lambda: cancelled.append(True))
+    worker.cancel()
+    worker.run()
+    assert cancelled
+    assert not os.path.exists(done[0])
+
+
+_app = None  # キュー接続のシグナル配送に必要（GC されないよう保持）
+
+
+def _run_batch(job_queue, paths):
+    """バッチを投入し、all_done までイベントループを回して状態遷移を返す"""
+    global _app
+    _app = QCoreApplication.instance() or QCoreApplication([])
+    loop = QEventLoop()
+    changes = []
+    job_queue.job_changed.connect(lambda *args: changes.append(args))
+    job_queue.all_done.connect(loop.quit)
+    QTimer.singleShot(30000, loop.quit)
+    job_queue.submit(paths, TARGET_FONT)
+    if job_queue.is_running():
+        loop.exec()
+    return changes
+
+
+def test_job_queue_reports_state_per_file(tmp_path):
+    """複数ファイルを並列数の上限付きで変換し、ファイルごとに状態を通知する"""
+    paths = [_make_pptx(tmp_path / f"in{i}.pptx") for i in range(5)]
+    bad = tmp_path / "broken.docx"
+    bad.write_bytes(b"not a zip")
+    paths.append(str(bad))
+    job_queue = font_unifier.JobQueue(max_jobs=2)
+    changes = _run_batch(job_queue, paths)
+
+    assert not job_queue.is_running()
+    assert job_queue.states == ["done"] * 5 + ["error"]
+    assert job_queue.counts() == {"done": 5, "error": 1}
+    for row in range(5):
+        assert [state for r, state, _ in changes if r == row] == \
+            ["running", "done"]
+        assert os.path.exists(job_queue.details[row])
+    assert job_queue.details[5]
+
+
+def test_job_queue_reports_progress_per_file(tmp_path):
+    """各ファイルの進捗 % を通知し、バッチ全体の合計は完了時に 100×件数"""
+    paths = [_make_pptx(tmp_path / f"in{i}.pptx") for i in range(2)]
+    job_queue = font_unifier.JobQueue(max_jobs=1)
+    progress = {}
+    job_queue.job_progress.connect(
+        lambda row, percent: progress.setdefault(row, []).append(percent))
+    _run_batch(job_queue, paths)
+
+    assert job_queue.states == ["done", "done"]
+    for percents in progress.values():
+        assert percents[-1] == 100 and percents == sorted(percents)
+        assert len(percents) > 2  # 0 → 100 の 1 段ではなく段階的
+    assert job_queue.percent_done == 200 and job_queue.percents == [100, 100]
+
+
+def test_job_queue_cancel_skips_queued_files(tmp_path):
+    """キャンセル後、待機中のファイルは処理されずに cancelled になる"""
+    paths = [_make_pptx(tmp_path / f"in{i}.pptx") for i in range(6)]
+    job_queue = font_unifier.JobQueue(max_jobs=1)
+    job_queue.job_changed.connect(lambda *args: job_queue.cancel())
+    _run_batch(job_queue, paths)
+
+    assert job_queue.counts()["cancelled"] >= len(paths) - 1
+    assert "error" not in job_queue.states
+    outputs = [p for p in os.listdir(tmp_path) if "_modified" in p]
+    assert len(outputs) <= 1
+
+
+def test_font_family_cache_round_trip_and_fingerprint(tmp_path):
+    """フォント一覧キャッシュの保存/読込と、フォント追加での指紋変化"""
+    cache = str(tmp_path / "cache" / "families.json")
+    assert font_unifier.load_cached_families(cache) == (None, [])
+
+    font_dir = tmp_path / "fonts"
+    font_dir.mkdir()
+    (font_dir / "a.ttf").write_bytes(b"a")
+    before = font_unifier.font_dirs_fingerprint([str(font_dir)])
+    assert font_unifier.font_dirs_fingerprint([str(font_dir)]) == before
+
+    font_unifier.save_cached_families(before, ["Arial", "メイリオ"], cache)
+    assert font_unifier.load_cached_families(cache) == \
+        (before, ["Arial", "メイリオ"])
+
+    (font_dir / "b.otf").write_bytes(b"bb")
+    assert font_unifier.font_dirs_fingerprint([str(font_dir)]) != before
+
+
+def test_font_family_cache_outside_result_cache():
+    """フォント一覧キャッシュは結果キャッシュのディレクトリ外（--clear-cache で消えない）"""
+    import font_cache
+    result_dir = os.path.abspath(font_cache.DEFAULT_CACHE_DIR)
+    family_cache = os.path.abspath(font_unifier.FONT_FAMILY_CACHE)
+    assert os.path.commonpath([result_dir, family_cache]) != result_dir
@@ -0,0 +1,123 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from docx import Document  # noqa: E402
+from docx.oxml import parse_xml  # noqa: E402
+from docx.oxml.ns import nsmap  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+from openpyxl.cell.rich_text import CellRichText, TextBlock  # noqa: E402
+from openpyxl.cell.text import InlineFont  # noqa: E402
+from openpyxl.styles import Font  # noqa: E402
+from pptx import Presentation  # noqa: E402
+from pptx.util import Inches  # noqa: E402
+
+import font_core  # noqa: E402
+import font_verify  # noqa: E402
+from font_mapping import FontMapping  # noqa: E402
+
+TARGET_FONT = "Arial"
+
+_TEXT_BOX = (
+    '<w:pict xmlns:w="%s" xmlns:v="urn:schemas-microsoft-com:vml">'
+    '<v:shape><v:textbox><w:txbxContent><w:p><w:r><w:rPr>'
+    '<w:rFonts w:ascii="MS Gothic" w:hAnsi="MS Gothic"'
+    ' w:eastAsia="MS Gothic" w:cs="MS Gothic"/>'
+    '</w:rPr><w:t>box</w:t></w:r></w:p></w:txbxContent></v:textbox>'
+    '</v:shape></w:pict>' % nsmap["w"])
+
+
+def _by_location(result):
+    return {(i.part, i.location, i.reference): i for i in result.issues}
+
+
+def test_verify_docx_locates_runs_and_text_boxes(tmp_path):
+    """本文 run とテキストボックス内の旧フォントを位置付きで報告し、変換後は 0 件"""
+    doc = Document()
+    doc.add_paragraph().add_run("x").font.name = "MS Mincho"
+    doc.add_paragraph().add_run()._r.append(parse_xml(_TEXT_BOX))
+    path = str(tmp_path / "in.docx")
+    doc.save(path)
+
+    issues = _by_location(font_verify.verify_fonts(path, TARGET_FONT))
+    run = issues["word/document.xml", "paragraph 1 / run 1 / rPr", "w:ascii"]
+    assert run.kind == "font" and run.font == "MS Mincho"
+    box = "paragraph 2 / run 1 / text box 1 / paragraph 1 / run 1 / rPr"
+    assert issues["word/document.xml", box, "w:eastAsia"].font == "MS Gothic"
+    # run 1 は eastAsia を継承するので styles.xml の既定も確認される
+    defaults = issues["word/styles.xml", "document defaults / rPr",
+                      'w:eastAsiaTheme="minorEastAsia"']
+    assert defaults.kind == "theme"
+
+    out = font_core.process_office_file(path, TARGET_FONT, "xml")
+    assert font_verify.verify_fonts(out, TARGET_FONT).total == 0
+    # object エンジンは python-docx の段落のみ辿るため、テキストボックスが残る
+    out = font_core.process_office_file(path, TARGET_FONT, "object")
+    result = font_verify.verify_fonts(out, TARGET_FONT)
+    assert {i.location for i in result.issues} == {box}
+
+
+def test_verify_xlsx_font_table_scheme_and_rich_text(tmp_path):
+    """フォント表の name/scheme とインライン rich text の rFont をセル単位で報告"""
+    wb = Workbook()
+    wb.active["A1"] = "plain"
+    wb.active["A1"].font = Font(name="MS Gothic")
+    wb.active["B2"] = CellRichText(
+        [TextBlock(InlineFont(rFont="Meiryo"), "rich")])
+    path = str(tmp_path / "in.xlsx")
+    wb.save(path)
+
+    result = font_verify.verify_fonts(path, TARGET_FONT, limit=2)
+    assert len(result.issues) == 2 and result.total > 2
+    issues = _by_location(font_verify.verify_fonts(path, TARGET_FONT))
+    assert issues["xl/styles.xml", "font 1", 'x:scheme="minor"'].kind == \
+        "scheme"
+    assert any(font.font == "MS Gothic" for font in issues.values())
+    rich = issues["xl/worksheets/sheet1.xml", "cell B2 / run 1 / rPr",
+                  "x:rFont"]
+    assert rich.font == "Meiryo"
+
+    out = font_core.process_office_file(path, TARGET_FONT, "xml")
+    assert font_verify.verify_fonts(out, TARGET_FONT).total == 0
+
+
+def test_verify_pptx_theme_references_and_mapping(tmp_path):
+    """マッピングで残ったテーマ参照 (+mn-lt) を解決先フォント付きで報告する"""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    frame = slide.shapes.add_textbox(
+        Inches(1), Inches(1), Inches(2), Inches(1)).text_frame
+    run = frame.paragraphs[0].add_run()
+    run.text = "x"
+    run.font.name = "Yu Gothic"
+    path = str(tmp_path / "in.pptx")
+    prs.save(path)
+
+    mapping = FontMapping([("Yu Gothic", "Meiryo"), ("Calibri", "Meiryo")])
+    out = font_core.process_office_file(path, mapping, "xml")
+    result = font_verify.verify_fonts(out, mapping)
+    assert result.total and all(i.kind == "theme" for i in result.issues)
+    assert {i.font for i in result.issues} == {"Calibri"}
+    assert any(i.part == "ppt/presentation.xml" and
+               i.location.startswith("default text style / level 1")
+               for i in result.issues)
+
+    out = font_core.process_office_file(path, mapping, "theme")
+    assert font_verify.verify_fonts(out, mapping).total == 0
+
+
+def test_process_office_files_verifies_outputs(tmp_path):
+    """verify=True でワーカー内で出力を検証し、読めない出力は error を返す"""
+    doc = Document()
+    doc.add_paragraph().add_run("x").font.name = "MS Mincho"
+    path = str(tmp_path / "in.docx")
+    doc.save(path)
+    result, = font_core.process_office_files([path], TARGET_FONT, jobs=1,
+                                             stats=True, verify=True)
+    assert result.verify.total == 0 and result.verify.error is None
+    assert "verify" in result.timings
+
+    bad = tmp_path / "bad_modified.docx"
+    bad.write_bytes(b"not a zip")
+    assert font_core._verify_one(str(bad), TARGET_FONT).error
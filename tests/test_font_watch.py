@@ -0,0 +1,109 @@
+import errno
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from openpyxl import Workbook  # noqa: E402
+
+import font_watch  # noqa: E402
+
+TARGET_FONT = "Arial"
+
+
+def _make_xlsx(path):
+    wb = Workbook()
+    wb.active["A1"] = "x"
+    wb.save(str(path))
+    return str(path)
+
+
+def _wait_for(predicate, timeout=20):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def test_poll_waits_until_file_is_stable(tmp_path):
+    """書き込み中（サイズ変化中）のファイルは安定するまで取り込まない"""
+    inbox, outbox = tmp_path / "in", tmp_path / "out"
+    inbox.mkdir()
+    watcher = font_watch.WatchFolder(str(inbox), str(outbox), jobs=1,
+                                     settle_polls=2)
+    path = inbox / "growing.xlsx"
+    path.write_bytes(b"PK")
+    (inbox / "~$growing.xlsx").write_bytes(b"lock")
+    watcher.poll()
+    with open(path, "ab") as fh:
+        fh.write(b"more")
+    watcher.poll()
+    assert watcher.queue.qsize() == 0 and path.exists()
+    watcher.poll()
+    assert watcher.queue.qsize() == 1 and not path.exists()
+    assert (inbox / font_watch.PROCESSING_DIR / "growing.xlsx").exists()
+    assert (inbox / "~$growing.xlsx").exists()
+
+
+def test_full_queue_leaves_files_in_inbox(tmp_path):
+    """キューが満杯の間は新しいファイルを inbox に残す（背圧）"""
+    inbox, outbox = tmp_path / "in", tmp_path / "out"
+    inbox.mkdir()
+    for name in ("a.xlsx", "b.xlsx"):
+        _make_xlsx(inbox / name)
+    watcher = font_watch.WatchFolder(str(inbox), str(outbox), jobs=1,
+                                     queue_size=1, interval=0.01,
+                                     settle_polls=1)
+    poller = threading.Thread(target=watcher.poll)
+    poller.start()
+    _wait_for(lambda: watcher.queue.qsize() == 1)
+    time.sleep(0.1)
+    assert (inbox / "b.xlsx").exists()
+    watcher.stop()
+    poller.join(5)
+    assert not poller.is_alive() and (inbox / "b.xlsx").exists()
+
+
+def test_run_converts_and_moves_failures(tmp_path):
+    """成功は outbox へ、失敗は例外テキスト付きで error フォルダへ"""
+    inbox, outbox, errors = tmp_path / "in", tmp_path / "out", tmp_path / "e"
+    inbox.mkdir()
+    watcher = font_watch.WatchFolder(str(inbox), str(outbox), str(errors),
+                                     TARGET_FONT, jobs=1, interval=0.02)
+    runner = threading.Thread(target=watcher.run)
+    runner.start()
+    try:
+        _make_xlsx(inbox / "good.xlsx")
+        (inbox / "bad.docx").write_bytes(b"not a zip")
+        _wait_for(lambda: (outbox / "good_modified.xlsx").exists()
+                  and (errors / "bad.docx.error.txt").exists())
+    finally:
+        watcher.stop()
+        runner.join(10)
+    assert (outbox / "originals" / "good.xlsx").exists()
+    assert (errors / "bad.docx").exists()
+    assert "Traceback" in (errors / "bad.docx.error.txt").read_text(
+        encoding="utf-8")
+    assert not os.listdir(inbox / font_watch.PROCESSING_DIR)
+
+
+def test_move_never_overwrites_and_crosses_devices(tmp_path, monkeypatch):
+    """同名ファイルは上書きせず連番を付け、別ファイルシステムへも移動できる"""
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    src.mkdir()
+    dest.mkdir()
+    (dest / "a.docx").write_text("old")
+    (dest / "a (2).docx.error.txt").write_text("old")
+
+    def cross_device(*args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "rename", cross_device)
+    (src / "a.docx").write_text("new")
+    target = font_watch._move(str(src / "a.docx"), str(dest), ".error.txt")
+    assert target == str(dest / "a (3).docx")
+    assert (dest / "a (3).docx").read_text() == "new"
+    assert (dest / "a.docx").read_text() == "old"
+    assert not (src / "a.docx").exists()
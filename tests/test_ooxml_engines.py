@@ -0,0 +1,496 @@
+import sys
+import os
+import re
+import struct
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from docx import Document  # noqa: E402
+from docx.oxml.ns import nsmap, qn  # noqa: E402
+from openpyxl import Workbook, load_workbook  # noqa: E402
+from openpyxl.styles import Font  # noqa: E402
+from pptx import Presentation  # noqa: E402
+from pptx.chart.data import CategoryChartData  # noqa: E402
+from pptx.enum.chart import XL_CHART_TYPE  # noqa: E402
+from pptx.oxml.ns import qn as pptx_qn  # noqa: E402
+from pptx.util import Inches  # noqa: E402
+
+import font_unifier  # noqa: E402
+import ooxml_engines  # noqa: E402
+
+TARGET_FONT = "Arial"
+
+
+def _members(path):
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+# ---------------------------------------------------------------------------
+# Excel (.xlsx) styles-only engine
+# ---------------------------------------------------------------------------
+
+def _make_xlsx(path):
+    """複数シート・複数フォント定義を持つ xlsx を生成する"""
+    wb = Workbook()
+    ws = wb.active
+    ws["A1"] = "Name"
+    ws["A2"] = "Styled"
+    ws["A2"].font = Font(name="MS Gothic", size=14, bold=True)
+    ws2 = wb.create_sheet("Second")
+    ws2["B3"] = 42
+    wb.save(str(path))
+    return str(path)
+
+
+def test_excel_xml_engine_rewrites_fonts_table(tmp_path):
+    """全 <font> の name が置換され、<scheme> が消える"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="xml")
+    styles = zipfile.ZipFile(out).read("xl/styles.xml").decode("utf-8")
+    assert "scheme" not in styles
+    assert set(re.findall(r'<name val="([^"]+)"', styles)) == {TARGET_FONT}
+
+    wb = load_workbook(out)
+    f = wb["Sheet"]["A2"].font
+    assert f.name == TARGET_FONT
+    assert f.size == 14
+    assert f.bold is True
+    assert wb["Second"]["B3"].font.name == TARGET_FONT
+
+
+def test_excel_xml_engine_copies_other_parts_verbatim(tmp_path):
+    """styles.xml 以外のメンバーはバイト単位で同一"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="xml")
+    before, after = _members(path), _members(out)
+    assert list(before) == list(after)
+    for name in before:
+        if name != "xl/styles.xml":
+            assert before[name] == after[name], name
+
+
+def test_excel_xml_engine_matches_object_engine(tmp_path):
+    """object エンジンと同じフォント定義になる"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    expected = font_unifier.change_excel_font(path, TARGET_FONT)
+    out = str(tmp_path / "xml.xlsx")
+    ooxml_engines.change_excel_font_xml(path, TARGET_FONT).save(out)
+    actual = load_workbook(out)
+    assert [(f.name, f.sz, f.b, f.scheme) for f in actual._fonts] == \
+        [(f.name, f.sz, f.b, f.scheme) for f in expected._fonts]
+
+
+def _make_rich_xlsx(path):
+    """共有文字列（xlsxwriter）とインライン文字列（openpyxl）にリッチテキストを持つ
+    2 つの xlsx を生成する。どちらも 2 枚目のシートは書式なし文字列のみ"""
+    import xlsxwriter
+    from openpyxl.cell.rich_text import CellRichText, TextBlock
+    from openpyxl.cell.text import InlineFont
+    shared = str(path) + ".shared.xlsx"
+    wb = xlsxwriter.Workbook(shared)
+    bold = wb.add_format({"font_name": "Meiryo", "bold": True})
+    # 2 つ目の run は Calibri + <scheme val="minor">
+    wb.add_worksheet().write_rich_string("A1", bold, "rich", " tail")
+    wb.add_worksheet().write("A1", "plain")
+    wb.close()
+
+    inline = str(path) + ".inline.xlsx"
+    wb = Workbook()
+    wb.active["A1"] = CellRichText(
+        [TextBlock(InlineFont(rFont="MS Gothic", b=True), "rich"), " tail"])
+    wb.create_sheet("Plain")["A1"] = "plain"
+    wb.save(inline)
+    return shared, inline
+
+
+def _rich_runs(path, name):
+    """パート内の全 rPr について (rFont, scheme の有無) を列挙する"""
+    from lxml import etree
+    ns = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    root = etree.fromstring(zipfile.ZipFile(path).read(name))
+    return [(rpr.find(ns + "rFont").get("val"),
+             rpr.find(ns + "scheme") is not None)
+            for rpr in root.iter(ns + "rPr")]
+
+
+def test_excel_xml_engine_rewrites_rich_text(tmp_path):
+    """共有文字列・インライン文字列の rFont を置換し、rFont のないシートは無変更"""
+    from font_core import ProcessingStats
+    shared, inline = _make_rich_xlsx(tmp_path / "rich")
+    for path, part in ((shared, "xl/sharedStrings.xml"),
+                       (inline, "xl/worksheets/sheet1.xml")):
+        stats = ProcessingStats()
+        out = font_unifier.process_office_file(path, TARGET_FONT,
+                                               engine="xml", stats=stats)
+        assert _rich_runs(out, part) == [(TARGET_FONT, False)] * \
+            len(_rich_runs(path, part)), part
+        assert stats.counts["rich_text"] == len(_rich_runs(path, part))
+        assert _raw_member(out, "xl/worksheets/sheet2.xml") == \
+            _raw_member(path, "xl/worksheets/sheet2.xml")
+        wb = load_workbook(out, rich_text=True)
+        assert str(wb.worksheets[0]["A1"].value) == "rich tail"
+
+
+def test_excel_xml_engine_writes_sheet_data_once(tmp_path):
+    """インライン rich text のシートで <sheetData> を二重に出力しない"""
+    _shared, inline = _make_rich_xlsx(tmp_path / "rich")
+    for engine in ("xml", "theme"):
+        out = font_unifier.process_office_file(inline, TARGET_FONT,
+                                               engine=engine)
+        data = zipfile.ZipFile(out).read("xl/worksheets/sheet1.xml")
+        assert data.count(b"<sheetData") == 1, engine
+        assert data.rstrip().endswith(b"</worksheet>"), engine
+
+
+def test_theme_engine_and_mapping_rich_text(tmp_path):
+    """theme エンジンは scheme を残し、FontMapping は該当フォントのみ置換する"""
+    from font_mapping import FontMapping
+    shared, _inline = _make_rich_xlsx(tmp_path / "rich")
+    part = "xl/sharedStrings.xml"
+    out = font_unifier.process_office_file(shared, TARGET_FONT,
+                                           engine="theme")
+    assert _rich_runs(out, part) == [(TARGET_FONT, False),
+                                     (TARGET_FONT, True)]
+
+    mapping = FontMapping([("meiryo", "Yu Gothic")])
+    out = font_unifier.process_office_file(shared, mapping, engine="xml")
+    assert _rich_runs(out, part) == [("Yu Gothic", False), ("Calibri", True)]
+
+
+# ---------------------------------------------------------------------------
+# Word (.docx) streaming engine
+# ---------------------------------------------------------------------------
+
+def _make_docx(path, paragraphs=3):
+    """本文・表格・ヘッダ・主題参照付き run を持つ docx を生成する"""
+    doc = Document()
+    for i in range(paragraphs):
+        para = doc.add_paragraph()
+        para.add_run(f"Hello {i} ")
+        para.add_run("World").bold = True
+    rpr = doc.paragraphs[0].runs[0]._element.get_or_add_rPr()
+    rf = rpr.get_or_add_rFonts()
+    rf.set(qn('w:asciiTheme'), 'minorHAnsi')
+    rf.set(qn('w:eastAsiaTheme'), 'minorEastAsia')
+    table = doc.add_table(rows=1, cols=1)
+    table.cell(0, 0).add_table(rows=1, cols=1).cell(0, 0).text = "nested"
+    section = doc.sections[0]
+    section.header.is_linked_to_previous = False
+    section.header.paragraphs[0].add_run("header text")
+    doc.save(str(path))
+    return str(path)
+
+
+def _all_runs_rfonts(path):
+    """全パートの全 w:r の rFonts 属性を (パート名, 属性 dict) で列挙する"""
+    from lxml import etree
+    found = []
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            if re.fullmatch(r"word/(document|header\d*|footer\d*)\.xml", name):
+                root = etree.fromstring(zf.read(name))
+                for r in root.iter(qn('w:r')):
+                    rfonts = r.find(qn('w:rPr') + '/' + qn('w:rFonts'))
+                    found.append((name, {} if rfonts is None
+                                  else dict(rfonts.attrib)))
+    return found
+
+
+def test_word_xml_engine_sets_fonts_and_drops_theme(tmp_path):
+    """全 run に 4 属性が設定され、主題参照属性が消える"""
+    path = _make_docx(tmp_path / "in.docx")
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="xml")
+    runs = _all_runs_rfonts(out)
+    assert any(name.startswith("word/header") for name, _ in runs)
+    for name, attrs in runs:
+        for attr in ('w:ascii', 'w:hAnsi', 'w:eastAsia', 'w:cs'):
+            assert attrs.get(qn(attr)) == TARGET_FONT, (name, attr)
+        for attr in ooxml_engines.DOCX_THEME_ATTRS:
+            assert qn(attr) not in attrs
+
+
+def test_word_xml_engine_covers_footnotes_and_endnotes(tmp_path):
+    """脚注・文末脚注パートの run も他エンジンと同様に変換する"""
+    path = _make_docx(tmp_path / "in.docx")
+    with zipfile.ZipFile(path, "a") as zf:
+        for part in ("footnotes", "endnotes"):
+            zf.writestr(f"word/{part}.xml", (
+                '<w:%s xmlns:w="%s"><w:%s w:id="1"><w:p><w:r><w:rPr>'
+                '<w:rFonts w:ascii="MS Mincho"/></w:rPr><w:t>note</w:t>'
+                '</w:r></w:p></w:%s></w:%s>') % (
+                    part, nsmap['w'], part[:-1], part[:-1], part))
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="xml")
+    for part in ("word/footnotes.xml", "word/endnotes.xml"):
+        attrs, = _docx_rfonts(out, part)
+        assert attrs[qn('w:ascii')] == attrs[qn('w:eastAsia')] == \
+            TARGET_FONT, part
+
+
+def test_word_xml_engine_matches_object_engine(tmp_path):
+    """object エンジンと同じ run フォント属性になり、python-docx で開ける"""
+    path = _make_docx(tmp_path / "in.docx")
+    obj_out = str(tmp_path / "object.docx")
+    font_unifier.change_word_font(path, TARGET_FONT).save(obj_out)
+    xml_out = str(tmp_path / "xml.docx")
+    ooxml_engines.change_word_font_xml(path, TARGET_FONT).save(xml_out)
+    assert _all_runs_rfonts(xml_out) == _all_runs_rfonts(obj_out)
+
+    doc = Document(xml_out)
+    assert doc.paragraphs[0].runs[0].font.name == TARGET_FONT
+    assert doc.tables[0].cell(0, 0).tables[0].cell(0, 0).text == "nested"
+
+
+def test_word_xml_engine_keeps_namespaces_on_root_only(tmp_path):
+    """ブロック毎に xmlns 宣言を重複出力しない（document.xml の肥大化防止）"""
+    path = _make_docx(tmp_path / "in.docx", paragraphs=50)
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="xml")
+    before = zipfile.ZipFile(path).read("word/document.xml")
+    after = zipfile.ZipFile(out).read("word/document.xml")
+    assert after.count(b"xmlns:w=") == before.count(b"xmlns:w=") == 1
+
+
+def test_word_streaming_engines_write_body_once(tmp_path):
+    """入れ子コンテナ w:body を閉じた後に空の <w:body/> を再出力しない"""
+    path = _make_docx(tmp_path / "in.docx")
+    for engine in ("xml", "styles", "theme"):
+        out = font_unifier.process_office_file(path, TARGET_FONT,
+                                               engine=engine)
+        data = zipfile.ZipFile(out).read("word/document.xml")
+        assert data.count(b"<w:body") == 1, engine
+        assert data.rstrip().endswith(b"</w:body></w:document>"), engine
+
+
+# ---------------------------------------------------------------------------
+# PowerPoint (.pptx) direct XML engine
+# ---------------------------------------------------------------------------
+
+_PPTX_PARTS = ooxml_engines.PPTX_TEXT_PARTS
+
+
+def _make_pptx(path):
+    """テキストボックス・表格・チャート・画像を含む pptx を生成する"""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    tf = slide.shapes.add_textbox(
+        Inches(1), Inches(1), Inches(4), Inches(1)).text_frame
+    tf.text = "Title"
+    tf.paragraphs[0].add_run().text = " Extra"
+    tbl = slide.shapes.add_table(
+        1, 2, Inches(1), Inches(2), Inches(4), Inches(1)).table
+    tbl.cell(0, 0).text = "X"
+    cd = CategoryChartData()
+    cd.categories = ['A', 'B']
+    cd.add_series('S1', (1, 2))
+    chart = slide.shapes.add_chart(
+        XL_CHART_TYPE.COLUMN_CLUSTERED,
+        Inches(1), Inches(3), Inches(4), Inches(3), cd).chart
+    chart.has_title = True
+    chart.chart_title.text_frame.text = "ChartTitle"
+    image = path.parent / "pixel.png"
+    from PIL import Image
+    Image.new("RGB", (4, 4), "red").save(str(image))
+    slide.shapes.add_picture(str(image), Inches(5), Inches(1))
+    prs.save(str(path))
+    return str(path)
+
+
+def test_ppt_xml_engine_sets_typefaces_everywhere(tmp_path):
+    """スライド/チャート/マスター/レイアウトの全 rPr/endParaRPr/defRPr に
+    latin/ea/cs が入る"""
+    from lxml import etree
+    path = _make_pptx(tmp_path / "in.pptx")
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="xml")
+    checked = 0
+    with zipfile.ZipFile(out) as zf:
+        for name in zf.namelist():
+            if not re.fullmatch(_PPTX_PARTS, name):
+                continue
+            root = etree.fromstring(zf.read(name))
+            for run in root.iter(pptx_qn('a:r')):
+                assert run.find(pptx_qn('a:rPr')) is not None
+            for rpr in root.iter(pptx_qn('a:rPr'), pptx_qn('a:endParaRPr'),
+                                 pptx_qn('a:defRPr')):
+                for tag in ('a:latin', 'a:ea', 'a:cs'):
+                    assert rpr.find(pptx_qn(tag)).get('typeface') == \
+                        TARGET_FONT, (name, tag)
+                checked += 1
+    assert checked
+
+    prs = Presentation(out)
+    run = prs.slides[0].shapes[0].text_frame.paragraphs[0].runs[0]
+    assert run.font.name == TARGET_FONT
+    title = prs.slides[0].shapes[2].chart.chart_title.text_frame
+    assert title.paragraphs[0].runs[0].font.name == TARGET_FONT
+
+
+def test_ppt_xml_engine_copies_other_parts_verbatim(tmp_path):
+    """テキスト部件以外（画像・テーマ等）はバイト単位で同一"""
+    path = _make_pptx(tmp_path / "in.pptx")
+    out = str(tmp_path / "xml.pptx")
+    ooxml_engines.change_ppt_font_xml(path, TARGET_FONT).save(out)
+    before, after = _members(path), _members(out)
+    assert list(before) == list(after)
+    assert any(name.startswith("ppt/media/") for name in before)
+    for name in before:
+        if not re.fullmatch(_PPTX_PARTS, name):
+            assert before[name] == after[name], name
+
+
+def test_process_office_file_unknown_engine(tmp_path):
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    try:
+        font_unifier.process_office_file(path, TARGET_FONT, engine="nope")
+    except ValueError:
+        return
+    raise AssertionError("ValueError was expected for unknown engine")
+
+
+# ---------------------------------------------------------------------------
+# Word (.docx) style-level engine
+# ---------------------------------------------------------------------------
+
+def _docx_rfonts(path, part):
+    """パート内の全 w:rFonts 要素の属性 dict を列挙する"""
+    from lxml import etree
+    root = etree.fromstring(zipfile.ZipFile(path).read(part))
+    return [dict(rf.attrib) for rf in root.iter(qn('w:rFonts'))]
+
+
+def test_word_styles_engine_sets_defaults_and_styles(tmp_path):
+    """docDefaults と全スタイルの rFonts が対象フォントになり、主題参照が消える"""
+    path = _make_docx(tmp_path / "in.docx")
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="styles")
+    for part in ("word/styles.xml", "word/document.xml", "word/header1.xml"):
+        for attrs in _docx_rfonts(out, part):
+            for attr in ('w:ascii', 'w:hAnsi', 'w:eastAsia', 'w:cs'):
+                assert attrs.get(qn(attr)) == TARGET_FONT, (part, attr)
+            for attr in ooxml_engines.DOCX_THEME_ATTRS:
+                assert qn(attr) not in attrs, (part, attr)
+
+    from lxml import etree
+    styles = etree.fromstring(zipfile.ZipFile(out).read("word/styles.xml"))
+    default = styles.find(qn('w:docDefaults') + '/' + qn('w:rPrDefault')
+                          + '/' + qn('w:rPr') + '/' + qn('w:rFonts'))
+    assert default.get(qn('w:eastAsia')) == TARGET_FONT
+    assert Document(out).paragraphs[0].runs[0].font.name == TARGET_FONT
+
+
+def test_word_styles_engine_touches_only_overriding_runs(tmp_path):
+    """独自 rFonts を持たない run には rFonts を追加しない（出力が小さい）"""
+    path = _make_docx(tmp_path / "in.docx", paragraphs=200)
+    styles_out = font_unifier.process_office_file(
+        path, TARGET_FONT, engine="styles")
+    assert len(_docx_rfonts(styles_out, "word/document.xml")) == \
+        len(_docx_rfonts(path, "word/document.xml")) == 1
+
+    xml_out = str(tmp_path / "xml.docx")
+    ooxml_engines.change_word_font_xml(path, TARGET_FONT).save(xml_out)
+    size = zipfile.ZipFile(styles_out).getinfo("word/document.xml").file_size
+    assert size < zipfile.ZipFile(xml_out).getinfo(
+        "word/document.xml").file_size
+
+
+def test_word_styles_engine_rejects_other_formats(tmp_path):
+    """styles エンジンは .docx 専用"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    try:
+        font_unifier.process_office_file(path, TARGET_FONT, engine="styles")
+    except ValueError:
+        return
+    raise AssertionError("ValueError was expected for .xlsx")
+
+
+# ---------------------------------------------------------------------------
+# Theme mode (all formats)
+# ---------------------------------------------------------------------------
+
+def _theme_typefaces(path, part):
+    """テーマ部件の major/minor フォント typeface を列挙する"""
+    from lxml import etree
+    root = etree.fromstring(zipfile.ZipFile(path).read(part))
+    return [font.get('typeface')
+            for collection in root.iter(pptx_qn('a:majorFont'),
+                                        pptx_qn('a:minorFont'))
+            for font in collection]
+
+
+def test_theme_engine_docx_rewrites_theme_and_keeps_references(tmp_path):
+    """テーマのフォントを置換し、asciiTheme 等の参照は残す"""
+    path = _make_docx(tmp_path / "in.docx")
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="theme")
+    assert set(_theme_typefaces(out, "word/theme/theme1.xml")) == \
+        {TARGET_FONT}
+    run_rfonts = _docx_rfonts(out, "word/document.xml")[0]
+    assert run_rfonts[qn('w:asciiTheme')] == 'minorHAnsi'
+    assert run_rfonts[qn('w:hAnsi')] == TARGET_FONT
+    for attrs in _docx_rfonts(out, "word/styles.xml"):
+        for attr, theme_attr in zip(
+                ('w:ascii', 'w:hAnsi', 'w:eastAsia', 'w:cs'),
+                ooxml_engines.DOCX_THEME_ATTRS):
+            assert qn(theme_attr) in attrs or \
+                attrs.get(qn(attr)) == TARGET_FONT
+
+
+def test_theme_engine_xlsx_keeps_scheme(tmp_path):
+    """<scheme> を残したまま、テーマと明示フォント名を置換する"""
+    path = _make_xlsx(tmp_path / "in.xlsx")
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="theme")
+    assert set(_theme_typefaces(out, "xl/theme/theme1.xml")) == {TARGET_FONT}
+    styles = zipfile.ZipFile(out).read("xl/styles.xml").decode("utf-8")
+    assert "scheme" in styles
+    assert set(re.findall(r'<name val="([^"]+)"', styles)) == {TARGET_FONT}
+    assert load_workbook(out)["Sheet"]["A2"].font.size == 14
+
+
+def test_theme_engine_pptx_leaves_theme_references(tmp_path):
+    """+mn-lt 等の参照は残し、明示 typeface とテーマだけを置換する"""
+    from lxml import etree
+    path = _make_pptx(tmp_path / "in.pptx")
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="theme")
+    assert set(_theme_typefaces(out, "ppt/theme/theme1.xml")) == \
+        {TARGET_FONT}
+    master = etree.fromstring(
+        zipfile.ZipFile(out).read("ppt/slideMasters/slideMaster1.xml"))
+    typefaces = {font.get('typeface') for font in master.iter(
+        pptx_qn('a:latin'), pptx_qn('a:ea'), pptx_qn('a:cs'))}
+    assert typefaces and all(t.startswith('+') or t == TARGET_FONT
+                             for t in typefaces)
+    assert any(t.startswith('+') for t in typefaces)
+    # 独自 typeface を持たない run には latin を追加しない
+    slide = zipfile.ZipFile(out).read("ppt/slides/slide1.xml")
+    assert slide == zipfile.ZipFile(path).read("ppt/slides/slide1.xml")
+
+
+# ---------------------------------------------------------------------------
+# Raw passthrough of untouched members
+# ---------------------------------------------------------------------------
+
+def _raw_member(path, name):
+    """メンバーの圧縮済みバイト列（ローカルヘッダの後ろ）を返す"""
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo(name)
+        zf.fp.seek(info.header_offset + 26)
+        name_len, extra_len = struct.unpack("<HH", zf.fp.read(4))
+        zf.fp.seek(info.header_offset + 30 + name_len + extra_len)
+        return zf.fp.read(info.compress_size)
+
+
+def test_untouched_members_keep_compressed_bytes(tmp_path):
+    """未変更メンバーは再圧縮せず元の圧縮バイト列のままコピーされる"""
+    source = _make_xlsx(tmp_path / "src.xlsx")
+    # 既定 (level 6) と異なる level 1 で再パック: 再圧縮されれば必ず変わる
+    path = str(tmp_path / "fast.xlsx")
+    with zipfile.ZipFile(source) as zin, zipfile.ZipFile(
+            path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zout:
+        for info in zin.infolist():
+            zout.writestr(info.filename, zin.read(info))
+    out = font_unifier.process_office_file(path, TARGET_FONT, engine="xml")
+
+    with zipfile.ZipFile(out) as zf:
+        assert zf.testzip() is None
+    for name in _members(path):
+        if name != "xl/styles.xml":
+            assert _raw_member(out, name) == _raw_member(path, name), name
+    assert load_workbook(out)["Second"]["B3"].value == 42